@@ -0,0 +1,237 @@
+"""
+Module for counting words approximately in a fixed amount of memory.
+"""
+
+import math
+from typing import Dict, Iterable, List, Mapping, Optional
+
+import numpy as np
+
+from wiki_word_freq.ignore_lists import compile_ignore_list
+from wiki_word_freq.processing import ProcessedArticle
+from wiki_word_freq.session import CrawlListener
+
+# How the words of a crawl are counted: exactly, keeping every distinct word,
+# or approximately, keeping only the most frequent ones
+COUNTING_EXACT = "exact"
+COUNTING_APPROXIMATE = "approximate"
+COUNTING_MODES = (COUNTING_EXACT, COUNTING_APPROXIMATE)
+
+
+class CountMinSketch:
+    """
+    Count-min sketch of word counts.
+
+    Each of ``depth`` rows of ``width`` counters is indexed by its own hash of
+    the word, and a word's estimate is the smallest of its counters. Estimates
+    never fall below the true count, and exceed it by at most ``error_bound``
+    with probability ``1 - exp(-depth)``.
+
+    Words are hashed with ``hash``, so a sketch is only meaningful within the
+    process that built it.
+    """
+
+    def __init__(self, width: int = 2**16, depth: int = 4):
+        """
+        Initialize the sketch.
+
+        Args:
+            width: The number of counters per row.
+            depth: The number of rows.
+        """
+        if width < 1 or depth < 1:
+            raise ValueError("width and depth must be at least 1")
+
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.total = 0
+
+    def _indexes(self, words: List[str]) -> np.ndarray:
+        """Compute the counter index of each word in each row."""
+        hashes = np.fromiter(map(hash, words), dtype=np.int64, count=len(words))
+        hashes = hashes.view(np.uint64)
+        # Row i uses h1 + i * h2, which is as good as independent hashes
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        rows = np.arange(self.depth, dtype=np.uint64)[:, np.newaxis]
+        return ((h1 + rows * h2) % np.uint64(self.width)).astype(np.intp)
+
+    def update(self, word_counts: Mapping[str, int]) -> None:
+        """
+        Add word counts to the sketch.
+
+        Args:
+            word_counts: A mapping of words to the number of occurrences to add.
+        """
+        if not word_counts:
+            return
+        indexes = self._indexes(list(word_counts))
+        counts = np.fromiter(
+            word_counts.values(), dtype=np.int64, count=len(word_counts)
+        )
+        for row in range(self.depth):
+            np.add.at(self.table[row], indexes[row], counts)
+        self.total += int(counts.sum())
+
+    def estimate(self, words: List[str]) -> np.ndarray:
+        """
+        Estimate the counts of words.
+
+        Args:
+            words: The words.
+
+        Returns:
+            The estimated count of each word, never below its true count.
+        """
+        if not words:
+            return np.zeros(0, dtype=np.int64)
+        indexes = self._indexes(words)
+        return self.table[np.arange(self.depth)[:, np.newaxis], indexes].min(axis=0)
+
+    @property
+    def error_bound(self) -> int:
+        """The overestimate that is exceeded with probability ``exp(-depth)``."""
+        return math.ceil(math.e / self.width * self.total)
+
+
+class HeavyHitters:
+    """
+    Misra-Gries summary of the most frequent words.
+
+    At most ``capacity`` words are tracked. When more are, the count of the
+    word ranked ``capacity + 1`` is subtracted from every tracked word and
+    words left without a count are dropped. A tracked word's count is
+    therefore below its true count by at most ``decremented``, and a word that
+    is not tracked occurred at most ``decremented`` times, which is at most
+    ``total / (capacity + 1)``.
+    """
+
+    def __init__(self, capacity: int = 10000):
+        """
+        Initialize the summary.
+
+        Args:
+            capacity: The maximum number of tracked words.
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+        # Total subtracted from every tracked word so far
+        self.decremented = 0
+
+    def update(self, word_counts: Mapping[str, int]) -> None:
+        """
+        Add word counts to the summary.
+
+        Args:
+            word_counts: A mapping of words to the number of occurrences to add.
+        """
+        counts = self.counts
+        for word, count in word_counts.items():
+            counts[word] = counts.get(word, 0) + count
+        if len(counts) > self.capacity:
+            self._shrink()
+
+    def _shrink(self) -> None:
+        """Decrement every count until at most ``capacity`` words are left."""
+        values = np.fromiter(self.counts.values(), dtype=np.int64, count=len(self.counts))
+        rank = len(values) - self.capacity - 1
+        threshold = int(np.partition(values, rank)[rank])
+        self.counts = {
+            word: count - threshold
+            for word, count in self.counts.items()
+            if count > threshold
+        }
+        self.decremented += threshold
+
+
+class ApproximateWordCounter(CrawlListener):
+    """
+    Crawl listener counting the words of fetched articles in bounded memory.
+
+    The most frequent words are found with a ``HeavyHitters`` summary, and
+    their counts estimated from both the summary and a ``CountMinSketch``.
+    Memory stays below ``capacity`` words plus the sketch, and the words of
+    one article, however large the crawl, so the session can run with
+    ``keep_results=False``.
+
+    Reported counts are never below the true counts, and exceed them by at
+    most ``error_bound()``. When the crawl has fewer than ``capacity``
+    distinct words, the counts are exact. Frequencies must be taken
+    relative to ``total``, which also counts the words no longer tracked.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 10000,
+        sketch_width: int = 2**16,
+        sketch_depth: int = 4,
+        ignore_list: Optional[Iterable[str]] = None,
+    ):
+        """
+        Initialize the counter.
+
+        Args:
+            capacity: The maximum number of tracked words.
+            sketch_width: The number of counters per row of the sketch.
+            sketch_depth: The number of rows of the sketch.
+            ignore_list: Words that are not counted at all, or a compiled
+                         ``IgnoreSet``.
+        """
+        self.heavy_hitters = HeavyHitters(capacity)
+        self.sketch = CountMinSketch(sketch_width, sketch_depth)
+        self.ignored = compile_ignore_list(ignore_list)
+
+    def article_done(self, title: str, page: Optional[ProcessedArticle]) -> None:
+        """Add the words of a fetched article."""
+        if page is None:
+            return
+
+        word_counts = page.word_counts
+        if self.ignored:
+            word_counts = {
+                word: count
+                for word, count in word_counts.items()
+                if word not in self.ignored
+            }
+        self.heavy_hitters.update(word_counts)
+        self.sketch.update(word_counts)
+
+    def _bounds(self):
+        """Return the tracked words with the lower and upper bounds of their counts."""
+        words = list(self.heavy_hitters.counts)
+        lower = np.fromiter(
+            self.heavy_hitters.counts.values(), dtype=np.int64, count=len(words)
+        )
+        upper = np.minimum(
+            self.sketch.estimate(words), lower + self.heavy_hitters.decremented
+        )
+        return words, lower, upper
+
+    def word_counts(self) -> Dict[str, int]:
+        """
+        Get the estimated counts of the most frequent words.
+
+        Returns:
+            A mapping of at most ``capacity`` words to their estimated counts.
+        """
+        words, _, upper = self._bounds()
+        return dict(zip(words, upper.tolist()))
+
+    @property
+    def total(self) -> int:
+        """The number of words counted, without ignored words, tracked or not."""
+        return self.sketch.total
+
+    def error_bound(self) -> int:
+        """
+        Get the largest possible overestimate among the reported counts.
+
+        Returns:
+            The bound, 0 if the counts are exact.
+        """
+        _, lower, upper = self._bounds()
+        return int((upper - lower).max()) if len(lower) else 0
@@ -0,0 +1,181 @@
+"""
+Module for an in-process LRU cache with expiry and size-based eviction.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+@dataclass
+class CacheStats:
+    """Counters describing the effectiveness of a cache."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        """Return the counters as a dictionary."""
+        return asdict(self)
+
+
+class LRUCache(Generic[V]):
+    """
+    Thread-safe least-recently-used cache.
+
+    Entries expire after ``ttl`` seconds. When the cache holds more than
+    ``max_entries`` entries or more than ``max_bytes`` bytes, as estimated by
+    ``sizeof``, the least recently used entries are evicted.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = 1024,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+        sizeof: Optional[Callable[[V], int]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: The maximum number of entries, or None for no limit.
+            max_bytes: The maximum estimated size of all entries, or None for
+                       no limit. Requires ``sizeof``.
+            ttl: The number of seconds an entry stays valid, or None to keep
+                 entries until they are evicted.
+            sizeof: A function estimating the size of a value in bytes.
+            clock: The time source, in seconds.
+        """
+        if max_bytes is not None and sizeof is None:
+            raise ValueError("max_bytes requires a sizeof function")
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof
+        self.clock = clock
+        self.stats = CacheStats()
+        self.total_bytes = 0
+        # Maps keys to (expiry time, size, value), least recently used first
+        self._entries: "OrderedDict[Hashable, Tuple[Optional[float], int, V]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of entries, including expired ones not yet removed."""
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """
+        Look up a value and mark it as recently used.
+
+        Args:
+            key: The cache key.
+
+        Returns:
+            The cached value, or None if it is missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+
+            expires_at, _, value = entry
+            if expires_at is not None and expires_at <= self.clock():
+                self._remove(key)
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: V) -> None:
+        """
+        Store a value, evicting least recently used entries if the cache is full.
+
+        Args:
+            key: The cache key.
+            value: The value to store.
+        """
+        if self.max_entries == 0:
+            return
+
+        size = self.sizeof(value) if self.sizeof is not None else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            # The value alone would not fit
+            return
+
+        expires_at = self.clock() + self.ttl if self.ttl is not None else None
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, size, value)
+            self.total_bytes += size
+            self._evict()
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """
+        Remove one entry, or every entry if no key is given.
+
+        Args:
+            key: The cache key, or None to clear the cache.
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self.total_bytes = 0
+            elif key in self._entries:
+                self._remove(key)
+
+    def invalidate_matching(self, predicate: Callable[[Hashable], bool]) -> int:
+        """
+        Remove every entry whose key matches a predicate.
+
+        Args:
+            predicate: A function returning True for keys to remove.
+
+        Returns:
+            The number of removed entries.
+        """
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def info(self) -> Dict[str, Any]:
+        """Return the counters and the current size of the cache."""
+        with self._lock:
+            return {
+                **self.stats.as_dict(),
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+            }
+
+    def _remove(self, key: Hashable) -> None:
+        """Remove an entry; the lock must be held."""
+        _, size, _ = self._entries.pop(key)
+        self.total_bytes -= size
+
+    def _evict(self) -> None:
+        """Evict least recently used entries until the limits hold; the lock must be held."""
+        while self._entries and (
+            (self.max_entries is not None and len(self._entries) > self.max_entries)
+            or (self.max_bytes is not None and self.total_bytes > self.max_bytes)
+        ):
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.stats.evictions += 1
@@ -0,0 +1,207 @@
+"""
+Configuration for the Wikipedia Word-Frequency Dictionary API.
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+ENV_PREFIX = "WIKI_WORD_FREQ_"
+
+
+def _env_int(name: str, default: Optional[int]) -> Optional[int]:
+    """Read an optional integer setting from the environment."""
+    value = os.environ.get(ENV_PREFIX + name)
+    if value is None or value == "":
+        return default
+    return int(value)
+
+
+def _env_float(name: str, default: Optional[float]) -> Optional[float]:
+    """Read an optional float setting from the environment."""
+    value = os.environ.get(ENV_PREFIX + name)
+    if value is None or value == "":
+        return default
+    return float(value)
+
+
+def _env_str(name: str, default: str) -> str:
+    """Read a string setting from the environment."""
+    return os.environ.get(ENV_PREFIX + name, default)
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Runtime settings of the API server."""
+
+    # Maximum number of articles fetched concurrently by one crawler
+    max_concurrency: int = 10
+    # How articles are fetched: "parse" (one rendered page per request) or
+    # "query" (batched link lists and one plain-text extract per article,
+    # which saves bytes and CPU rather than requests)
+    fetch_backend: str = "parse"
+    # Connect and read timeouts of requests to the API, in seconds
+    http_connect_timeout: float = 5.0
+    http_read_timeout: float = 30.0
+    # Retries of timeouts, rate limiting and server errors, with jittered
+    # exponential backoff; longer Retry-After delays are not waited for
+    http_max_retries: int = 3
+    http_backoff_base: float = 0.5
+    http_backoff_max: float = 30.0
+    http_max_retry_after: float = 120.0
+    # Range of the adaptive concurrency limit shared by all crawls, which is
+    # halved when the API rate-limits or times out; None means max_concurrency
+    upstream_max_concurrency: Optional[int] = None
+    upstream_min_concurrency: int = 1
+    # Where the links to follow come from: "html" (the rendered page) or "api"
+    # (the link list returned with the page, with redirects resolved)
+    link_source: str = "html"
+    # Limits of the cache of resolved redirect aliases; 0 entries disables it
+    title_cache_entries: int = 100000
+    # Seconds a resolved alias stays valid
+    title_cache_ttl: float = 24 * 3600.0
+    # How merged word counts are filtered and turned into frequencies:
+    # "python" (dictionaries) or "numpy" (arrays indexed by word IDs)
+    counting_engine: str = "python"
+    # Directory of named ignore lists, one "<name>.txt" file of words per list,
+    # registered along with the built-in lists; None registers only those
+    ignore_lists_path: Optional[str] = None
+    # Kind of pool used for counting and encoding results: "thread" or "process"
+    worker_pool: str = "thread"
+    # Number of workers in that pool; None lets the executor decide
+    worker_count: Optional[int] = None
+    # Kind of pool parsing fetched articles; a process pool uses every core
+    parse_pool: str = "process"
+    # Number of parse workers; None means one per core
+    parse_workers: Optional[int] = None
+    # Fetched articles waiting for or being parsed before fetches wait; None
+    # means twice the number of parse workers
+    parse_queue_size: Optional[int] = None
+    # HTML backend for extracting words and links: "auto", "stream", "bs4" or "lxml"
+    html_backend: str = "auto"
+    # Limits of the cache of processed articles; 0 entries disables it
+    article_cache_entries: int = 2048
+    article_cache_bytes: int = 256 * 1024 * 1024
+    # Seconds a cached article stays valid
+    article_cache_ttl: float = 3600.0
+    # Path of the on-disk article store shared by all workers; None disables it
+    article_store_path: Optional[str] = None
+    # Seconds after which a stored article is refetched
+    article_store_max_age: float = 24 * 3600.0
+    # Server-side crawl budgets; requests may only ask for less
+    crawl_max_articles: Optional[int] = 10000
+    crawl_max_bytes: Optional[int] = 1024 * 1024 * 1024
+    crawl_time_limit: Optional[float] = 300.0
+    # Limits of the cache of whole results; 0 entries disables it
+    result_cache_entries: int = 256
+    result_cache_bytes: int = 256 * 1024 * 1024
+    # Seconds a cached result stays valid
+    result_cache_ttl: float = 300.0
+    # Filtered word counts with their percentile index, kept for requests
+    # differing only in their percentile; 0 entries disables them
+    count_cache_entries: int = 64
+    count_cache_bytes: int = 128 * 1024 * 1024
+    # Complete crawls kept by start article, so that a deeper crawl only
+    # fetches the new levels; 0 entries disables them
+    crawl_snapshot_entries: int = 64
+    # Estimated memory of kept crawls, including their visited sets
+    crawl_snapshot_bytes: int = 256 * 1024 * 1024
+    # Seconds a kept crawl may be continued
+    crawl_snapshot_ttl: float = 3600.0
+    # Memory of approximate counting: the number of most frequent words kept,
+    # and the counters of the count-min sketch estimating their counts
+    approx_capacity: int = 10000
+    approx_sketch_width: int = 2**16
+    approx_sketch_depth: int = 4
+    # Seconds between checks for clients that disconnected mid-crawl
+    disconnect_poll_interval: float = 0.5
+    # Number of crawl jobs running at once, and waiting for a slot
+    job_workers: int = 2
+    job_queue_size: int = 100
+    # Path of the on-disk store of job states and results; None keeps them in
+    # memory only
+    job_store_path: Optional[str] = None
+    # Estimated memory of the results of finished jobs kept without a store
+    job_finished_bytes: int = 256 * 1024 * 1024
+    # Server-side budgets of crawl jobs, which may run longer than requests
+    job_max_articles: Optional[int] = 100000
+    job_max_bytes: Optional[int] = 10 * 1024 * 1024 * 1024
+    job_time_limit: Optional[float] = 3600.0
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        """
+        Build the settings from ``WIKI_WORD_FREQ_*`` environment variables.
+
+        Returns:
+            The settings, using defaults for unset variables.
+        """
+        return cls(
+            max_concurrency=_env_int("MAX_CONCURRENCY", cls.max_concurrency),
+            fetch_backend=_env_str("FETCH_BACKEND", cls.fetch_backend),
+            http_connect_timeout=_env_float(
+                "HTTP_CONNECT_TIMEOUT", cls.http_connect_timeout
+            ),
+            http_read_timeout=_env_float("HTTP_READ_TIMEOUT", cls.http_read_timeout),
+            http_max_retries=_env_int("HTTP_MAX_RETRIES", cls.http_max_retries),
+            http_backoff_base=_env_float("HTTP_BACKOFF_BASE", cls.http_backoff_base),
+            http_backoff_max=_env_float("HTTP_BACKOFF_MAX", cls.http_backoff_max),
+            http_max_retry_after=_env_float(
+                "HTTP_MAX_RETRY_AFTER", cls.http_max_retry_after
+            ),
+            upstream_max_concurrency=_env_int(
+                "UPSTREAM_MAX_CONCURRENCY", cls.upstream_max_concurrency
+            ),
+            upstream_min_concurrency=_env_int(
+                "UPSTREAM_MIN_CONCURRENCY", cls.upstream_min_concurrency
+            ),
+            link_source=_env_str("LINK_SOURCE", cls.link_source),
+            title_cache_entries=_env_int("TITLE_CACHE_ENTRIES", cls.title_cache_entries),
+            title_cache_ttl=_env_float("TITLE_CACHE_TTL", cls.title_cache_ttl),
+            counting_engine=_env_str("COUNTING_ENGINE", cls.counting_engine),
+            ignore_lists_path=os.environ.get(ENV_PREFIX + "IGNORE_LISTS_PATH") or None,
+            worker_pool=_env_str("WORKER_POOL", cls.worker_pool),
+            worker_count=_env_int("WORKER_COUNT", cls.worker_count),
+            parse_pool=_env_str("PARSE_POOL", cls.parse_pool),
+            parse_workers=_env_int("PARSE_WORKERS", cls.parse_workers),
+            parse_queue_size=_env_int("PARSE_QUEUE_SIZE", cls.parse_queue_size),
+            html_backend=_env_str("HTML_BACKEND", cls.html_backend),
+            article_cache_entries=_env_int(
+                "ARTICLE_CACHE_ENTRIES", cls.article_cache_entries
+            ),
+            article_cache_bytes=_env_int("ARTICLE_CACHE_BYTES", cls.article_cache_bytes),
+            article_cache_ttl=_env_float("ARTICLE_CACHE_TTL", cls.article_cache_ttl),
+            article_store_path=os.environ.get(ENV_PREFIX + "ARTICLE_STORE_PATH")
+            or None,
+            article_store_max_age=_env_float(
+                "ARTICLE_STORE_MAX_AGE", cls.article_store_max_age
+            ),
+            crawl_max_articles=_env_int("CRAWL_MAX_ARTICLES", cls.crawl_max_articles),
+            crawl_max_bytes=_env_int("CRAWL_MAX_BYTES", cls.crawl_max_bytes),
+            crawl_time_limit=_env_float("CRAWL_TIME_LIMIT", cls.crawl_time_limit),
+            result_cache_entries=_env_int("RESULT_CACHE_ENTRIES", cls.result_cache_entries),
+            result_cache_bytes=_env_int("RESULT_CACHE_BYTES", cls.result_cache_bytes),
+            result_cache_ttl=_env_float("RESULT_CACHE_TTL", cls.result_cache_ttl),
+            count_cache_entries=_env_int("COUNT_CACHE_ENTRIES", cls.count_cache_entries),
+            count_cache_bytes=_env_int("COUNT_CACHE_BYTES", cls.count_cache_bytes),
+            crawl_snapshot_entries=_env_int(
+                "CRAWL_SNAPSHOT_ENTRIES", cls.crawl_snapshot_entries
+            ),
+            crawl_snapshot_bytes=_env_int(
+                "CRAWL_SNAPSHOT_BYTES", cls.crawl_snapshot_bytes
+            ),
+            crawl_snapshot_ttl=_env_float("CRAWL_SNAPSHOT_TTL", cls.crawl_snapshot_ttl),
+            approx_capacity=_env_int("APPROX_CAPACITY", cls.approx_capacity),
+            approx_sketch_width=_env_int("APPROX_SKETCH_WIDTH", cls.approx_sketch_width),
+            approx_sketch_depth=_env_int("APPROX_SKETCH_DEPTH", cls.approx_sketch_depth),
+            disconnect_poll_interval=_env_float(
+                "DISCONNECT_POLL_INTERVAL", cls.disconnect_poll_interval
+            ),
+            job_workers=_env_int("JOB_WORKERS", cls.job_workers),
+            job_queue_size=_env_int("JOB_QUEUE_SIZE", cls.job_queue_size),
+            job_store_path=os.environ.get(ENV_PREFIX + "JOB_STORE_PATH") or None,
+            job_finished_bytes=_env_int("JOB_FINISHED_BYTES", cls.job_finished_bytes),
+            job_max_articles=_env_int("JOB_MAX_ARTICLES", cls.job_max_articles),
+            job_max_bytes=_env_int("JOB_MAX_BYTES", cls.job_max_bytes),
+            job_time_limit=_env_float("JOB_TIME_LIMIT", cls.job_time_limit),
+        )
@@ -0,0 +1,715 @@
+"""
+Module for traversing Wikipedia articles concurrently with asyncio.
+"""
+
+import asyncio
+import functools
+from collections import Counter
+from concurrent.futures import Executor
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from wiki_word_freq.processing import ArticleProcessor, ProcessedArticle
+from wiki_word_freq.query import BatchQueryFetcher, build_article
+from wiki_word_freq.session import (
+    CrawlBudget,
+    CrawlListener,
+    CrawlSession,
+    TRUNCATED_TIME_LIMIT,
+)
+from wiki_word_freq.store import StoredArticle
+from wiki_word_freq.titles import TitleResolver
+from wiki_word_freq.transport import AdaptiveLimiter, RetryPolicy, RetryTransport
+from wiki_word_freq.wikipedia import WikipediaClient
+from wiki_word_freq.workers import ParseQueue
+
+# Returned by a fetch that was skipped because the crawl budget ran out
+SKIPPED = object()
+
+# Ways of fetching articles: one action=parse call per article, or batched
+# action=query calls for plain-text extracts and links
+BACKEND_PARSE = "parse"
+BACKEND_QUERY = "query"
+BACKENDS = (BACKEND_PARSE, BACKEND_QUERY)
+
+# Where the links to expand come from: the rendered HTML, or the link lists of
+# the API with redirects resolved
+LINK_SOURCE_HTML = "html"
+LINK_SOURCE_API = "api"
+LINK_SOURCES = (LINK_SOURCE_HTML, LINK_SOURCE_API)
+
+
+def process_html(
+    processor: ArticleProcessor, html_content: str, with_links: bool
+) -> ProcessedArticle:
+    """
+    Extract the word counts and, optionally, the links of an article in one parse.
+
+    This is a module-level function so that it can be shipped to a process pool.
+
+    Args:
+        processor: The article processor.
+        html_content: The HTML content of the article.
+        with_links: Whether the outgoing links are needed.
+
+    Returns:
+        The processed article.
+    """
+    return processor.process(html_content, with_links)
+
+
+class AsyncWikipediaCrawler:
+    """Crawler that fetches every depth level of a traversal concurrently."""
+
+    DEFAULT_MAX_CONCURRENCY = 10
+    DEFAULT_TIMEOUT = 30.0
+    DEFAULT_CONNECT_TIMEOUT = 5.0
+
+    def __init__(
+        self,
+        client: Optional[WikipediaClient] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        http_client: Optional[httpx.AsyncClient] = None,
+        executor: Optional[Executor] = None,
+        backend: str = BACKEND_PARSE,
+        query_fetcher: Optional[BatchQueryFetcher] = None,
+        link_source: str = LINK_SOURCE_HTML,
+        title_resolver: Optional[TitleResolver] = None,
+        timeout: Optional[httpx.Timeout] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        limiter: Optional[AdaptiveLimiter] = None,
+        parse_queue_size: Optional[int] = None,
+    ):
+        """
+        Initialize the crawler.
+
+        Args:
+            client: The Wikipedia client used for building requests and
+                    extracting words and links. A new one is created if omitted.
+            max_concurrency: The maximum number of articles fetched at once.
+            http_client: A shared HTTP client. A pooled client sized to
+                         ``max_concurrency`` is created lazily if omitted.
+            executor: The pool that parses fetched articles, keeping the CPU-bound
+                      extraction off the event loop; a process pool spreads it
+                      over all cores. The event loop's default executor is
+                      used if omitted.
+            backend: How articles are fetched: "parse" for one rendered page
+                     per request, or "query" for batched link lists and one
+                     plain-text extract per article, which downloads and
+                     parses less but sends a few more requests.
+            query_fetcher: The fetcher used by the "query" backend and for
+                           resolving redirects. One using the client's API URL
+                           is created if omitted.
+            link_source: Where the "parse" backend takes links from: "html" to
+                         extract them from the rendered page, or "api" to use
+                         the link list returned with the page, so that the HTML
+                         is only parsed for words. The "query" backend always
+                         uses the API's link lists.
+            title_resolver: The resolver mapping the links of each level to
+                            canonical titles through redirects, so that aliases
+                            of an article are fetched only once. One is created
+                            for links from the API if omitted; links from HTML
+                            are then only canonicalized locally.
+            timeout: The connect and read timeouts of the pooled HTTP client.
+            retry_policy: How the pooled HTTP client retries timeouts, rate
+                          limiting and server errors.
+            limiter: The adaptive concurrency limit of the pooled HTTP client,
+                     shared by all its crawls. One ranging up to
+                     ``max_concurrency`` is created if omitted.
+            parse_queue_size: The maximum number of fetched articles waiting
+                              for or being parsed, across all crawls; fetches
+                              wait when it is reached. Twice
+                              ``max_concurrency`` if omitted.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if backend not in BACKENDS:
+            raise ValueError(
+                f"Unknown fetch backend '{backend}', expected one of {', '.join(BACKENDS)}"
+            )
+        if link_source not in LINK_SOURCES:
+            raise ValueError(
+                f"Unknown link source '{link_source}', "
+                f"expected one of {', '.join(LINK_SOURCES)}"
+            )
+
+        self.client = client or WikipediaClient()
+        self.max_concurrency = max_concurrency
+        self._http_client = http_client
+        self.timeout = timeout or httpx.Timeout(
+            self.DEFAULT_TIMEOUT, connect=self.DEFAULT_CONNECT_TIMEOUT
+        )
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.limiter = limiter or AdaptiveLimiter(max_limit=max_concurrency)
+        self.retry_transport: Optional[RetryTransport] = None
+        self.executor = executor
+        self.parse_queue = ParseQueue(executor, parse_queue_size or 2 * max_concurrency)
+        self.backend = backend
+        self.link_source = link_source
+        if query_fetcher is None and self.api_links:
+            query_fetcher = BatchQueryFetcher(self.client.api_url)
+        self.query_fetcher = query_fetcher
+        if title_resolver is None and self.api_links:
+            title_resolver = TitleResolver(query_fetcher)
+        self.title_resolver = title_resolver
+        # Work abandoned by cancelled crawls, e.g. when a client disconnects
+        self.crawls_cancelled = 0
+        self.fetches_cancelled = 0
+
+    @property
+    def api_links(self) -> bool:
+        """Whether links are taken from the API's link lists rather than from HTML."""
+        return self.backend == BACKEND_QUERY or self.link_source == LINK_SOURCE_API
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """The pooled HTTP client shared by all traversals of this crawler."""
+        if self._http_client is None:
+            self.retry_transport = RetryTransport(
+                httpx.AsyncHTTPTransport(
+                    limits=httpx.Limits(
+                        max_connections=self.max_concurrency,
+                        max_keepalive_connections=self.max_concurrency,
+                    )
+                ),
+                self.retry_policy,
+                self.limiter,
+            )
+            self._http_client = httpx.AsyncClient(
+                transport=self.retry_transport, timeout=self.timeout
+            )
+        return self._http_client
+
+    def info(self) -> Dict[str, int]:
+        """Return the counters of cancelled work."""
+        return {
+            "crawls_cancelled": self.crawls_cancelled,
+            "fetches_cancelled": self.fetches_cancelled,
+        }
+
+    def upstream_info(self) -> Dict[str, Any]:
+        """Return the state of the adaptive limiter and the number of retries."""
+        retries = self.retry_transport.retries if self.retry_transport else 0
+        return {**self.limiter.info(), "retries": retries}
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client."""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+    async def _download_page(
+        self, article_title: str, with_links: bool
+    ) -> Tuple[str, Optional[List[str]]]:
+        """
+        Fetch an article, optionally with its link list, and write it to the
+        client's article store.
+
+        Args:
+            article_title: The title of the Wikipedia article.
+            with_links: Whether to request the structured list of outgoing links.
+
+        Returns:
+            The HTML content of the article, and its links, or None if they
+            were not requested or not returned.
+
+        Raises:
+            ValueError: If the article cannot be found.
+            httpx.HTTPError: If it still fails after the transport's retries.
+        """
+        response = await self.http_client.get(
+            self.client.api_url,
+            params=self.client.build_parse_params(article_title, with_links),
+        )
+        response.raise_for_status()
+        data = response.json()
+        html_content = self.client.parse_article_response(article_title, data)
+        if self.client.article_store is not None:
+            await asyncio.to_thread(
+                self.client.store_article_html, article_title, data, html_content
+            )
+        return html_content, self.client.parse_article_links(data)
+
+    async def _get_stored_article(self, article_title: str) -> Optional[StoredArticle]:
+        """
+        Read an article from the client's article store without blocking the event loop.
+
+        Args:
+            article_title: The title of the Wikipedia article.
+
+        Returns:
+            The stored article, or None if there is no store or no fresh entry.
+        """
+        if self.client.article_store is None:
+            return None
+        return await asyncio.to_thread(self.client.get_stored_article, article_title)
+
+    async def traverse_articles(
+        self, start_article: str, depth: int, budget: Optional[CrawlBudget] = None
+    ) -> Dict[str, Counter]:
+        """
+        Traverse Wikipedia articles starting from a given article up to a specified depth.
+
+        All articles of one depth level are fetched concurrently, bounded by
+        ``max_concurrency``. Every call runs in its own crawl session, so
+        concurrent traversals on the same crawler don't interfere.
+
+        Args:
+            start_article: The title of the Wikipedia article to start from.
+            depth: The depth of traversal.
+            budget: Optional limits on the cost of the crawl.
+
+        Returns:
+            A dictionary mapping article titles to the word counts of those articles.
+        """
+        session = CrawlSession(start_article, depth, budget=budget or CrawlBudget())
+        await self.crawl(session)
+        return session.results
+
+    async def crawl(
+        self, session: CrawlSession, listener: Optional[CrawlListener] = None
+    ) -> CrawlSession:
+        """
+        Run a crawl session to completion, or until its budget runs out.
+
+        Articles still being fetched when the deadline passes are cancelled, and
+        the articles completed so far are kept as partial results. Cancelling
+        the crawl itself, e.g. when its client disconnects, cancels every
+        pending fetch, and parses not yet started in the executor, before the
+        cancellation propagates.
+
+        Args:
+            session: The session holding the traversal state.
+            listener: An optional receiver of progress notifications, told
+                      about every article as soon as it is fetched and about
+                      every completed level.
+
+        Returns:
+            The same session, with its results and stats filled in.
+        """
+        try:
+            await self._crawl_levels(session, listener)
+        except asyncio.CancelledError:
+            self.crawls_cancelled += 1
+            raise
+
+        return session
+
+    async def _crawl_levels(
+        self, session: CrawlSession, listener: Optional[CrawlListener]
+    ) -> None:
+        """Fetch the levels of a crawl session one after the other."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        if self.title_resolver is not None:
+            # Links back to the start article may use another of its aliases
+            start = await self.title_resolver.resolve(
+                self.http_client, [session.start_article], semaphore
+            )
+            session.visited.update(start.values())
+
+        if session.unexpanded and session.current_depth <= session.depth:
+            await self._expand_last_level(session, semaphore)
+
+        for batch in session.levels():
+            titles = session.admit(batch.titles)
+            pages = await self._fetch_level(
+                titles, batch.with_links, semaphore, session, listener
+            )
+
+            if batch.with_links and self.title_resolver is not None and not session.truncated:
+                pages = await self._resolve_links(pages, semaphore, session)
+
+            session.complete_level(batch, pages)
+            if listener is not None:
+                listener.level_done(session, batch)
+
+    async def _fetch_level(
+        self,
+        titles: List[str],
+        with_links: bool,
+        semaphore: asyncio.Semaphore,
+        session: CrawlSession,
+        listener: Optional[CrawlListener] = None,
+    ) -> Dict[str, Optional[ProcessedArticle]]:
+        """
+        Fetch the articles of one level concurrently, until the deadline.
+
+        Args:
+            titles: The admitted article titles of the level.
+            with_links: Whether the outgoing links are needed.
+            semaphore: The semaphore bounding concurrent requests.
+            session: The crawl session, truncated if the deadline passes.
+            listener: An optional receiver of the fetched articles.
+
+        Returns:
+            The processed articles by title, None for articles that could not
+            be fetched. Articles still pending at the deadline are left out.
+        """
+        pages, jobs = self._create_jobs(titles, with_links, semaphore, session)
+        tasks = [asyncio.ensure_future(job) for job in jobs]
+        if listener is not None:
+            for title, page in pages.items():
+                listener.article_done(title, page)
+            for task in tasks:
+                task.add_done_callback(functools.partial(self._notify_listener, listener))
+
+        try:
+            if tasks:
+                _, pending = await asyncio.wait(tasks, timeout=session.time_remaining())
+                if pending:
+                    session.truncate(TRUNCATED_TIME_LIMIT)
+        finally:
+            unfinished = [task for task in tasks if not task.done()]
+            for task in unfinished:
+                task.cancel()
+            session.stats.fetches_cancelled += len(unfinished)
+            self.fetches_cancelled += len(unfinished)
+            if unfinished:
+                await asyncio.gather(*unfinished, return_exceptions=True)
+
+        for task in tasks:
+            if not task.cancelled():
+                pages.update(task.result())
+        return pages
+
+    async def _expand_last_level(
+        self, session: CrawlSession, semaphore: asyncio.Semaphore
+    ) -> None:
+        """
+        Build the frontier of a deepened crawl from the links of its last level.
+
+        A finished crawl only keeps the titles of its last level, so a crawl
+        that is never deepened costs no link requests or link processing for
+        it. The links come from the article cache or store while the articles
+        are there; evicted articles are fetched again, counting against the
+        budget, but their words are not counted again. Redirects among the
+        links are resolved as for any level, except that a failure to resolve
+        them never truncates the crawl.
+
+        Args:
+            session: The resumed crawl session.
+            semaphore: The semaphore bounding concurrent requests.
+        """
+        pages = await self._fetch_level(session.unexpanded, True, semaphore, session)
+        if session.truncated:
+            return
+        if self.title_resolver is not None:
+            pages = await self._resolve_links(pages, semaphore, session, fallback=True)
+        session.expand_last_level(pages)
+
+    @staticmethod
+    def _notify_listener(listener: CrawlListener, task: asyncio.Future) -> None:
+        """Tell a listener about the articles of a finished fetch."""
+        if not task.cancelled() and task.exception() is None:
+            for title, page in task.result().items():
+                listener.article_done(title, page)
+
+    def _create_jobs(
+        self,
+        titles: List[str],
+        with_links: bool,
+        semaphore: asyncio.Semaphore,
+        session: CrawlSession,
+    ) -> Tuple[Dict[str, ProcessedArticle], list]:
+        """
+        Plan the fetches of one depth level for the configured backend.
+
+        Args:
+            titles: The admitted article titles of the level.
+            with_links: Whether the outgoing links are needed.
+            semaphore: The semaphore bounding concurrent requests.
+            session: The crawl session.
+
+        Returns:
+            The articles already available without a request, and the
+            coroutines fetching the others, each returning processed articles
+            by title.
+        """
+        if self.backend == BACKEND_PARSE:
+            return {}, [
+                self._fetch_page(title, with_links, semaphore, session)
+                for title in titles
+            ]
+
+        pages = {}
+        uncached = []
+        for title in titles:
+            processed = self.client.article_cache.get(self._extract_cache_key(title))
+            if processed is not None:
+                pages[title] = processed
+            else:
+                uncached.append(title)
+
+        return pages, [
+            self._fetch_batch(chunk, with_links, semaphore, session)
+            for chunk in self.query_fetcher.chunk(uncached)
+        ]
+
+    @staticmethod
+    def _extract_cache_key(article_title: str) -> Tuple[str, str]:
+        """
+        Build the article cache key of an article fetched as a plain-text extract.
+
+        Extracts yield slightly different words than rendered pages, so they are
+        cached separately.
+
+        Args:
+            article_title: The title of the Wikipedia article.
+
+        Returns:
+            The cache key.
+        """
+        return (BACKEND_QUERY, WikipediaClient.cache_key(article_title))
+
+    async def _fetch_page(
+        self,
+        article_title: str,
+        with_links: bool,
+        semaphore: asyncio.Semaphore,
+        session: CrawlSession,
+    ) -> Dict[str, Optional[ProcessedArticle]]:
+        """
+        Fetch one article with the "parse" backend.
+
+        Args:
+            article_title: The title of the Wikipedia article.
+            with_links: Whether the outgoing links are needed.
+            semaphore: The semaphore bounding concurrent fetches.
+            session: The crawl session.
+
+        Returns:
+            The processed article by title, or nothing if it was skipped.
+        """
+        page = await self._fetch(article_title, with_links, semaphore, session)
+        if page is SKIPPED:
+            return {}
+        return {article_title: page}
+
+    async def _fetch_batch(
+        self,
+        titles: List[str],
+        with_links: bool,
+        semaphore: asyncio.Semaphore,
+        session: CrawlSession,
+    ) -> Dict[str, Optional[ProcessedArticle]]:
+        """
+        Fetch a batch of articles with the "query" backend.
+
+        The links of the batch are fetched with multi-title queries, holding
+        one slot of the concurrency limit. TextExtracts returns one whole
+        extract per response, so the extracts are then fetched one article at
+        a time, concurrently, each holding its own slot. The budget is checked
+        once for the whole batch. Batched articles bypass the article store,
+        which keeps rendered pages by revision.
+
+        Args:
+            titles: The article titles, at most the fetcher's batch size.
+            with_links: Whether the outgoing links are needed.
+            semaphore: The semaphore bounding concurrent requests.
+            session: The crawl session, whose budget is checked before downloading.
+
+        Returns:
+            The processed articles by title, None for articles that don't
+            exist, or nothing if the budget ran out before the batch was fetched.
+        """
+        async with semaphore:
+            if not session.can_download():
+                return {}
+
+            try:
+                pages = await self.query_fetcher.fetch_links(
+                    self.http_client,
+                    titles,
+                    with_links or self.client.caching_enabled,
+                    on_download=session.record_download,
+                )
+            except ValueError:
+                # If the query is rejected, skip its articles
+                return {title: None for title in titles}
+            except httpx.HTTPError:
+                # If upstream keeps failing after retries, skip them too
+                session.stats.fetches_failed += 1
+                return {title: None for title in titles}
+
+        # Aliases of the same page in a batch share its extract
+        page_titles = list(
+            dict.fromkeys(page[0] for page in pages.values() if page is not None)
+        )
+        extracts = dict(
+            zip(
+                page_titles,
+                await asyncio.gather(
+                    *(
+                        self._fetch_extract(title, semaphore, session)
+                        for title in page_titles
+                    )
+                ),
+            )
+        )
+
+        result = {}
+        for title, page in pages.items():
+            processed = result[title] = (
+                None if page is None else build_article(page, extracts[page[0]])
+            )
+            if processed is not None:
+                self.client.article_cache.set(self._extract_cache_key(title), processed)
+        return result
+
+    async def _fetch_extract(
+        self, page_title: str, semaphore: asyncio.Semaphore, session: CrawlSession
+    ) -> Optional[str]:
+        """
+        Fetch the extract of one article with the "query" backend.
+
+        Args:
+            page_title: The title of the article's page.
+            semaphore: The semaphore bounding concurrent requests.
+            session: The crawl session, counting the download.
+
+        Returns:
+            The extract, or None if the article doesn't exist or can't be fetched.
+        """
+        async with semaphore:
+            try:
+                return await self.query_fetcher.fetch_extract(
+                    self.http_client, page_title, on_download=session.record_download
+                )
+            except ValueError:
+                return None
+            except httpx.HTTPError:
+                session.stats.fetches_failed += 1
+                return None
+
+    async def _resolve_links(
+        self,
+        pages: Dict[str, Optional[ProcessedArticle]],
+        semaphore: asyncio.Semaphore,
+        session: CrawlSession,
+        fallback: bool = False,
+    ) -> Dict[str, Optional[ProcessedArticle]]:
+        """
+        Resolve the links of a level's articles to canonical titles.
+
+        Every distinct link of the level is resolved once, in batches, so that
+        redirect aliases of an article are not queued as separate articles. If
+        the deadline passes, the crawl is truncated and no links are followed.
+
+        Args:
+            pages: The processed articles of the level by title.
+            semaphore: The semaphore bounding concurrent requests.
+            session: The crawl session.
+            fallback: Whether to give resolving at most half of the remaining
+                      time and follow the links unresolved if it runs out,
+                      rather than truncating the crawl; an alias may then be
+                      fetched along with its target.
+
+        Returns:
+            The processed articles with resolved links. Cached articles are
+            left untouched; resolved copies are returned instead.
+        """
+        links = list(
+            dict.fromkeys(
+                link for page in pages.values() if page is not None for link in page.links
+            )
+        )
+        if not links:
+            return pages
+
+        timeout = session.time_remaining()
+        if fallback and timeout is not None:
+            timeout /= 2
+        try:
+            resolved = await asyncio.wait_for(
+                self.title_resolver.resolve(self.http_client, links, semaphore),
+                timeout=timeout,
+            )
+        except asyncio.TimeoutError:
+            if not fallback:
+                session.truncate(TRUNCATED_TIME_LIMIT)
+            return pages
+
+        return {
+            title: None
+            if page is None
+            else ProcessedArticle(
+                page.word_counts, [resolved[link] for link in page.links]
+            )
+            for title, page in pages.items()
+        }
+
+    async def _fetch(
+        self,
+        article_title: str,
+        with_links: bool,
+        semaphore: asyncio.Semaphore,
+        session: CrawlSession,
+    ):
+        """
+        Fetch an article while holding a slot of the concurrency limit and parse it
+        in the executor. Articles found in the client's article cache or store are
+        not fetched again, and are not parsed again if their word counts were
+        stored. With the "api" link source, the links come with the page and the
+        HTML is only parsed for words; stored HTML falls back to HTML links.
+
+        Args:
+            article_title: The title of the Wikipedia article.
+            with_links: Whether the outgoing links are needed.
+            semaphore: The semaphore bounding concurrent fetches.
+            session: The crawl session, whose budget is checked before downloading.
+
+        Returns:
+            The processed article, None if it doesn't exist, or SKIPPED if the
+            budget ran out before it could be downloaded.
+        """
+        processed = self.client.get_cached_article(article_title)
+        if processed is not None:
+            return processed
+
+        stored = await self._get_stored_article(article_title)
+        if stored is not None and stored.processed is not None:
+            self.client.cache_article(article_title, stored.processed)
+            return stored.processed
+
+        links = None
+        if stored is not None and stored.html is not None:
+            html_content = stored.html
+            await self.parse_queue.reserve()
+        else:
+            async with semaphore:
+                if not session.can_download():
+                    return SKIPPED
+
+                try:
+                    html_content, links = await self._download_page(
+                        article_title, self.link_source == LINK_SOURCE_API
+                    )
+                except ValueError:
+                    # If the article doesn't exist, skip it
+                    return None
+                except httpx.HTTPError:
+                    # If upstream keeps failing after retries, skip it too
+                    session.stats.fetches_failed += 1
+                    return None
+                session.record_download(len(html_content.encode("utf-8")))
+                # Keep the fetch slot until the parse pool can take the
+                # article, so downloads slow down to the parsing rate
+                await self.parse_queue.reserve()
+
+        # Links are only extracted from the HTML when the API didn't list them
+        processed = await self.parse_queue.run(
+            process_html,
+            self.client.processor,
+            html_content,
+            links is None and (with_links or self.client.caching_enabled),
+        )
+        if links is not None:
+            processed = ProcessedArticle(processed.word_counts, links)
+        self.client.cache_article(article_title, processed)
+        if self.client.article_store is not None:
+            await asyncio.to_thread(
+                self.client.store_processed_article, article_title, processed
+            )
+        return processed
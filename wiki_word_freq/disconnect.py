@@ -0,0 +1,68 @@
+"""
+Module for cancelling work whose client has disconnected.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Dict
+
+from fastapi import Request
+
+
+class ClientDisconnectedError(Exception):
+    """Raised when the client of a request disconnected before its response."""
+
+
+class DisconnectWatcher:
+    """
+    Runs the work of a request and cancels it when the client disconnects.
+
+    The server keeps running a handler after its client has gone away, so a
+    long crawl would otherwise run to completion for nobody. The connection is
+    checked every ``poll_interval`` seconds while the work is pending.
+    """
+
+    def __init__(self, poll_interval: float = 0.5):
+        """
+        Initialize the watcher.
+
+        Args:
+            poll_interval: The number of seconds between disconnect checks.
+        """
+        if poll_interval <= 0:
+            raise ValueError("poll_interval must be positive")
+
+        self.poll_interval = poll_interval
+        self.disconnects = 0
+
+    async def run(self, request: Request, work: Awaitable[Any]) -> Any:
+        """
+        Await some work unless the client of a request disconnects first.
+
+        Args:
+            request: The request whose client is watched.
+            work: The work to await.
+
+        Returns:
+            The result of the work.
+
+        Raises:
+            ClientDisconnectedError: If the client disconnected; the work has
+                                     then been cancelled.
+        """
+        task = asyncio.ensure_future(work)
+        try:
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=self.poll_interval)
+                if done:
+                    return task.result()
+                if await request.is_disconnected():
+                    self.disconnects += 1
+                    raise ClientDisconnectedError("The client disconnected")
+        finally:
+            if not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+    def info(self) -> Dict[str, int]:
+        """Return the number of requests cancelled by a disconnect."""
+        return {"disconnects": self.disconnects}
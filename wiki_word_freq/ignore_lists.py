@@ -0,0 +1,147 @@
+"""
+Module for the ignore lists of words left out of word frequencies.
+"""
+
+import os
+from typing import Dict, Iterable, Mapping, Optional
+
+# Common English words, as split by the word pattern of the extractor, which
+# cuts contractions at the apostrophe ("don't" gives "don" and "t")
+ENGLISH_STOPWORDS = """
+a about above after again against ain all am an and any are aren as at be because been
+before being below between both but by can couldn d did didn do does doesn doing don down
+during each few for from further had hadn has hasn have haven having he her here hers herself
+him himself his how i if in into is isn it its itself just ll m ma me mightn more most mustn
+my myself needn no nor not now o of off on once only or other our ours ourselves out over own
+re s same shan she should shouldn so some such t than that the their theirs them themselves
+then there these they this those through to too under until up ve very was wasn we were weren
+what when where which while who whom why will with won wouldn y you your yours yourself
+yourselves
+""".split()
+
+# Ignore lists available on every server
+BUILTIN_IGNORE_LISTS = {"english-stopwords": ENGLISH_STOPWORDS}
+
+# Extension of the files of an ignore list directory
+IGNORE_LIST_SUFFIX = ".txt"
+
+
+class IgnoreSet(frozenset):
+    """Compiled ignore list: a set of lowercase words, ready to be looked up."""
+
+
+def compile_ignore_list(words: Optional[Iterable[str]]) -> IgnoreSet:
+    """
+    Compile an ignore list into a set of lowercase words.
+
+    Extracted words are lowercase, so ignored words are lowercased once here
+    instead of lowercasing every word they are compared with.
+
+    Args:
+        words: The words to ignore, or an already compiled list.
+
+    Returns:
+        The compiled list.
+    """
+    if isinstance(words, IgnoreSet):
+        return words
+    return IgnoreSet(word.lower() for word in words or ())
+
+
+class IgnoreListRegistry:
+    """
+    Named ignore lists registered on the server.
+
+    Lists are compiled once when they are registered, so a request naming a
+    list sends neither its words nor costs compiling it.
+    """
+
+    def __init__(self, lists: Optional[Mapping[str, Iterable[str]]] = None):
+        """
+        Initialize the registry.
+
+        Args:
+            lists: The lists to register by name; the built-in lists if omitted.
+        """
+        self._lists: Dict[str, IgnoreSet] = {}
+        for name, words in (BUILTIN_IGNORE_LISTS if lists is None else lists).items():
+            self.register(name, words)
+
+    def register(self, name: str, words: Iterable[str]) -> None:
+        """
+        Register a list, replacing any list of the same name.
+
+        Args:
+            name: The name of the list.
+            words: The words of the list.
+        """
+        self._lists[name] = compile_ignore_list(words)
+
+    def load_directory(self, path: str) -> None:
+        """
+        Register every ``<name>.txt`` file of a directory as a list.
+
+        Files hold one word per line; blank lines and lines starting with
+        ``#`` are skipped.
+
+        Args:
+            path: The directory.
+        """
+        for filename in sorted(os.listdir(path)):
+            if not filename.endswith(IGNORE_LIST_SUFFIX):
+                continue
+            with open(os.path.join(path, filename), encoding="utf-8") as f:
+                words = [
+                    line.strip()
+                    for line in f
+                    if line.strip() and not line.lstrip().startswith("#")
+                ]
+            self.register(filename[: -len(IGNORE_LIST_SUFFIX)], words)
+
+    def get(self, name: str) -> IgnoreSet:
+        """
+        Get a registered list.
+
+        Args:
+            name: The name of the list.
+
+        Returns:
+            The compiled list.
+
+        Raises:
+            ValueError: If no list has this name.
+        """
+        try:
+            return self._lists[name]
+        except KeyError:
+            raise ValueError(
+                f"Unknown ignore list '{name}', expected one of {', '.join(sorted(self._lists))}"
+            ) from None
+
+    def resolve(
+        self, name: Optional[str], words: Optional[Iterable[str]] = None
+    ) -> Optional[IgnoreSet]:
+        """
+        Combine a registered list with the words of a request.
+
+        Args:
+            name: The name of a registered list, or None.
+            words: Additional words to ignore.
+
+        Returns:
+            The compiled combination, the registered list itself if there are
+            no additional words, or None if there is nothing to ignore.
+
+        Raises:
+            ValueError: If no list has this name.
+        """
+        if name is None:
+            return compile_ignore_list(words) if words else None
+        named = self.get(name)
+        if not words:
+            return named
+        return IgnoreSet(named | compile_ignore_list(words))
+
+    def info(self) -> Dict[str, int]:
+        """Return the number of words of every registered list, by name."""
+        return {name: len(words) for name, words in sorted(self._lists.items())}
@@ -0,0 +1,486 @@
+"""
+Module for running deep crawls as background jobs.
+"""
+
+import asyncio
+import dataclasses
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from wiki_word_freq.processing import ProcessedArticle
+from wiki_word_freq.session import CrawlListener, CrawlSession, LevelBatch
+from wiki_word_freq.workers import create_executor, run_in_executor
+
+# Job states
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+FINISHED_STATES = (JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    request TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    progress TEXT NOT NULL,
+    result TEXT,
+    error TEXT
+);
+"""
+
+
+class JobQueueFullError(RuntimeError):
+    """Raised when a job is submitted while the queue is full."""
+
+
+@dataclass
+class Job:
+    """A crawl submitted to run in the background."""
+
+    id: str
+    # The parameters of the crawl, as submitted
+    request: Dict[str, Any]
+    status: str = JOB_QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    progress: Dict[str, Any] = field(default_factory=dict)
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        """Whether the job has stopped, successfully or not."""
+        return self.status in FINISHED_STATES
+
+    def info(self) -> Dict[str, Any]:
+        """Describe the job without its result."""
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "request": self.request,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "progress": dict(self.progress),
+            "error": self.error,
+        }
+
+    def copy(self) -> "Job":
+        """
+        Copy the state of the job, e.g. to serialize it while the job goes on.
+
+        The request and the result are shared, as they don't change once set.
+
+        Returns:
+            The copy.
+        """
+        return dataclasses.replace(self, progress=dict(self.progress))
+
+    def approximate_size(self) -> int:
+        """
+        Estimate the memory held by the job, for bounding the finished jobs.
+
+        Only the number of words of the result is looked at, so this is cheap
+        however large the result.
+
+        Returns:
+            The estimated size in bytes.
+        """
+        # Roughly a str object plus an entry in the count and frequency
+        # dictionaries per word
+        words = len(self.result.get("word_count", ())) if self.result else 0
+        return 1024 + 250 * words
+
+    def to_row(self) -> tuple:
+        """Serialize the job for the job store."""
+        return (
+            self.id,
+            self.status,
+            json.dumps(self.request),
+            self.created_at,
+            self.started_at,
+            self.finished_at,
+            json.dumps(self.progress),
+            json.dumps(self.result) if self.result is not None else None,
+            self.error,
+        )
+
+    @classmethod
+    def from_row(cls, row: tuple) -> "Job":
+        """Deserialize a job read from the job store."""
+        (
+            job_id,
+            status,
+            request,
+            created_at,
+            started_at,
+            finished_at,
+            progress,
+            result,
+            error,
+        ) = row
+        return cls(
+            id=job_id,
+            request=json.loads(request),
+            status=status,
+            created_at=created_at,
+            started_at=started_at,
+            finished_at=finished_at,
+            progress=json.loads(progress),
+            result=json.loads(result) if result is not None else None,
+            error=error,
+        )
+
+
+class JobStore:
+    """
+    SQLite-backed store of job states and results.
+
+    Like the article store, the database runs in WAL mode with one connection
+    per thread. Jobs are owned by the process that runs them, so a job store
+    should not be shared by several server processes.
+    """
+
+    def __init__(self, path: str, busy_timeout: float = 30.0):
+        """
+        Initialize the store, creating the database if needed.
+
+        Args:
+            path: The path of the SQLite database file.
+            busy_timeout: The number of seconds to wait for a lock.
+        """
+        self.path = path
+        self.busy_timeout = busy_timeout
+        # sqlite3 connections must not be shared between threads
+        self._local = threading.local()
+
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get the connection of the current thread."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path, timeout=self.busy_timeout, isolation_level=None
+            )
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def close(self) -> None:
+        """Close the connection of the current thread."""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def save(self, row: tuple) -> None:
+        """
+        Write the state of a job.
+
+        Args:
+            row: The job, serialized with ``Job.to_row``.
+        """
+        self._connection().execute(
+            "INSERT OR REPLACE INTO jobs (id, status, request, created_at, "
+            "started_at, finished_at, progress, result, error) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            row,
+        )
+
+    def get(self, job_id: str, with_result: bool = True) -> Optional[Job]:
+        """
+        Read a job.
+
+        Args:
+            job_id: The job ID.
+            with_result: Whether to read the result too, rather than only the
+                         state of the job.
+
+        Returns:
+            The job, or None if it is unknown.
+        """
+        result = "result" if with_result else "NULL"
+        row = self._connection().execute(
+            "SELECT id, status, request, created_at, started_at, finished_at, "
+            f"progress, {result}, error FROM jobs WHERE id = ?",
+            (job_id,),
+        ).fetchone()
+        return Job.from_row(row) if row is not None else None
+
+    def mark_interrupted(self, clock: Callable[[], float] = time.time) -> int:
+        """
+        Mark jobs left queued or running by a previous server process as failed.
+
+        Returns:
+            The number of interrupted jobs.
+        """
+        cursor = self._connection().execute(
+            "UPDATE jobs SET status = ?, finished_at = ?, error = ? "
+            "WHERE status IN (?, ?)",
+            (
+                JOB_FAILED,
+                clock(),
+                "Interrupted by a server restart",
+                JOB_QUEUED,
+                JOB_RUNNING,
+            ),
+        )
+        return cursor.rowcount
+
+
+class JobProgress(CrawlListener):
+    """Crawl listener recording the progress of a job."""
+
+    def __init__(self, job: Job, on_level: Optional[Callable[[Job], None]] = None):
+        """
+        Initialize the listener.
+
+        Args:
+            job: The job whose progress is recorded.
+            on_level: Called after every completed level, e.g. to persist the job.
+        """
+        self.job = job
+        self.on_level = on_level
+        job.progress.update(
+            {
+                "depth": None,
+                "articles_fetched": 0,
+                "articles_missing": 0,
+                "bytes_downloaded": 0,
+                "truncated": False,
+            }
+        )
+
+    def article_done(self, title: str, page: Optional[ProcessedArticle]) -> None:
+        """Count a fetched article."""
+        key = "articles_missing" if page is None else "articles_fetched"
+        self.job.progress[key] += 1
+
+    def level_done(self, session: CrawlSession, batch: LevelBatch) -> None:
+        """Record the depth completed, the bytes downloaded and truncation."""
+        self.job.progress["depth"] = batch.depth
+        self.job.progress["bytes_downloaded"] = session.stats.bytes_downloaded
+        self.job.progress["truncated"] = session.truncated
+        if self.on_level is not None:
+            self.on_level(self.job)
+
+
+# Runs the crawl of a job, reporting to the listener, and returns its result
+JobRunner = Callable[[Job, CrawlListener], Awaitable[Dict[str, Any]]]
+
+
+class JobManager:
+    """
+    Bounded pool running crawl jobs in the background.
+
+    At most ``max_running`` jobs run at once; up to ``max_queued`` more wait
+    for a slot. Job states are kept in memory and, if a store is given, written
+    to disk whenever they change, in order, by a single writer thread, which
+    also serializes them. With a store, finished jobs are kept in memory
+    without their results, which are read back from the store; without one,
+    finished jobs are bounded by the estimated size of their results too.
+    Finished jobs beyond ``max_finished`` are dropped from memory but stay
+    readable from the store.
+    """
+
+    def __init__(
+        self,
+        runner: JobRunner,
+        max_running: int = 2,
+        max_queued: int = 100,
+        max_finished: int = 1000,
+        store: Optional[JobStore] = None,
+        max_finished_bytes: Optional[int] = 256 * 1024 * 1024,
+    ):
+        """
+        Initialize the manager.
+
+        Args:
+            runner: The coroutine function running the crawl of a job.
+            max_running: The maximum number of jobs running at once.
+            max_queued: The maximum number of jobs waiting to run.
+            max_finished: The number of finished jobs kept in memory.
+            store: An optional on-disk store of job states and results.
+            max_finished_bytes: The maximum estimated memory used by finished
+                                jobs kept in memory; the last finished job is
+                                kept even if it is larger.
+        """
+        if max_running < 1:
+            raise ValueError("max_running must be at least 1")
+
+        self.runner = runner
+        self.max_running = max_running
+        self.max_queued = max_queued
+        self.max_finished = max_finished
+        self.max_finished_bytes = max_finished_bytes
+        self.store = store
+        self._jobs: Dict[str, Job] = {}
+        self._finished: "OrderedDict[str, Job]" = OrderedDict()
+        self._finished_bytes = 0
+        self._tasks: Dict[str, "asyncio.Task[None]"] = {}
+        self._slots: Optional[asyncio.Semaphore] = None
+        # A single writer keeps the writes of a job in order
+        self._writer = create_executor("thread", 1) if store is not None else None
+
+    @property
+    def queued(self) -> int:
+        """The number of jobs waiting for a slot."""
+        return sum(1 for job in self._jobs.values() if job.status == JOB_QUEUED)
+
+    @property
+    def running(self) -> int:
+        """The number of running jobs."""
+        return sum(1 for job in self._jobs.values() if job.status == JOB_RUNNING)
+
+    async def submit(self, request: Dict[str, Any]) -> Job:
+        """
+        Queue a crawl job.
+
+        Args:
+            request: The parameters of the crawl, passed on to the runner.
+
+        Returns:
+            The queued job.
+
+        Raises:
+            JobQueueFullError: If ``max_queued`` jobs are already waiting.
+        """
+        if self.queued >= self.max_queued:
+            raise JobQueueFullError("Too many jobs are waiting to run")
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_running)
+
+        job = Job(id=uuid.uuid4().hex, request=request)
+        self._jobs[job.id] = job
+        await self._save(job)
+        self._tasks[job.id] = asyncio.ensure_future(self._run(job))
+        return job
+
+    async def get(self, job_id: str, with_result: bool = True) -> Optional[Job]:
+        """
+        Look up a job.
+
+        Args:
+            job_id: The job ID.
+            with_result: Whether the result of a completed job is needed; it
+                         is then read from the store if it isn't in memory.
+
+        Returns:
+            The job, or None if it is unknown.
+        """
+        job = self._jobs.get(job_id) or self._finished.get(job_id)
+        if self.store is not None and (
+            job is None
+            or (with_result and job.status == JOB_COMPLETED and job.result is None)
+        ):
+            job = await run_in_executor(self._writer, self.store.get, job_id, with_result)
+        return job
+
+    async def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Cancel a queued or running job; finished jobs are left as they are.
+
+        Args:
+            job_id: The job ID.
+
+        Returns:
+            The job, or None if it is unknown.
+        """
+        job = self._jobs.get(job_id)
+        if job is not None:
+            await self._cancel(job)
+        return await self.get(job_id, with_result=False)
+
+    async def join(self) -> None:
+        """Wait for every queued and running job to finish."""
+        while self._tasks:
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    async def aclose(self) -> None:
+        """Cancel every unfinished job and wait for the state to be written."""
+        await asyncio.gather(*(self._cancel(job) for job in list(self._jobs.values())))
+        if self._writer is not None:
+            self._writer.shutdown(wait=True)
+
+    async def _cancel(self, job: Job) -> None:
+        """Cancel the task of a job and wait for it to stop."""
+        # The job may have finished since it was looked up
+        task = self._tasks.get(job.id)
+        if task is None or task.done():
+            return
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        if not job.finished:
+            # The task was cancelled before it started running
+            job.status = JOB_CANCELLED
+            await self._finish(job)
+
+    async def _run(self, job: Job) -> None:
+        """Wait for a slot, run the job and record how it ended."""
+        try:
+            async with self._slots:
+                job.status = JOB_RUNNING
+                job.started_at = time.time()
+                await self._save(job)
+
+                listener = JobProgress(job, on_level=self._save_soon)
+                job.result = await self.runner(job, listener)
+                job.status = JOB_COMPLETED
+        except asyncio.CancelledError:
+            job.status = JOB_CANCELLED
+        except Exception as e:
+            job.status = JOB_FAILED
+            job.error = str(e)
+        finally:
+            await asyncio.shield(self._finish(job))
+
+    async def _finish(self, job: Job) -> None:
+        """Record the final state of a stopped job and move it to the finished jobs."""
+        job.finished_at = time.time()
+        # The job is written before it leaves the running jobs, so that its
+        # result can be read back from the store from then on
+        await self._save(job)
+        self._tasks.pop(job.id, None)
+        self._jobs.pop(job.id, None)
+
+        if self.store is not None:
+            job = dataclasses.replace(job, result=None)
+        self._finished[job.id] = job
+        self._finished_bytes += job.approximate_size()
+        while len(self._finished) > self.max_finished or (
+            self.max_finished_bytes is not None
+            and self._finished_bytes > self.max_finished_bytes
+            and len(self._finished) > 1
+        ):
+            _, dropped = self._finished.popitem(last=False)
+            self._finished_bytes -= dropped.approximate_size()
+
+    async def _save(self, job: Job) -> None:
+        """Write the state of a job to the store, if there is one."""
+        if self.store is not None:
+            await run_in_executor(self._writer, self._write, job.copy())
+
+    def _save_soon(self, job: Job) -> None:
+        """Queue a write of the state of a job without waiting for it."""
+        if self.store is not None:
+            self._writer.submit(self._write, job.copy())
+
+    def _write(self, job: Job) -> None:
+        """Serialize a job and write it, on the writer thread."""
+        # Encoding a large result takes a while, so it stays off the event loop
+        self.store.save(job.to_row())
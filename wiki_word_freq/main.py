@@ -2,61 +2,648 @@
 Main module for the Wikipedia Word-Frequency Dictionary API.
 """
 
+import os
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Literal, Optional, Tuple
+
 import uvicorn
-from fastapi import FastAPI, HTTPException, Query
+import httpx
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
-from wiki_word_freq.models import WordFrequencyResponse, KeywordsRequest
+from wiki_word_freq.approximate import (
+    COUNTING_APPROXIMATE,
+    COUNTING_EXACT,
+    ApproximateWordCounter,
+)
+from wiki_word_freq.cache import LRUCache
+from wiki_word_freq.config import Settings
+from wiki_word_freq.crawler import AsyncWikipediaCrawler
+from wiki_word_freq.disconnect import ClientDisconnectedError, DisconnectWatcher
+from wiki_word_freq.ignore_lists import IgnoreListRegistry, IgnoreSet
+from wiki_word_freq.jobs import Job, JobManager, JobQueueFullError, JobStore
+from wiki_word_freq.models import (
+    CrawlRequest,
+    JobResponse,
+    KeywordsRequest,
+    WordFrequencyResponse,
+)
+from wiki_word_freq.processing import create_processor
+from wiki_word_freq.query import BatchQueryFetcher
+from wiki_word_freq.result_cache import ResultCache
+from wiki_word_freq.serialization import (
+    FORMAT_JSON,
+    RESPONSE_MEDIA_TYPES,
+    build_payload,
+    choose_response_format,
+    compress,
+    encode_payload,
+)
+from wiki_word_freq.session import (
+    CrawlBudget,
+    CrawlListener,
+    CrawlSession,
+    ListenerGroup,
+    TRUNCATED_TIME_LIMIT,
+)
+from wiki_word_freq.snapshots import SnapshotStore
+from wiki_word_freq.store import ArticleStore
+from wiki_word_freq.streaming import (
+    MEDIA_TYPES,
+    ProgressStream,
+    choose_format,
+    encode_event,
+)
+from wiki_word_freq.titles import TitleResolver
+from wiki_word_freq.transport import AdaptiveLimiter, RetryPolicy
 from wiki_word_freq.wikipedia import WikipediaClient
-from wiki_word_freq.word_frequency import WordFrequencyAnalyzer
+from wiki_word_freq.word_frequency import create_analyzer
+from wiki_word_freq.workers import create_executor, run_in_executor
+
+settings = Settings.from_env()
+
+# Initialize the Wikipedia client, crawler and word frequency analyzer. Parsing
+# runs in the parse pool, counting and encoding in the worker pool, so that
+# they never block the event loop.
+worker_pool = create_executor(settings.worker_pool, settings.worker_count)
+parse_workers = settings.parse_workers or os.cpu_count() or 1
+parse_pool = create_executor(settings.parse_pool, parse_workers)
+wikipedia_client = WikipediaClient(
+    create_processor(settings.html_backend),
+    WikipediaClient.create_article_cache(
+        max_entries=settings.article_cache_entries,
+        max_bytes=settings.article_cache_bytes,
+        ttl=settings.article_cache_ttl,
+    ),
+    ArticleStore(
+        settings.article_store_path, max_age=settings.article_store_max_age
+    )
+    if settings.article_store_path
+    else None,
+    timeout=(settings.http_connect_timeout, settings.http_read_timeout),
+)
+# Links are resolved to canonical titles through redirects, so that aliases
+# of an article are only fetched once
+query_fetcher = BatchQueryFetcher(wikipedia_client.api_url)
+title_resolver = TitleResolver(
+    query_fetcher,
+    LRUCache(max_entries=settings.title_cache_entries, ttl=settings.title_cache_ttl),
+)
+crawler = AsyncWikipediaCrawler(
+    wikipedia_client,
+    max_concurrency=settings.max_concurrency,
+    executor=parse_pool,
+    backend=settings.fetch_backend,
+    query_fetcher=query_fetcher,
+    link_source=settings.link_source,
+    title_resolver=title_resolver,
+    timeout=httpx.Timeout(
+        settings.http_read_timeout, connect=settings.http_connect_timeout
+    ),
+    retry_policy=RetryPolicy(
+        max_retries=settings.http_max_retries,
+        backoff_base=settings.http_backoff_base,
+        backoff_max=settings.http_backoff_max,
+        max_retry_after=settings.http_max_retry_after,
+    ),
+    # All crawls share one client, so they share the adaptive limit
+    limiter=AdaptiveLimiter(
+        max_limit=settings.upstream_max_concurrency or settings.max_concurrency,
+        min_limit=settings.upstream_min_concurrency,
+    ),
+    parse_queue_size=settings.parse_queue_size or 2 * parse_workers,
+)
+word_frequency_analyzer = create_analyzer(settings.counting_engine)
+
+# Named ignore lists, compiled once, so requests only send their name
+ignore_lists = IgnoreListRegistry()
+if settings.ignore_lists_path:
+    ignore_lists.load_directory(settings.ignore_lists_path)
+
+# Server-side limits on the cost of a single crawl
+crawl_limits = CrawlBudget(
+    max_articles=settings.crawl_max_articles,
+    max_bytes=settings.crawl_max_bytes,
+    time_limit=settings.crawl_time_limit,
+)
+
+# Cache of whole results; identical concurrent requests share one computation
+result_cache = ResultCache(
+    max_entries=settings.result_cache_entries,
+    ttl=settings.result_cache_ttl,
+    max_bytes=settings.result_cache_bytes,
+)
+
+# Filtered word counts and their percentile index, shared by requests that
+# only differ in their percentile
+count_cache = ResultCache(
+    max_entries=settings.count_cache_entries,
+    ttl=settings.result_cache_ttl,
+    max_bytes=settings.count_cache_bytes,
+)
+
+# Complete crawls by start article; a deeper request continues from the
+# frontier of a shallower one instead of refetching its levels
+crawl_snapshots = SnapshotStore(
+    max_entries=settings.crawl_snapshot_entries,
+    max_bytes=settings.crawl_snapshot_bytes,
+    ttl=settings.crawl_snapshot_ttl,
+)
+
+# Crawls of clients that disconnected are cancelled instead of run for nobody
+disconnect_watcher = DisconnectWatcher(settings.disconnect_poll_interval)
+# Status of the response to a client that disconnected, which it never reads
+CLIENT_CLOSED_REQUEST = 499
+
+# Server-side limits on the cost of a crawl job
+job_limits = CrawlBudget(
+    max_articles=settings.job_max_articles,
+    max_bytes=settings.job_max_bytes,
+    time_limit=settings.job_time_limit,
+)
+job_store = JobStore(settings.job_store_path) if settings.job_store_path else None
+if job_store is not None:
+    # Jobs of a previous server process can't be resumed
+    job_store.mark_interrupted()
+
+
+async def run_job(job: Job, listener: CrawlListener) -> Dict[str, Any]:
+    """Run the crawl of a job within the job budgets."""
+    request = CrawlRequest(**job.request)
+    budget = CrawlBudget(
+        request.max_articles, request.max_bytes, request.time_limit
+    ).capped(job_limits)
+    return await compute_keywords(request, budget, listener)
+
+
+job_manager = JobManager(
+    run_job,
+    max_running=settings.job_workers,
+    max_queued=settings.job_queue_size,
+    store=job_store,
+    max_finished_bytes=settings.job_finished_bytes,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Cancel running jobs and release the shared resources on shutdown."""
+    yield
+    await job_manager.aclose()
+    if job_store is not None:
+        job_store.close()
+    await crawler.aclose()
+    if wikipedia_client.article_store is not None:
+        wikipedia_client.article_store.close()
+    worker_pool.shutdown(wait=False, cancel_futures=True)
+    parse_pool.shutdown(wait=False, cancel_futures=True)
+
+
+def is_cacheable(result: Dict[str, Any]) -> bool:
+    """Whether a result may be cached; results cut short by the deadline may not."""
+    return result.get("truncation_reason") != TRUNCATED_TIME_LIMIT
+
+
+def render_response(
+    result: Dict[str, Any],
+    limit: Optional[int],
+    offset: int,
+    sort: Optional[str],
+    response_format: str,
+    accept_encoding: Optional[str],
+) -> Tuple[bytes, Dict[str, str]]:
+    """
+    Encode the requested page of a computed result.
+
+    The body is encoded directly rather than through the response model, so
+    the words are not validated one by one.
+
+    Args:
+        result: The computed result, covering the whole vocabulary.
+        limit: The maximum number of words to return, or None for all.
+        offset: The number of words to skip.
+        sort: The order of the words, "count" or "word".
+        response_format: The response format, e.g. "json" or "compact".
+        accept_encoding: The value of the ``Accept-Encoding`` header.
+
+    Returns:
+        The encoded body and its headers.
+    """
+    words = None
+    if limit is not None or offset or sort is not None:
+        words = word_frequency_analyzer.select_words(
+            result["word_count"], limit, offset, sort
+        )
+
+    body = encode_payload(build_payload(result, words, response_format), response_format)
+    body, content_encoding = compress(body, accept_encoding)
+
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if content_encoding is not None:
+        headers["Content-Encoding"] = content_encoding
+    return body, headers
+
+
+async def send_result(
+    result: Dict[str, Any],
+    cache_status: Optional[str],
+    limit: Optional[int],
+    offset: int,
+    sort: Optional[str],
+    response_format: str,
+    accept_encoding: Optional[str],
+) -> Response:
+    """
+    Encode a result in the worker pool and wrap it in a response.
+
+    ``cache_status`` is sent as the ``X-Cache`` header, unless it is None.
+    """
+    body, headers = await run_in_executor(
+        worker_pool,
+        render_response,
+        result,
+        limit,
+        offset,
+        sort,
+        response_format,
+        accept_encoding,
+    )
+    if cache_status is not None:
+        headers["X-Cache"] = cache_status
+    return Response(
+        body, media_type=RESPONSE_MEDIA_TYPES[response_format], headers=headers
+    )
+
+
+def render_result_event(
+    word_count: Dict[str, int],
+    limit: Optional[int],
+    truncated: bool,
+    truncation_reason: Optional[str],
+    stream_format: str,
+) -> str:
+    """
+    Compute the frequencies of streamed word counts and encode the final event.
+
+    Args:
+        word_count: The merged word counts of the crawl.
+        limit: The maximum number of most frequent words to send, or None for all.
+        truncated: Whether a budget ran out.
+        truncation_reason: The budget that ran out, if any.
+        stream_format: The stream format, 'ndjson' or 'sse'.
+
+    Returns:
+        The encoded ``result`` event.
+    """
+    result = word_frequency_analyzer.calculate_word_frequencies({"": word_count})
+    words = None
+    if limit is not None:
+        words = word_frequency_analyzer.select_words(result["word_count"], limit)
+
+    result["truncated"] = truncated
+    result["truncation_reason"] = truncation_reason
+    event = {"event": "result", **build_payload(result, words, FORMAT_JSON)}
+    return encode_event(event, stream_format)
+
+
+async def crawl_words(
+    article: str,
+    depth: int,
+    budget: CrawlBudget,
+    counting: str = COUNTING_EXACT,
+    ignore_list: Optional[IgnoreSet] = None,
+    listener: Optional[CrawlListener] = None,
+) -> Tuple[Dict[str, Any], CrawlSession, Optional[int], Optional[int]]:
+    """
+    Crawl from an article and collect the words of the fetched articles.
+
+    With exact counting, a complete crawl is kept as a snapshot, and a later
+    crawl of the same article at the same or a greater depth continues from
+    it, so only the new levels are fetched. The counts of a crawl that is
+    kept are merged in the worker pool and given as one entry, as are the
+    counts of the snapshot a crawl continued. With approximate counting,
+    words are merged into a fixed-size summary as articles arrive, skipping
+    ignored words, and the counts of single articles are not kept.
+
+    Args:
+        article: The title of the Wikipedia article to start from.
+        depth: The depth of traversal.
+        budget: The budget of the crawl, already capped.
+        counting: COUNTING_EXACT or COUNTING_APPROXIMATE.
+        ignore_list: The compiled words that approximate counting leaves out.
+        listener: An optional receiver of crawl progress notifications.
+
+    Returns:
+        The word counts by article, the finished session, and for approximate
+        counts, their error bound and the number of words counted, which
+        frequencies are relative to; both are None for exact counts.
+
+    Raises:
+        HTTPException: 404 if no article was found.
+    """
+    counter = None
+    snapshot = None
+    if counting == COUNTING_APPROXIMATE:
+        counter = ApproximateWordCounter(
+            capacity=settings.approx_capacity,
+            sketch_width=settings.approx_sketch_width,
+            sketch_depth=settings.approx_sketch_depth,
+            ignore_list=ignore_list,
+        )
+        listener = ListenerGroup([counter, listener])
+        session = CrawlSession(article, depth, budget=budget, keep_results=False)
+    else:
+        snapshot = crawl_snapshots.get(article, depth, budget)
+        if snapshot is not None:
+            # Copying the visited set of a large crawl takes a while
+            session = await run_in_executor(None, snapshot.resume, depth, budget)
+        else:
+            session = CrawlSession(
+                article, depth, budget=budget, keep_frontier=crawl_snapshots.enabled
+            )
+
+    # Traverse Wikipedia articles within the budget
+    session = await crawler.crawl(session, listener=listener)
+
+    if not session.stats.articles_fetched:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Article '{article}' not found or no content available",
+        )
+
+    if counter is not None:
+        return (
+            {article: counter.word_counts()},
+            session,
+            counter.error_bound(),
+            counter.total,
+        )
+
+    words_by_article = session.results
+    if snapshot is not None:
+        # New articles were not visited by the snapshot, so no title is the
+        # start article's
+        words_by_article = {snapshot.start_article: snapshot.word_counts, **words_by_article}
+    if crawl_snapshots.accepts(session):
+        # Snapshots keep merged counts only, not the counters of single articles
+        word_counts = await run_in_executor(
+            worker_pool, word_frequency_analyzer.merge_word_counts, words_by_article
+        )
+        await run_in_executor(None, crawl_snapshots.put, session, word_counts)
+        words_by_article = {session.start_article: word_counts}
+    return words_by_article, session, None, None
+
+
+def resolve_ignore_list(request: CrawlRequest) -> Optional[IgnoreSet]:
+    """
+    Compile the words a request ignores, from a registered list and its own.
+
+    Raises:
+        HTTPException: 400 if the registered list is unknown.
+    """
+    try:
+        return ignore_lists.resolve(request.ignore_list_id, request.ignore_list)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def compute_keywords(
+    request: CrawlRequest,
+    budget: CrawlBudget,
+    listener: Optional[CrawlListener] = None,
+) -> Dict[str, Any]:
+    """
+    Crawl from an article and compute its filtered word frequencies.
+
+    The word counts, without ignored words, are kept with their percentile
+    index in the count cache, so that requests differing only in their
+    percentile neither crawl nor count again. Crawls reporting progress to a
+    listener, i.e. jobs, don't share the cache.
+
+    Args:
+        request: The article, depth, ignore lists, percentile and counting mode.
+        budget: The budget of the crawl, already capped.
+        listener: An optional receiver of crawl progress notifications.
+
+    Returns:
+        The result, with its truncation state and error bound.
+
+    Raises:
+        HTTPException: 400 if the registered ignore list is unknown, 404 if no
+                       article was found.
+    """
+    if listener is not None:
+        counts = await count_keywords(request, budget, listener)
+    else:
+        counts, _ = await count_cache.get_or_compute(
+            ResultCache.make_key(
+                request.article,
+                request.depth,
+                request.ignore_list,
+                budget=budget,
+                counting=request.counting,
+                ignore_list_id=request.ignore_list_id,
+            ),
+            lambda: count_keywords(request, budget),
+            cacheable=is_cacheable,
+        )
+
+    # Filter by percentile with the cached index
+    result = await run_in_executor(
+        worker_pool,
+        word_frequency_analyzer.frequencies_from_counts,
+        counts["word_count"],
+        request.percentile,
+        counts["index"],
+        counts["total"],
+    )
+    return {
+        **result,
+        "truncated": counts["truncated"],
+        "truncation_reason": counts["truncation_reason"],
+        "error_bound": counts["error_bound"],
+    }
+
+
+async def count_keywords(
+    request: CrawlRequest,
+    budget: CrawlBudget,
+    listener: Optional[CrawlListener] = None,
+) -> Dict[str, Any]:
+    """
+    Crawl from an article and count its words, leaving out ignored words.
+
+    Args:
+        request: The article, depth, ignore lists and counting mode.
+        budget: The budget of the crawl, already capped.
+        listener: An optional receiver of crawl progress notifications.
+
+    Returns:
+        The word counts with their percentile index, truncation state, and
+        the error bound and total of approximate counts.
+
+    Raises:
+        HTTPException: 400 if the registered ignore list is unknown, 404 if no
+                       article was found.
+    """
+    ignore_list = resolve_ignore_list(request)
+    words_by_article, session, error_bound, total = await crawl_words(
+        request.article,
+        request.depth,
+        budget,
+        request.counting,
+        ignore_list,
+        listener,
+    )
+
+    word_count, index = await run_in_executor(
+        worker_pool,
+        word_frequency_analyzer.index_word_counts,
+        words_by_article,
+        ignore_list,
+    )
+    return {
+        "word_count": word_count,
+        "index": index,
+        "total": total,
+        "truncated": session.truncated,
+        "truncation_reason": session.truncation_reason,
+        "error_bound": error_bound,
+    }
+
+
+def negotiate_format(requested: Optional[str], accept: Optional[str]) -> str:
+    """
+    Choose the response format of a request.
+
+    Raises:
+        HTTPException: 406 if the format is not available on this server.
+    """
+    try:
+        return choose_response_format(requested, accept)
+    except ValueError as e:
+        raise HTTPException(status_code=406, detail=str(e))
+
 
 app = FastAPI(
     title="Wikipedia Word-Frequency Dictionary",
     description="An API for generating word-frequency dictionaries from Wikipedia articles.",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
-# Initialize the Wikipedia client and word frequency analyzer
-wikipedia_client = WikipediaClient()
-word_frequency_analyzer = WordFrequencyAnalyzer()
-
 
 @app.get("/word-frequency", response_model=WordFrequencyResponse)
 async def get_word_frequency(
+    http_request: Request,
     article: str = Query(
         ..., description="The title of the Wikipedia article to start from"
     ),
     depth: int = Query(
         0, description="The depth of traversal within Wikipedia articles", ge=0
     ),
+    max_articles: Optional[int] = Query(
+        None, description="The maximum number of articles to crawl", ge=1
+    ),
+    max_bytes: Optional[int] = Query(
+        None,
+        description="The maximum number of bytes of article content to download",
+        ge=1,
+    ),
+    time_limit: Optional[float] = Query(
+        None, description="The maximum number of seconds to crawl", gt=0
+    ),
+    limit: Optional[int] = Query(
+        None, description="The maximum number of words to return", ge=1
+    ),
+    offset: int = Query(0, description="The number of words to skip", ge=0),
+    sort: Optional[Literal["count", "word"]] = Query(
+        None,
+        description="Order of the words: 'count' for the most frequent first, "
+        "or 'word' for alphabetical",
+    ),
+    format: Optional[Literal["json", "compact", "msgpack"]] = Query(
+        None, description="The response format: 'json', 'compact' or 'msgpack'"
+    ),
+    counting: Literal["exact", "approximate"] = Query(
+        "exact",
+        description="'exact', or 'approximate' to count only the most frequent "
+        "words in bounded memory",
+    ),
+    accept: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
 ):
     """
     Generate a word-frequency dictionary for a Wikipedia article and its linked articles.
 
     Args:
+        http_request: The HTTP request, watched for a client disconnect.
         article: The title of the Wikipedia article to start from.
         depth: The depth of traversal within Wikipedia articles.
+        max_articles: The maximum number of articles to crawl.
+        max_bytes: The maximum number of bytes of article content to download.
+        time_limit: The maximum number of seconds to crawl.
+        limit: The maximum number of words to return.
+        offset: The number of words to skip.
+        sort: The order of the words, 'count' or 'word'.
+        format: The response format, which can also be chosen with the
+                ``Accept`` header.
+        counting: 'exact', or 'approximate' for the most frequent words only.
+        accept: The ``Accept`` header.
+        accept_encoding: The ``Accept-Encoding`` header; gzip is used if listed.
 
     Returns:
         A word-frequency dictionary that includes the count and percentage frequency
-        of each word found in the traversed articles.
+        of each word found in the traversed articles. If a budget ran out, the
+        result covers the articles crawled so far and is marked as truncated.
+        With ``limit``, ``offset`` or ``sort``, only the requested page of words
+        is returned, with frequencies relative to the whole result. The compact
+        format lists the words once, with their counts and the total. With
+        approximate counting, only the most frequent words are counted and
+        ``error_bound`` is the most any count may exceed the true count by.
     """
-    try:
-        # Traverse Wikipedia articles
-        words_by_article = wikipedia_client.traverse_articles(article, depth)
+    response_format = negotiate_format(format, accept)
+    budget = CrawlBudget(max_articles, max_bytes, time_limit).capped(crawl_limits)
 
-        if not words_by_article:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Article '{article}' not found or no content available",
-            )
+    async def compute():
+        words_by_article, session, error_bound, total = await crawl_words(
+            article, depth, budget, counting
+        )
 
         # Calculate word frequencies
-        result = word_frequency_analyzer.calculate_word_frequencies(words_by_article)
+        result = await run_in_executor(
+            worker_pool,
+            word_frequency_analyzer.calculate_word_frequencies,
+            words_by_article,
+            total=total,
+        )
+        return {
+            **result,
+            "truncated": session.truncated,
+            "truncation_reason": session.truncation_reason,
+            "error_bound": error_bound,
+        }
+
+    try:
+        # The crawl is cancelled if the client goes away, unless identical
+        # requests still wait for it
+        result, cache_status = await disconnect_watcher.run(
+            http_request,
+            result_cache.get_or_compute(
+                ResultCache.make_key(article, depth, budget=budget, counting=counting),
+                compute,
+                cacheable=is_cacheable,
+            ),
+        )
 
-        return WordFrequencyResponse(
-            word_count=result["word_count"], word_frequency=result["word_frequency"]
+        # Paging selects from the cached result, so every page is a cache hit
+        return await send_result(
+            result, cache_status, limit, offset, sort, response_format, accept_encoding
         )
 
+    except ClientDisconnectedError:
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
@@ -64,41 +651,187 @@ async def get_word_frequency(
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 
+@app.get("/word-frequency/stream")
+async def stream_word_frequency(
+    article: str = Query(
+        ..., description="The title of the Wikipedia article to start from"
+    ),
+    depth: int = Query(
+        0, description="The depth of traversal within Wikipedia articles", ge=0
+    ),
+    max_articles: Optional[int] = Query(
+        None, description="The maximum number of articles to crawl", ge=1
+    ),
+    max_bytes: Optional[int] = Query(
+        None,
+        description="The maximum number of bytes of article content to download",
+        ge=1,
+    ),
+    time_limit: Optional[float] = Query(
+        None, description="The maximum number of seconds to crawl", gt=0
+    ),
+    top_k: int = Query(
+        20, description="The number of most frequent words in each snapshot", ge=1
+    ),
+    progress_every: int = Query(
+        25, description="The number of articles between progress events", ge=1
+    ),
+    limit: Optional[int] = Query(
+        None,
+        description="The maximum number of most frequent words in the result",
+        ge=1,
+    ),
+    format: Optional[str] = Query(
+        None, description="The stream format, 'ndjson' or 'sse'"
+    ),
+    accept: Optional[str] = Header(None),
+):
+    """
+    Stream the progress of a crawl and its running top words, then the result.
+
+    Events are sent as NDJSON lines, or as server-sent events when ``format=sse``
+    or the ``Accept`` header asks for ``text/event-stream``. ``progress`` events
+    arrive every ``progress_every`` articles and ``level`` events at the end of
+    every depth level, both with the ``top_k`` most frequent words so far. The
+    last event is either ``result``, shaped like the response of
+    ``/word-frequency`` and holding the ``limit`` most frequent words if
+    given, or ``error``.
+
+    Args:
+        article: The title of the Wikipedia article to start from.
+        depth: The depth of traversal within Wikipedia articles.
+        max_articles: The maximum number of articles to crawl.
+        max_bytes: The maximum number of bytes of article content to download.
+        time_limit: The maximum number of seconds to crawl.
+        top_k: The number of most frequent words in each snapshot.
+        progress_every: The number of articles between progress events.
+        limit: The maximum number of most frequent words in the result.
+        format: The stream format, 'ndjson' or 'sse'.
+        accept: The ``Accept`` header.
+
+    Returns:
+        A streaming response of events.
+    """
+    try:
+        stream_format = choose_format(format, accept)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    budget = CrawlBudget(max_articles, max_bytes, time_limit).capped(crawl_limits)
+
+    async def events():
+        # Word counts are merged as articles arrive instead of being kept per
+        # article, so memory only grows with the vocabulary
+        session = CrawlSession(article, depth, budget=budget, keep_results=False)
+        stream = ProgressStream(session, top_k=top_k, every=progress_every)
+        try:
+            async for event in stream.run(crawler.crawl(session, listener=stream)):
+                yield encode_event(event, stream_format)
+
+            if not session.stats.articles_fetched:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Article '{article}' not found or no content available",
+                )
+
+            # The whole vocabulary is counted and encoded in the worker pool
+            yield await run_in_executor(
+                worker_pool,
+                render_result_event,
+                stream.word_counts,
+                limit,
+                session.truncated,
+                session.truncation_reason,
+                stream_format,
+            )
+
+        except HTTPException as e:
+            error = {"event": "error", "status_code": e.status_code, "detail": e.detail}
+            yield encode_event(error, stream_format)
+
+        except ValueError as e:
+            error = {"event": "error", "status_code": 404, "detail": str(e)}
+            yield encode_event(error, stream_format)
+
+        except Exception as e:
+            error = {
+                "event": "error",
+                "status_code": 500,
+                "detail": f"An error occurred: {str(e)}",
+            }
+            yield encode_event(error, stream_format)
+
+    return StreamingResponse(events(), media_type=MEDIA_TYPES[stream_format])
+
+
 @app.post("/keywords", response_model=WordFrequencyResponse)
-async def get_keywords(request: KeywordsRequest):
+async def get_keywords(
+    request: KeywordsRequest,
+    http_request: Request,
+    format: Optional[Literal["json", "compact", "msgpack"]] = Query(
+        None, description="The response format: 'json', 'compact' or 'msgpack'"
+    ),
+    accept: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+):
     """
     Generate a filtered word-frequency dictionary for a Wikipedia article and its linked articles.
 
     Args:
-        request: The request body containing article, depth, ignore_list, and percentile.
+        request: The request body containing article, depth, ignore_list,
+                 ignore_list_id, percentile, budgets and paging.
+        http_request: The HTTP request, watched for a client disconnect.
+        format: The response format, which can also be chosen with the
+                ``Accept`` header.
+        accept: The ``Accept`` header.
+        accept_encoding: The ``Accept-Encoding`` header; gzip is used if listed.
 
     Returns:
         A word-frequency dictionary that includes the count and percentage frequency
         of each word found in the traversed articles, excluding words in the ignore list
-        and filtered by the specified percentile.
+        and filtered by the specified percentile. If a budget ran out, the result
+        covers the articles crawled so far and is marked as truncated. With
+        ``limit``, ``offset`` or ``sort``, only the requested page of words is
+        returned. With approximate counting, the percentile is taken among the
+        most frequent words, and ``error_bound`` bounds the overestimate of
+        every count.
     """
+    response_format = negotiate_format(format, accept)
+    resolve_ignore_list(request)
+    budget = CrawlBudget(
+        request.max_articles, request.max_bytes, request.time_limit
+    ).capped(crawl_limits)
+
     try:
-        # Traverse Wikipedia articles
-        words_by_article = wikipedia_client.traverse_articles(
-            request.article, request.depth
+        result, cache_status = await disconnect_watcher.run(
+            http_request,
+            result_cache.get_or_compute(
+                ResultCache.make_key(
+                    request.article,
+                    request.depth,
+                    request.ignore_list,
+                    request.percentile,
+                    budget,
+                    request.counting,
+                    request.ignore_list_id,
+                ),
+                lambda: compute_keywords(request, budget),
+                cacheable=is_cacheable,
+            ),
         )
 
-        if not words_by_article:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Article '{request.article}' not found or no content available",
-            )
-
-        # Calculate word frequencies with filtering
-        result = word_frequency_analyzer.calculate_word_frequencies(
-            words_by_article,
-            ignore_list=request.ignore_list,
-            percentile=request.percentile,
+        return await send_result(
+            result,
+            cache_status,
+            request.limit,
+            request.offset,
+            request.sort,
+            response_format,
+            accept_encoding,
         )
 
-        return WordFrequencyResponse(
-            word_count=result["word_count"], word_frequency=result["word_frequency"]
-        )
+    except ClientDisconnectedError:
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
 
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -107,5 +840,194 @@ async def get_keywords(request: KeywordsRequest):
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 
+async def find_job(job_id: str, with_result: bool = True) -> Job:
+    """
+    Look up a job by its ID, with its result unless only its state is needed.
+
+    Raises:
+        HTTPException: 404 if the job is unknown.
+    """
+    job = await job_manager.get(job_id, with_result)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return job
+
+
+@app.post("/jobs", response_model=JobResponse, status_code=202)
+async def submit_job(request: CrawlRequest):
+    """
+    Submit a crawl to run in the background.
+
+    Jobs run on a bounded pool, at most ``WIKI_WORD_FREQ_JOB_WORKERS`` at once,
+    within the job budgets, which may be larger than those of a request.
+
+    Args:
+        request: The request body containing article, depth, ignore_list,
+                 ignore_list_id, percentile and budgets.
+
+    Returns:
+        The queued job, whose ``job_id`` is used to follow it.
+
+    Raises:
+        HTTPException: 400 if the registered ignore list is unknown, 503 if too
+                       many jobs are waiting to run.
+    """
+    resolve_ignore_list(request)
+    try:
+        job = await job_manager.submit(request.model_dump())
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return job.info()
+
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """
+    Report the state and progress of a job.
+
+    Args:
+        job_id: The job ID.
+
+    Returns:
+        The job, with the depth completed, the articles fetched and the bytes
+        downloaded so far.
+    """
+    return (await find_job(job_id, with_result=False)).info()
+
+
+@app.get("/jobs/{job_id}/result", response_model=WordFrequencyResponse)
+async def get_job_result(
+    job_id: str,
+    limit: Optional[int] = Query(
+        None, description="The maximum number of words to return", ge=1
+    ),
+    offset: int = Query(0, description="The number of words to skip", ge=0),
+    sort: Optional[Literal["count", "word"]] = Query(
+        None,
+        description="Order of the words: 'count' for the most frequent first, "
+        "or 'word' for alphabetical",
+    ),
+    format: Optional[Literal["json", "compact", "msgpack"]] = Query(
+        None, description="The response format: 'json', 'compact' or 'msgpack'"
+    ),
+    accept: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+):
+    """
+    Return the word frequencies computed by a completed job.
+
+    Args:
+        job_id: The job ID.
+        limit: The maximum number of words to return.
+        offset: The number of words to skip.
+        sort: The order of the words, 'count' or 'word'.
+        format: The response format, which can also be chosen with the
+                ``Accept`` header.
+        accept: The ``Accept`` header.
+        accept_encoding: The ``Accept-Encoding`` header; gzip is used if listed.
+
+    Returns:
+        The result, shaped like the response of ``/keywords``.
+
+    Raises:
+        HTTPException: 404 if the job is unknown, 409 if it hasn't completed.
+    """
+    response_format = negotiate_format(format, accept)
+    job = await find_job(job_id)
+    if job.result is None:
+        raise HTTPException(
+            status_code=409, detail=f"Job '{job_id}' is {job.status}, not completed"
+        )
+    return await send_result(
+        job.result, None, limit, offset, sort, response_format, accept_encoding
+    )
+
+
+@app.delete("/jobs/{job_id}", response_model=JobResponse)
+async def cancel_job(job_id: str):
+    """
+    Cancel a queued or running job; finished jobs are left as they are.
+
+    Args:
+        job_id: The job ID.
+
+    Returns:
+        The job, in its final state.
+    """
+    job = await job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return job.info()
+
+
+@app.get("/stats")
+async def get_stats():
+    """
+    Report the counters of cancelled work and the state of the upstream limit.
+
+    Returns:
+        The number of requests whose client disconnected, the crawls and
+        fetch tasks that were cancelled, the current adaptive concurrency
+        limit with the number of its cuts and of retried requests, and the
+        articles pending in the parse pool with the number of fetches that
+        waited for it.
+    """
+    return {
+        "requests": disconnect_watcher.info(),
+        "crawler": crawler.info(),
+        "upstream": crawler.upstream_info(),
+        "parsing": crawler.parse_queue.info(),
+    }
+
+
+@app.get("/ignore-lists")
+async def get_ignore_lists():
+    """
+    List the ignore lists registered on the server.
+
+    Returns:
+        The number of words of every list, by name, for ``ignore_list_id``.
+    """
+    return {"ignore_lists": ignore_lists.info()}
+
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """
+    Report the counters of the article, result and count caches.
+
+    Returns:
+        The hits, misses, evictions and sizes of the caches and of the crawl
+        snapshots.
+    """
+    return {
+        "articles": wikipedia_client.article_cache.info(),
+        "results": result_cache.info(),
+        "counts": count_cache.info(),
+        "snapshots": crawl_snapshots.info(),
+    }
+
+
+@app.delete("/cache/results")
+async def invalidate_results(
+    article: Optional[str] = Query(
+        None, description="Only invalidate results starting from this article"
+    ),
+):
+    """
+    Invalidate cached results.
+
+    Args:
+        article: Only invalidate results starting from this article, or all
+                 results if omitted.
+
+    Returns:
+        The number of invalidated results.
+    """
+    count_cache.invalidate(article)
+    crawl_snapshots.invalidate(article)
+    return {"invalidated": result_cache.invalidate(article)}
+
+
 if __name__ == "__main__":
     uvicorn.run("wiki_word_freq.main:app", host="0.0.0.0", port=8000, reload=True)
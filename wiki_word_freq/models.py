@@ -2,7 +2,7 @@
 Data models for the Wikipedia Word-Frequency Dictionary API.
 """
 
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional
 from pydantic import BaseModel, Field
 
 
@@ -15,10 +15,27 @@ class WordFrequencyResponse(BaseModel):
     word_frequency: Dict[str, float] = Field(
         ..., description="Dictionary mapping words to their frequency percentage"
     )
+    truncated: bool = Field(
+        default=False,
+        description="Whether the crawl stopped early because its budget ran out",
+    )
+    truncation_reason: Optional[str] = Field(
+        default=None,
+        description="Which budget ran out: max_articles, max_bytes or time_limit",
+    )
+    vocabulary_size: Optional[int] = Field(
+        default=None,
+        description="The number of distinct words in the whole result, before paging",
+    )
+    error_bound: Optional[int] = Field(
+        default=None,
+        description="With approximate counting, the most any count may exceed "
+        "the true count; counts are never below it",
+    )
 
 
-class KeywordsRequest(BaseModel):
-    """Request model for the /keywords endpoint."""
+class CrawlRequest(BaseModel):
+    """Request model for a filtered crawl, as submitted to the /jobs endpoint."""
 
     article: str = Field(
         ..., description="The title of the Wikipedia article to start from"
@@ -29,9 +46,67 @@ class KeywordsRequest(BaseModel):
     ignore_list: Optional[List[str]] = Field(
         default=[], description="A list of words to ignore"
     )
+    ignore_list_id: Optional[str] = Field(
+        default=None,
+        description="The name of an ignore list registered on the server, "
+        "e.g. 'english-stopwords', ignored along with ignore_list",
+    )
     percentile: Optional[int] = Field(
         default=0,
         description="The percentile threshold for word frequency",
         ge=0,
         le=100,
     )
+    max_articles: Optional[int] = Field(
+        default=None, description="The maximum number of articles to crawl", ge=1
+    )
+    max_bytes: Optional[int] = Field(
+        default=None,
+        description="The maximum number of bytes of article content to download",
+        ge=1,
+    )
+    time_limit: Optional[float] = Field(
+        default=None, description="The maximum number of seconds to crawl", gt=0
+    )
+    counting: Literal["exact", "approximate"] = Field(
+        default="exact",
+        description="'exact', or 'approximate' to count only the most frequent "
+        "words in bounded memory",
+    )
+
+
+class KeywordsRequest(CrawlRequest):
+    """Request model for the /keywords endpoint."""
+
+    limit: Optional[int] = Field(
+        default=None, description="The maximum number of words to return", ge=1
+    )
+    offset: int = Field(default=0, description="The number of words to skip", ge=0)
+    sort: Optional[Literal["count", "word"]] = Field(
+        default=None,
+        description="Order of the words: 'count' for the most frequent first, "
+        "or 'word' for alphabetical",
+    )
+
+
+class JobResponse(BaseModel):
+    """Response model describing a crawl job."""
+
+    job_id: str = Field(..., description="The ID of the job")
+    status: Literal["queued", "running", "completed", "failed", "cancelled"] = Field(
+        ..., description="The state of the job"
+    )
+    request: Dict[str, Any] = Field(..., description="The submitted crawl parameters")
+    created_at: float = Field(..., description="When the job was submitted (Unix time)")
+    started_at: Optional[float] = Field(
+        default=None, description="When the job started running (Unix time)"
+    )
+    finished_at: Optional[float] = Field(
+        default=None, description="When the job stopped (Unix time)"
+    )
+    progress: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="The depth completed, the articles fetched and missing, "
+        "the bytes downloaded and whether the crawl was truncated",
+    )
+    error: Optional[str] = Field(default=None, description="Why the job failed")
@@ -0,0 +1,314 @@
+"""
+Module for extracting words and links from an article in a single pass.
+"""
+
+import re
+from abc import ABC, abstractmethod
+from collections import Counter
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Set
+
+from bs4 import BeautifulSoup
+from urllib.parse import unquote
+
+try:
+    import lxml  # noqa: F401
+except ImportError:  # pragma: no cover - depends on the environment
+    lxml = None
+
+# Elements whose text is not part of the article prose
+EXCLUDED_SELECTOR = "table, .reference, .mw-editsection, .mw-headline, script, style"
+EXCLUDED_TAGS = frozenset({"table", "script", "style"})
+EXCLUDED_CLASSES = frozenset({"reference", "mw-editsection", "mw-headline"})
+
+CONTENT_CLASS = "mw-parser-output"
+
+# Elements that never have content, as treated by BeautifulSoup's html.parser builder
+VOID_ELEMENTS = frozenset(
+    {
+        "area", "base", "br", "col", "embed", "hr", "img", "input", "keygen",
+        "link", "menuitem", "meta", "param", "source", "track", "wbr",
+        "basefont", "bgsound", "command", "frame", "image", "isindex",
+        "nextid", "spacer",
+    }
+)
+
+CITATION_PATTERN = re.compile(r"\[\d+\]")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+WORD_PATTERN = re.compile(r"\b[a-zA-Z]+\b")
+
+
+def tokenize_text(text: str) -> List[str]:
+    """
+    Split the text content of an article into lowercase words.
+
+    Args:
+        text: The text content of the article.
+
+    Returns:
+        A list of words from the text.
+    """
+    # Clean and normalize the text
+    text = CITATION_PATTERN.sub("", text)  # Remove citation numbers
+    text = WHITESPACE_PATTERN.sub(" ", text)  # Normalize whitespace
+
+    # Split into words and filter out non-words
+    return WORD_PATTERN.findall(text.lower())
+
+
+def count_words(text: str) -> Counter:
+    """
+    Count the lowercase words in the text content of an article.
+
+    Args:
+        text: The text content of the article.
+
+    Returns:
+        A counter mapping each word to its number of occurrences.
+    """
+    return Counter(tokenize_text(text))
+
+
+def parse_wiki_href(href: str) -> Optional[str]:
+    """
+    Get the article title an ``href`` points to.
+
+    Args:
+        href: The value of a link's ``href`` attribute.
+
+    Returns:
+        The linked article title, or None if the link isn't an internal
+        Wikipedia article link.
+    """
+    if (
+        href.startswith("/wiki/")
+        and ":" not in href
+        and not href.startswith("/wiki/File:")
+    ):
+        # Extract the article title from the URL
+        return unquote(href.replace("/wiki/", ""))
+    return None
+
+
+@dataclass
+class ProcessedArticle:
+    """Word counts and outbound links extracted from one article."""
+
+    word_counts: Counter = field(default_factory=Counter)
+    links: List[str] = field(default_factory=list)
+
+    def approximate_size(self) -> int:
+        """
+        Estimate the memory held by the article, for size-bounded caches.
+
+        Returns:
+            The estimated size in bytes.
+        """
+        # Roughly a str object plus a dict or list slot per entry
+        return sum(len(word) + 100 for word in self.word_counts) + sum(
+            len(link) + 60 for link in self.links
+        )
+
+
+class ArticleProcessor(ABC):
+    """Base class for extractors that parse an article once for words and links."""
+
+    name = ""
+
+    @abstractmethod
+    def process(self, html_content: str, with_links: bool = True) -> ProcessedArticle:
+        """
+        Extract word counts and links from the HTML content of an article.
+
+        Args:
+            html_content: The HTML content of a Wikipedia article.
+            with_links: Whether the outgoing links are needed.
+
+        Returns:
+            The processed article.
+        """
+
+
+class BeautifulSoupProcessor(ArticleProcessor):
+    """Processor building one BeautifulSoup tree per article."""
+
+    def __init__(self, parser: str = "html.parser"):
+        """
+        Initialize the processor.
+
+        Args:
+            parser: The BeautifulSoup tree builder, e.g. "html.parser" or "lxml".
+        """
+        self.parser = parser
+        self.name = "lxml" if parser == "lxml" else "bs4"
+
+    def process(self, html_content: str, with_links: bool = True) -> ProcessedArticle:
+        """
+        Extract word counts and links from the HTML content of an article.
+
+        Args:
+            html_content: The HTML content of a Wikipedia article.
+            with_links: Whether the outgoing links are needed.
+
+        Returns:
+            The processed article.
+        """
+        soup = BeautifulSoup(html_content, self.parser)
+        content_div = soup.find("div", {"class": CONTENT_CLASS})
+
+        if not content_div:
+            return ProcessedArticle()
+
+        # Links are collected before removing elements, as links inside
+        # tables and references are followed too
+        links = []
+        if with_links:
+            for link in content_div.find_all("a"):
+                article_title = parse_wiki_href(link.get("href", ""))
+                if article_title is not None:
+                    links.append(article_title)
+
+        # Remove unwanted elements
+        for element in content_div.select(EXCLUDED_SELECTOR):
+            element.decompose()
+
+        return ProcessedArticle(count_words(content_div.get_text()), links)
+
+
+class _StreamingExtractor(HTMLParser):
+    """Event-driven parser collecting the prose and links of the content div."""
+
+    def __init__(self, with_links: bool):
+        super().__init__(convert_charrefs=True)
+        self.with_links = with_links
+        self.text: List[str] = []
+        self.links: List[str] = []
+        # Open elements inside the content div; None until it is found
+        self.stack: Optional[List[str]] = None
+        # Stack size at which an excluded element was opened
+        self.skip_depth: Optional[int] = None
+        self.done = False
+
+    def handle_starttag(self, tag, attrs):
+        self._start(tag, attrs, closes=tag in VOID_ELEMENTS)
+
+    def handle_startendtag(self, tag, attrs):
+        self._start(tag, attrs, closes=True)
+
+    def _start(self, tag, attrs, closes):
+        if self.done:
+            return
+
+        attributes: Dict[str, str] = {}
+        for key, value in attrs:
+            attributes[key] = value or ""
+        classes: Set[str] = set(attributes.get("class", "").split())
+
+        if self.stack is None:
+            if tag == "div" and CONTENT_CLASS in classes and not closes:
+                self.stack = [tag]
+            return
+
+        if tag == "a" and self.with_links:
+            article_title = parse_wiki_href(attributes.get("href", ""))
+            if article_title is not None:
+                self.links.append(article_title)
+
+        if closes:
+            return
+
+        if self.skip_depth is None and (
+            tag in EXCLUDED_TAGS or not classes.isdisjoint(EXCLUDED_CLASSES)
+        ):
+            self.skip_depth = len(self.stack)
+        self.stack.append(tag)
+
+    def handle_endtag(self, tag):
+        if self.done or self.stack is None or tag not in self.stack:
+            # Stray end tags are ignored, like BeautifulSoup does
+            return
+
+        # Close the most recent matching element and everything opened after it
+        index = len(self.stack) - 1 - self.stack[::-1].index(tag)
+        del self.stack[index:]
+
+        if self.skip_depth is not None and len(self.stack) <= self.skip_depth:
+            self.skip_depth = None
+        if not self.stack:
+            self.done = True
+
+    def handle_data(self, data):
+        if self.stack is not None and not self.done and self.skip_depth is None:
+            self.text.append(data)
+
+
+class StreamingProcessor(ArticleProcessor):
+    """Processor that extracts words and links from parser events without a tree."""
+
+    name = "stream"
+
+    def process(self, html_content: str, with_links: bool = True) -> ProcessedArticle:
+        """
+        Extract word counts and links from the HTML content of an article.
+
+        Args:
+            html_content: The HTML content of a Wikipedia article.
+            with_links: Whether the outgoing links are needed.
+
+        Returns:
+            The processed article.
+        """
+        extractor = _StreamingExtractor(with_links)
+        extractor.feed(html_content)
+        extractor.close()
+
+        if extractor.stack is None:
+            return ProcessedArticle()
+
+        return ProcessedArticle(count_words("".join(extractor.text)), extractor.links)
+
+
+def available_backends() -> List[str]:
+    """
+    List the processor backends usable in this environment.
+
+    Returns:
+        The backend names.
+    """
+    backends = ["stream", "bs4"]
+    if lxml is not None:
+        backends.append("lxml")
+    return backends
+
+
+def create_processor(backend: str = "auto") -> ArticleProcessor:
+    """
+    Create an article processor.
+
+    Args:
+        backend: "stream", "bs4", "lxml", or "auto" to use lxml when it is
+                 installed and the streaming extractor otherwise.
+
+    Returns:
+        The article processor.
+
+    Raises:
+        ValueError: If the backend is unknown or not installed.
+    """
+    if backend == "auto":
+        backend = "lxml" if lxml is not None else "stream"
+
+    if backend == "stream":
+        return StreamingProcessor()
+    if backend == "bs4":
+        return BeautifulSoupProcessor("html.parser")
+    if backend == "lxml":
+        if lxml is None:
+            raise ValueError("The 'lxml' backend requires the lxml package")
+        return BeautifulSoupProcessor("lxml")
+
+    raise ValueError(
+        f"Unknown HTML backend '{backend}', expected one of "
+        f"auto, {', '.join(available_backends())}"
+    )
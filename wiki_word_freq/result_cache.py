@@ -0,0 +1,213 @@
+"""
+Module for caching whole API results and coalescing identical requests.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from wiki_word_freq.approximate import COUNTING_EXACT
+from wiki_word_freq.cache import LRUCache
+from wiki_word_freq.session import CrawlBudget
+from wiki_word_freq.wikipedia import WikipediaClient
+
+# How a result was obtained, reported in the X-Cache response header
+CACHE_HIT = "HIT"
+CACHE_MISS = "MISS"
+CACHE_SHARED = "SHARED"
+
+
+def result_size(result: Any) -> int:
+    """
+    Estimate the memory held by a result, for bounding the cache by size.
+
+    Only the number of words of the result is looked at, so this is cheap
+    however large the result.
+
+    Args:
+        result: A computed result, or cached word counts, with a ``word_count``.
+
+    Returns:
+        The estimated size in bytes.
+    """
+    # Roughly a str object plus an entry in the count and frequency
+    # dictionaries, or in the percentile index, per word
+    word_count = result.get("word_count") if isinstance(result, dict) else None
+    return 1024 + 250 * (len(word_count) if word_count is not None else 0)
+
+
+class ResultCache:
+    """
+    Cache of computed results with coalescing of in-flight computations.
+
+    Completed results are kept in an LRU cache with a time to live, bounded
+    by their number and their estimated size. While a
+    result is being computed, identical requests wait for that computation
+    instead of starting their own. A computation is cancelled once every
+    request waiting for it has gone away.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = 256,
+        ttl: Optional[float] = 300.0,
+        max_bytes: Optional[int] = None,
+        sizeof: Callable[[Any], int] = result_size,
+    ):
+        """
+        Initialize the result cache.
+
+        Args:
+            max_entries: The maximum number of cached results, 0 to disable caching.
+                         In-flight computations are shared even when caching is
+                         disabled.
+            ttl: The number of seconds a result stays valid.
+            max_bytes: The maximum estimated size of the cached results, or
+                       None for no limit. A result larger than this is shared
+                       with concurrent requests but not cached.
+            sizeof: A function estimating the size of a result in bytes.
+        """
+        self._results: LRUCache[Any] = LRUCache(
+            max_entries=max_entries, max_bytes=max_bytes, ttl=ttl, sizeof=sizeof
+        )
+        self._in_flight: Dict[Hashable, "asyncio.Task[Any]"] = {}
+        # Number of requests waiting for each in-flight computation
+        self._waiters: Dict["asyncio.Task[Any]", int] = {}
+        # Bumped on invalidation, so results computed before it are not cached
+        self._generation = 0
+        self.coalesced = 0
+        self.abandoned = 0
+
+    @staticmethod
+    def make_key(
+        article: str,
+        depth: int,
+        ignore_list: Optional[List[str]] = None,
+        percentile: int = 0,
+        budget: Optional[CrawlBudget] = None,
+        counting: str = COUNTING_EXACT,
+        ignore_list_id: Optional[str] = None,
+    ) -> Tuple:
+        """
+        Build the cache key of a word frequency request.
+
+        Args:
+            article: The title of the Wikipedia article to start from.
+            depth: The depth of traversal.
+            ignore_list: The words to ignore.
+            percentile: The percentile threshold.
+            budget: The effective crawl budget.
+            counting: The counting mode, COUNTING_EXACT or COUNTING_APPROXIMATE.
+            ignore_list_id: The name of a registered ignore list.
+
+        Returns:
+            A key that is equal for requests producing the same result.
+        """
+        ignored = tuple(sorted({word.lower() for word in ignore_list or ()}))
+        budget = budget or CrawlBudget()
+        return (
+            WikipediaClient.cache_key(article),
+            depth,
+            ignored,
+            percentile or 0,
+            (budget.max_articles, budget.max_bytes, budget.time_limit),
+            counting,
+            ignore_list_id,
+        )
+
+    async def get_or_compute(
+        self,
+        key: Hashable,
+        compute: Callable[[], Awaitable[Any]],
+        cacheable: Optional[Callable[[Any], bool]] = None,
+    ) -> Tuple[Any, str]:
+        """
+        Get a cached result, join an identical in-flight computation, or compute it.
+
+        Args:
+            key: The cache key, see ``make_key``.
+            compute: A coroutine function computing the result. Failed
+                     computations are not cached.
+            cacheable: An optional predicate deciding whether a computed
+                       result may be cached; it is still shared with
+                       concurrent identical requests.
+
+        Returns:
+            A tuple of the result and one of CACHE_HIT, CACHE_SHARED or CACHE_MISS.
+        """
+        result = self._results.get(key)
+        if result is not None:
+            return result, CACHE_HIT
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            status = CACHE_SHARED
+        else:
+            task = asyncio.ensure_future(compute())
+            generation = self._generation
+            task.add_done_callback(
+                lambda done: self._on_done(key, generation, cacheable, done)
+            )
+            self._in_flight[key] = task
+            status = CACHE_MISS
+
+        # A waiter going away must not cancel the computation the others
+        # share; the last one to go cancels it
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            result = await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                if not task.done():
+                    task.cancel()
+                    self.abandoned += 1
+        return result, status
+
+    def _on_done(
+        self,
+        key: Hashable,
+        generation: int,
+        cacheable: Optional[Callable[[Any], bool]],
+        task: "asyncio.Task[Any]",
+    ) -> None:
+        """Cache the result of a finished computation."""
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+
+        if task.cancelled() or task.exception() is not None:
+            return
+        if generation != self._generation:
+            return
+        if cacheable is None or cacheable(task.result()):
+            self._results.set(key, task.result())
+
+    def invalidate(self, article: Optional[str] = None) -> int:
+        """
+        Remove cached results.
+
+        Args:
+            article: Only remove results starting from this article, or None to
+                     remove every result.
+
+        Returns:
+            The number of removed results.
+        """
+        self._generation += 1
+        if article is None:
+            count = len(self._results)
+            self._results.invalidate()
+            return count
+
+        title = WikipediaClient.cache_key(article)
+        return self._results.invalidate_matching(lambda key: key[0] == title)
+
+    def info(self) -> Dict[str, Any]:
+        """Return the counters and the current size of the cache."""
+        return {
+            **self._results.info(),
+            "coalesced": self.coalesced,
+            "abandoned": self.abandoned,
+            "in_flight": len(self._in_flight),
+        }
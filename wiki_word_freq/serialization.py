@@ -0,0 +1,158 @@
+"""
+Module for encoding word-frequency results in the supported response formats.
+"""
+
+import gzip
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - depends on the environment
+    msgpack = None
+
+# Response formats: the full JSON document, the compact columnar JSON
+# document, and the compact document as MessagePack
+FORMAT_JSON = "json"
+FORMAT_COMPACT = "compact"
+FORMAT_MSGPACK = "msgpack"
+RESPONSE_FORMATS = (FORMAT_JSON, FORMAT_COMPACT, FORMAT_MSGPACK)
+
+RESPONSE_MEDIA_TYPES = {
+    FORMAT_JSON: "application/json",
+    FORMAT_COMPACT: "application/vnd.wiki-word-freq.compact+json",
+    FORMAT_MSGPACK: "application/msgpack",
+}
+
+# Bodies smaller than this are not worth compressing
+GZIP_MINIMUM_SIZE = 1024
+
+
+def available_formats() -> List[str]:
+    """
+    List the response formats usable in this environment.
+
+    Returns:
+        The format names.
+    """
+    formats = [FORMAT_JSON, FORMAT_COMPACT]
+    if msgpack is not None:
+        formats.append(FORMAT_MSGPACK)
+    return formats
+
+
+def choose_response_format(requested: Optional[str], accept: Optional[str]) -> str:
+    """
+    Choose the response format from a query parameter or the ``Accept`` header.
+
+    Args:
+        requested: The requested format, which takes precedence.
+        accept: The value of the ``Accept`` header.
+
+    Returns:
+        The response format, FORMAT_JSON unless another one is asked for.
+
+    Raises:
+        ValueError: If the requested format is unknown or not installed.
+    """
+    if requested is None:
+        requested = FORMAT_JSON
+        for response_format in (FORMAT_MSGPACK, FORMAT_COMPACT):
+            if accept and RESPONSE_MEDIA_TYPES[response_format] in accept:
+                requested = response_format
+                break
+
+    if requested not in RESPONSE_FORMATS:
+        raise ValueError(
+            f"Unknown response format '{requested}', "
+            f"expected one of {', '.join(RESPONSE_FORMATS)}"
+        )
+    if requested not in available_formats():
+        raise ValueError(f"The '{requested}' format requires the msgpack package")
+    return requested
+
+
+def build_payload(
+    result: Dict[str, Any], words: Optional[List[str]], response_format: str
+) -> Dict[str, Any]:
+    """
+    Build the document of a response from a computed result.
+
+    The full format maps every word to its count and to its frequency. The
+    compact format lists every word once, with its count at the same index of
+    ``counts``; the frequency of a word is ``100 * count / total``. The
+    total is the result's own ``total`` if it has one, as approximate counts
+    do, and the sum of the counts otherwise.
+
+    Args:
+        result: The computed result, covering the whole vocabulary.
+        words: The words to include, in order, or None for all of them.
+        response_format: One of RESPONSE_FORMATS.
+
+    Returns:
+        The response document.
+    """
+    word_count = result["word_count"]
+    if words is None:
+        words = list(word_count)
+
+    payload: Dict[str, Any]
+    if response_format == FORMAT_JSON:
+        word_frequency = result["word_frequency"]
+        payload = {
+            "word_count": {word: word_count[word] for word in words},
+            "word_frequency": {
+                word: word_frequency[word] for word in words if word in word_frequency
+            },
+        }
+    else:
+        payload = {
+            "words": words,
+            "counts": [word_count[word] for word in words],
+            "total": result.get("total", sum(word_count.values())),
+        }
+
+    payload["truncated"] = result.get("truncated", False)
+    payload["truncation_reason"] = result.get("truncation_reason")
+    payload["vocabulary_size"] = len(word_count)
+    if result.get("error_bound") is not None:
+        payload["error_bound"] = result["error_bound"]
+    return payload
+
+
+def encode_payload(payload: Dict[str, Any], response_format: str) -> bytes:
+    """
+    Encode a response document.
+
+    Args:
+        payload: The response document.
+        response_format: One of RESPONSE_FORMATS.
+
+    Returns:
+        The encoded body.
+    """
+    if response_format == FORMAT_MSGPACK:
+        return msgpack.packb(payload, use_bin_type=True)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode(
+        "utf-8"
+    )
+
+
+def compress(body: bytes, accept_encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+    """
+    Compress a body with gzip if the client accepts it and it is large enough.
+
+    Args:
+        body: The encoded body.
+        accept_encoding: The value of the ``Accept-Encoding`` header.
+
+    Returns:
+        The body, and its content encoding, or None if it was left as is.
+    """
+    if (
+        accept_encoding
+        and "gzip" in accept_encoding
+        and len(body) >= GZIP_MINIMUM_SIZE
+    ):
+        return gzip.compress(body, compresslevel=5), "gzip"
+    return body, None
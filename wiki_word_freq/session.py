@@ -0,0 +1,386 @@
+"""
+Module for the per-request state of a Wikipedia traversal.
+"""
+
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Set
+
+from wiki_word_freq.processing import ProcessedArticle
+from wiki_word_freq.titles import canonical_title
+
+# Reasons for stopping a crawl before it is complete
+TRUNCATED_MAX_ARTICLES = "max_articles"
+TRUNCATED_MAX_BYTES = "max_bytes"
+TRUNCATED_TIME_LIMIT = "time_limit"
+
+
+@dataclass
+class CrawlStats:
+    """Counters describing the work done by one crawl."""
+
+    articles_fetched: int = 0
+    articles_missing: int = 0
+    links_discovered: int = 0
+    bytes_downloaded: int = 0
+    # Fetch tasks cancelled by the deadline or by cancelling the crawl
+    fetches_cancelled: int = 0
+    # Fetches given up after the transport's retries
+    fetches_failed: int = 0
+
+
+@dataclass
+class CrawlBudget:
+    """Limits on the cost of one crawl; None means unlimited."""
+
+    # Maximum number of articles included in the crawl
+    max_articles: Optional[int] = None
+    # Maximum number of bytes of article content downloaded
+    max_bytes: Optional[int] = None
+    # Maximum number of seconds the crawl may run
+    time_limit: Optional[float] = None
+
+    def capped(self, limits: "CrawlBudget") -> "CrawlBudget":
+        """
+        Combine this budget with server-side limits, keeping the stricter value.
+
+        Args:
+            limits: The server-side limits.
+
+        Returns:
+            The combined budget.
+        """
+
+        def stricter(value, limit):
+            if value is None:
+                return limit
+            if limit is None:
+                return value
+            return min(value, limit)
+
+        return CrawlBudget(
+            max_articles=stricter(self.max_articles, limits.max_articles),
+            max_bytes=stricter(self.max_bytes, limits.max_bytes),
+            time_limit=stricter(self.time_limit, limits.time_limit),
+        )
+
+
+@dataclass
+class LevelBatch:
+    """The articles of one depth level, fetched and processed together."""
+
+    depth: int
+    titles: List[str]
+    # Whether the links of these articles lead to another level
+    with_links: bool
+
+
+class CrawlListener:
+    """
+    Receiver of progress notifications from a crawl.
+
+    Both methods are called on the event loop and must not block.
+    """
+
+    def article_done(self, title: str, page: Optional[ProcessedArticle]) -> None:
+        """
+        Called when an article has been fetched, before its level is complete.
+
+        Args:
+            title: The article title.
+            page: The processed article, or None if it doesn't exist.
+        """
+
+    def level_done(self, session: "CrawlSession", batch: LevelBatch) -> None:
+        """
+        Called when a depth level has been completed.
+
+        Args:
+            session: The crawl session, already advanced to the next level.
+            batch: The batch of the completed level.
+        """
+
+
+class ListenerGroup(CrawlListener):
+    """Crawl listener passing every notification on to several listeners."""
+
+    def __init__(self, listeners: Iterable[Optional[CrawlListener]]):
+        """
+        Initialize the group.
+
+        Args:
+            listeners: The listeners, in the order they are notified; None
+                       entries are skipped.
+        """
+        self.listeners = [listener for listener in listeners if listener is not None]
+
+    def article_done(self, title: str, page: Optional[ProcessedArticle]) -> None:
+        """Tell every listener about a fetched article."""
+        for listener in self.listeners:
+            listener.article_done(title, page)
+
+    def level_done(self, session: "CrawlSession", batch: LevelBatch) -> None:
+        """Tell every listener about a completed level."""
+        for listener in self.listeners:
+            listener.level_done(session, batch)
+
+
+@dataclass
+class CrawlSession:
+    """
+    State of a single level-synchronous, breadth-first traversal.
+
+    A session owns everything that is specific to one request: the visited set,
+    the frontier of the current depth level, the collected word counts and the
+    stats. Clients, connection pools and caches are shared between sessions, so
+    several sessions can run against the same client at the same time.
+
+    Articles are marked as visited when they are first discovered, under their
+    canonical title, so spellings that differ only in underscores, percent-
+    encoding, first-letter case or ``#fragment`` are fetched once. As levels
+    are completed in order, every article is therefore fetched and expanded at
+    the shortest depth it can be reached from the start article.
+
+    When the budget runs out, the crawl stops after the current level and the
+    session keeps the partial results, with ``truncation_reason`` saying why.
+    """
+
+    start_article: str
+    depth: int
+    visited: Set[str] = field(default_factory=set)
+    frontier: List[str] = field(default_factory=list)
+    current_depth: int = 0
+    results: Dict[str, Counter] = field(default_factory=dict)
+    stats: CrawlStats = field(default_factory=CrawlStats)
+    budget: CrawlBudget = field(default_factory=CrawlBudget)
+    truncation_reason: Optional[str] = None
+    started_at: float = field(default_factory=time.monotonic)
+    articles_admitted: int = 0
+    # Whether the word counts of every article are kept in ``results``; a
+    # listener merging them as they arrive can turn this off
+    keep_results: bool = True
+    # Whether the titles of the last level are kept in ``unexpanded``, so that
+    # the crawl can be deepened later without refetching its levels
+    keep_frontier: bool = False
+    # Fetched articles of the last level whose links were not followed yet; a
+    # deepened crawl builds its frontier from their links before going on
+    unexpanded: List[str] = field(default_factory=list)
+
+    def __post_init__(self):
+        """Seed the frontier with the start article."""
+        if not self.frontier and self.mark_visited(self.start_article):
+            self.frontier.append(self.start_article)
+            self.visited.add(canonical_title(self.start_article))
+
+    def mark_visited(self, article: str) -> bool:
+        """
+        Mark an article as visited.
+
+        Args:
+            article: The article title.
+
+        Returns:
+            True if the article had not been visited before.
+        """
+        if article in self.visited:
+            return False
+        self.visited.add(article)
+        return True
+
+    @property
+    def truncated(self) -> bool:
+        """Whether the crawl was stopped because its budget ran out."""
+        return self.truncation_reason is not None
+
+    def truncate(self, reason: str) -> None:
+        """
+        Stop the crawl after the current level.
+
+        Args:
+            reason: Why the crawl is stopped, e.g. TRUNCATED_TIME_LIMIT.
+        """
+        if self.truncation_reason is None:
+            self.truncation_reason = reason
+
+    def time_remaining(self) -> Optional[float]:
+        """
+        Get the time left before the deadline.
+
+        Returns:
+            The remaining seconds, or None if there is no time limit.
+        """
+        if self.budget.time_limit is None:
+            return None
+        return max(0.0, self.started_at + self.budget.time_limit - time.monotonic())
+
+    def admit(self, titles: List[str]) -> List[str]:
+        """
+        Take the articles of a level that still fit in the article budget.
+
+        Args:
+            titles: The article titles of the level.
+
+        Returns:
+            The titles to fetch, in order.
+        """
+        if self.budget.max_articles is not None:
+            remaining = max(0, self.budget.max_articles - self.articles_admitted)
+            if len(titles) > remaining:
+                titles = titles[:remaining]
+                self.truncate(TRUNCATED_MAX_ARTICLES)
+
+        self.articles_admitted += len(titles)
+        return titles
+
+    def can_download(self) -> bool:
+        """
+        Check the byte budget and the deadline before downloading an article.
+
+        Returns:
+            True if the article may be downloaded; otherwise the crawl is
+            marked as truncated.
+        """
+        if (
+            self.budget.max_bytes is not None
+            and self.stats.bytes_downloaded >= self.budget.max_bytes
+        ):
+            self.truncate(TRUNCATED_MAX_BYTES)
+            return False
+
+        if self.time_remaining() == 0:
+            self.truncate(TRUNCATED_TIME_LIMIT)
+            return False
+
+        return True
+
+    def record_download(self, size: int) -> None:
+        """
+        Count downloaded article content against the byte budget.
+
+        Args:
+            size: The number of bytes downloaded.
+        """
+        self.stats.bytes_downloaded += size
+
+    def should_expand(self) -> bool:
+        """Whether links of the current depth level must be followed."""
+        return self.current_depth < self.depth
+
+    def record_article(self, article: str, word_counts: Counter) -> None:
+        """
+        Store the word counts of a fetched article.
+
+        Args:
+            article: The article title.
+            word_counts: The word counts extracted from the article.
+        """
+        if self.keep_results:
+            self.results[article] = word_counts
+        self.stats.articles_fetched += 1
+
+    def record_missing(self, article: str) -> None:
+        """
+        Record an article that could not be fetched.
+
+        Args:
+            article: The article title.
+        """
+        self.stats.articles_missing += 1
+
+    def discover_links(self, links: Iterable[str], next_frontier: List[str]) -> None:
+        """
+        Queue the unvisited links of an article for the next depth level.
+
+        Links are canonicalized before they are checked against the visited set.
+
+        Args:
+            links: The linked article titles.
+            next_frontier: The frontier of the next depth level.
+        """
+        for link in links:
+            self.stats.links_discovered += 1
+            link = canonical_title(link)
+            if link and self.mark_visited(link):
+                next_frontier.append(link)
+
+    def expand_last_level(self, pages: Mapping[str, Optional[ProcessedArticle]]) -> None:
+        """
+        Build the frontier of a deepened crawl from the links of the last level.
+
+        The links are queued in the order of the articles, as if the last level
+        had been expanded when it was fetched.
+
+        Args:
+            pages: The processed articles of ``unexpanded`` by title, with their
+                   links; articles left out or None contribute no links.
+        """
+        next_frontier = []
+        for title in self.unexpanded:
+            page = pages.get(title)
+            if page is not None:
+                self.discover_links(page.links, next_frontier)
+        self.frontier = next_frontier
+        self.unexpanded = []
+
+    def advance(self, next_frontier: List[str]) -> None:
+        """
+        Move on to the next depth level.
+
+        Args:
+            next_frontier: The articles to fetch at the next depth level.
+        """
+        self.frontier = next_frontier
+        self.current_depth += 1
+
+    @property
+    def finished(self) -> bool:
+        """Whether there is nothing left to fetch."""
+        return not self.frontier or self.current_depth > self.depth
+
+    def levels(self) -> Iterator[LevelBatch]:
+        """
+        Iterate over the depth levels of the traversal.
+
+        Each batch must be passed to ``complete_level`` before the next one is
+        requested, as the next level is built from the links of the current one.
+
+        Yields:
+            The batch of articles of each depth level, shallowest first.
+        """
+        while not self.finished:
+            depth = self.current_depth
+            yield LevelBatch(depth, list(self.frontier), self.should_expand())
+            if self.current_depth == depth:
+                raise RuntimeError(f"Level {depth} was not completed")
+
+    def complete_level(
+        self, batch: LevelBatch, pages: Mapping[str, Optional[ProcessedArticle]]
+    ) -> None:
+        """
+        Record the processed articles of a level and move on to the next one.
+
+        Args:
+            batch: The batch of the current level.
+            pages: The processed articles of the batch by title, None for
+                   articles that could not be fetched. Articles skipped
+                   because the budget ran out are left out.
+        """
+        next_frontier = []
+        for title in batch.titles:
+            if title not in pages:
+                continue
+
+            page = pages[title]
+            if page is None:
+                self.record_missing(title)
+                continue
+
+            self.record_article(title, page.word_counts)
+            if batch.with_links and not self.truncated:
+                self.discover_links(page.links, next_frontier)
+            elif self.keep_frontier and batch.depth == self.depth:
+                # Links are only followed if the crawl is deepened
+                self.unexpanded.append(title)
+
+        self.advance(next_frontier)
@@ -0,0 +1,242 @@
+"""
+Module for keeping finished crawls so that deeper crawls can continue them.
+"""
+
+import dataclasses
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+
+from wiki_word_freq.cache import LRUCache
+from wiki_word_freq.session import CrawlBudget, CrawlSession, CrawlStats
+from wiki_word_freq.titles import canonical_title
+
+
+@dataclass
+class CrawlSnapshot:
+    """
+    The state of a complete crawl, from which a deeper crawl can continue.
+
+    A snapshot holds the visited set and the titles of the last level, whose
+    links a deeper crawl follows first, as left by a session run with
+    ``keep_frontier``, and the merged word counts of every article crawled.
+    Only the merged counts are kept, so that the counts of single articles,
+    shared with the article cache, are released when that cache evicts them.
+    """
+
+    start_article: str
+    depth: int
+    visited: FrozenSet[str]
+    unexpanded: Tuple[str, ...]
+    stats: CrawlStats
+    articles_admitted: int
+    # Total count of every word of the crawl; it must not be modified
+    word_counts: Counter
+
+    @classmethod
+    def from_session(cls, session: CrawlSession, word_counts: Counter) -> "CrawlSnapshot":
+        """
+        Take a snapshot of a finished session.
+
+        Copying the visited set takes time proportional to its size, so this
+        should not run on the event loop for large crawls.
+
+        Args:
+            session: The session, run with ``keep_frontier`` and not truncated.
+            word_counts: The merged counts of every article of the crawl,
+                         including those of the snapshot it continued.
+
+        Returns:
+            The snapshot.
+        """
+        return cls(
+            start_article=session.start_article,
+            depth=session.depth,
+            visited=frozenset(session.visited),
+            unexpanded=tuple(session.unexpanded),
+            stats=dataclasses.replace(session.stats),
+            articles_admitted=session.articles_admitted,
+            word_counts=word_counts,
+        )
+
+    def approximate_size(self) -> int:
+        """
+        Estimate the memory held by the snapshot, for size-bounded stores.
+
+        Returns:
+            The estimated size in bytes.
+        """
+        # Roughly a str object plus a dict or set slot per entry; the titles
+        # of the last level are also in the visited set
+        return (
+            sum(len(word) + 100 for word in self.word_counts)
+            + sum(len(title) + 60 for title in self.visited)
+            + 8 * len(self.unexpanded)
+        )
+
+    def fits(self, budget: CrawlBudget) -> bool:
+        """
+        Check whether a crawl with a budget would have fetched the whole snapshot.
+
+        Args:
+            budget: The budget of the crawl.
+
+        Returns:
+            True if neither the article nor the byte budget is exceeded.
+        """
+        if budget.max_articles is not None and self.articles_admitted > budget.max_articles:
+            return False
+        if budget.max_bytes is not None and self.stats.bytes_downloaded > budget.max_bytes:
+            return False
+        return True
+
+    def resume(self, depth: int, budget: CrawlBudget) -> CrawlSession:
+        """
+        Create a session continuing the crawl to a greater depth.
+
+        Only the levels below the snapshot's depth are fetched, starting from
+        the links of its last level, which the crawler follows first. Like
+        taking the snapshot, this copies the visited set. The article and byte
+        budgets count the articles of the snapshot too, so the result is the
+        same as that of a fresh crawl, while the time limit only applies to
+        the new levels.
+
+        Args:
+            depth: The depth of the new crawl, at least the snapshot's.
+            budget: The budget of the new crawl.
+
+        Returns:
+            A session whose ``results`` only receive the new articles.
+
+        Raises:
+            ValueError: If the depth is less than the snapshot's.
+        """
+        if depth < self.depth:
+            raise ValueError(
+                f"Cannot resume a crawl of depth {self.depth} at depth {depth}"
+            )
+
+        return CrawlSession(
+            self.start_article,
+            depth,
+            visited=set(self.visited),
+            current_depth=self.depth + 1,
+            stats=dataclasses.replace(self.stats),
+            budget=budget,
+            articles_admitted=self.articles_admitted,
+            keep_frontier=True,
+            unexpanded=list(self.unexpanded),
+        )
+
+
+class SnapshotStore:
+    """
+    Snapshots of complete crawls, by start article.
+
+    Only the deepest snapshot of an article is kept. Crawls cut short by their
+    budget are not stored, since their frontier is incomplete. The store is
+    bounded by the estimated size of its snapshots, including their visited
+    sets and frontiers, which no article budget limits.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = 64,
+        max_bytes: Optional[int] = 256 * 1024 * 1024,
+        ttl: Optional[float] = 3600.0,
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            max_entries: The maximum number of snapshots, 0 to disable the store.
+            max_bytes: The maximum estimated memory used by snapshots.
+            ttl: The number of seconds a snapshot stays valid.
+        """
+        self._snapshots: LRUCache[CrawlSnapshot] = LRUCache(
+            max_entries=max_entries,
+            max_bytes=max_bytes,
+            ttl=ttl,
+            sizeof=CrawlSnapshot.approximate_size,
+        )
+        self.enabled = max_entries != 0
+        self.resumed = 0
+
+    def get(
+        self, article: str, depth: int, budget: Optional[CrawlBudget] = None
+    ) -> Optional[CrawlSnapshot]:
+        """
+        Find a snapshot a crawl of an article can continue from.
+
+        Args:
+            article: The title of the start article.
+            depth: The depth of the crawl.
+            budget: The budget of the crawl, which must cover the snapshot.
+
+        Returns:
+            The snapshot, or None if there is none at this depth or less
+            within the budget.
+        """
+        snapshot = self._snapshots.get(canonical_title(article))
+        if snapshot is None or snapshot.depth > depth:
+            return None
+        if budget is not None and not snapshot.fits(budget):
+            return None
+        self.resumed += 1
+        return snapshot
+
+    def accepts(self, session: CrawlSession) -> bool:
+        """
+        Check whether a finished session would be stored, before merging its counts.
+
+        Args:
+            session: The session.
+
+        Returns:
+            False if the store is disabled, the session is truncated or didn't
+            keep its frontier, or a deeper snapshot of the same article exists.
+        """
+        if not self.enabled or session.truncated or not session.keep_frontier:
+            return False
+        current = self._snapshots.get(canonical_title(session.start_article))
+        return current is None or current.depth <= session.depth
+
+    def put(self, session: CrawlSession, word_counts: Counter) -> None:
+        """
+        Store a snapshot of a finished session, if the store accepts it and it
+        fits in the store's size.
+
+        Taking the snapshot copies the visited set, so this should not run on
+        the event loop for large crawls.
+
+        Args:
+            session: The session, run with ``keep_frontier``.
+            word_counts: The merged counts of every article of the crawl.
+        """
+        if self.accepts(session):
+            self._snapshots.set(
+                canonical_title(session.start_article),
+                CrawlSnapshot.from_session(session, word_counts),
+            )
+
+    def invalidate(self, article: Optional[str] = None) -> int:
+        """
+        Remove snapshots.
+
+        Args:
+            article: Only remove the snapshot of this article, or None to
+                     remove every snapshot.
+
+        Returns:
+            The number of removed snapshots.
+        """
+        if article is None:
+            count = len(self._snapshots)
+            self._snapshots.invalidate()
+            return count
+        title = canonical_title(article)
+        return self._snapshots.invalidate_matching(lambda key: key == title)
+
+    def info(self) -> Dict[str, Any]:
+        """Return the counters and the current size of the store."""
+        return {**self._snapshots.info(), "resumed": self.resumed}
@@ -0,0 +1,169 @@
+"""
+Module for persisting fetched and processed articles on disk.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from wiki_word_freq.processing import ProcessedArticle
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    title TEXT NOT NULL,
+    revision_id INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    html TEXT,
+    word_counts TEXT,
+    links TEXT,
+    PRIMARY KEY (title, revision_id)
+);
+"""
+
+
+@dataclass
+class StoredArticle:
+    """An article revision read from the store."""
+
+    title: str
+    revision_id: int
+    fetched_at: float
+    html: Optional[str] = None
+    processed: Optional[ProcessedArticle] = None
+
+
+class ArticleStore:
+    """
+    SQLite-backed store of fetched and processed articles.
+
+    Entries are keyed by title and revision ID; only the latest revision of each
+    title is kept. The database runs in WAL mode with a busy timeout, so several
+    processes on the same host, such as uvicorn workers, can share one file.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_age: Optional[float] = None,
+        busy_timeout: float = 30.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Initialize the store, creating the database if needed.
+
+        Args:
+            path: The path of the SQLite database file.
+            max_age: The number of seconds after which a stored revision is
+                     considered stale and refetched, or None to keep it forever.
+            busy_timeout: The number of seconds to wait for a lock held by
+                          another process.
+            clock: The time source, in seconds since the epoch.
+        """
+        self.path = path
+        self.max_age = max_age
+        self.busy_timeout = busy_timeout
+        self.clock = clock
+        # sqlite3 connections must not be shared between threads
+        self._local = threading.local()
+
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get the connection of the current thread."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path, timeout=self.busy_timeout, isolation_level=None
+            )
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def close(self) -> None:
+        """Close the connection of the current thread."""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def get(self, title: str) -> Optional[StoredArticle]:
+        """
+        Read the latest fresh revision of an article.
+
+        Args:
+            title: The normalized article title.
+
+        Returns:
+            The stored article, or None if it is missing or stale.
+        """
+        row = self._connection().execute(
+            "SELECT revision_id, fetched_at, html, word_counts, links FROM articles "
+            "WHERE title = ? ORDER BY revision_id DESC LIMIT 1",
+            (title,),
+        ).fetchone()
+        if row is None:
+            return None
+
+        revision_id, fetched_at, html, word_counts, links = row
+        if self.max_age is not None and fetched_at + self.max_age <= self.clock():
+            return None
+
+        processed = None
+        if word_counts is not None:
+            processed = ProcessedArticle(
+                Counter(json.loads(word_counts)), json.loads(links or "[]")
+            )
+        return StoredArticle(title, revision_id, fetched_at, html, processed)
+
+    def put_html(self, title: str, revision_id: int, html: str) -> None:
+        """
+        Store the HTML content of an article revision, replacing older revisions.
+
+        Args:
+            title: The normalized article title.
+            revision_id: The revision ID of the content.
+            html: The HTML content of the article.
+        """
+        connection = self._connection()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute(
+                "INSERT INTO articles (title, revision_id, fetched_at, html) "
+                "VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (title, revision_id) DO UPDATE SET "
+                "fetched_at = excluded.fetched_at, html = excluded.html",
+                (title, revision_id, self.clock(), html),
+            )
+            connection.execute(
+                "DELETE FROM articles WHERE title = ? AND revision_id != ?",
+                (title, revision_id),
+            )
+
+    def put_processed(self, title: str, processed: ProcessedArticle) -> None:
+        """
+        Store the word counts and links of the latest stored revision of an article.
+
+        Args:
+            title: The normalized article title.
+            processed: The processed article.
+        """
+        connection = self._connection()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute(
+                "UPDATE articles SET word_counts = ?, links = ? "
+                "WHERE title = ? AND revision_id = "
+                "(SELECT MAX(revision_id) FROM articles WHERE title = ?)",
+                (
+                    json.dumps(processed.word_counts),
+                    json.dumps(processed.links),
+                    title,
+                    title,
+                ),
+            )
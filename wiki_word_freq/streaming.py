@@ -0,0 +1,167 @@
+"""
+Module for streaming crawl progress and partial word frequencies to clients.
+"""
+
+import asyncio
+import json
+from collections import Counter
+from typing import Any, AsyncIterator, Awaitable, Dict, List, Optional, Tuple
+
+from wiki_word_freq.processing import ProcessedArticle
+from wiki_word_freq.session import CrawlListener, CrawlSession, LevelBatch
+
+# Supported stream formats
+FORMAT_NDJSON = "ndjson"
+FORMAT_SSE = "sse"
+STREAM_FORMATS = (FORMAT_NDJSON, FORMAT_SSE)
+
+MEDIA_TYPES = {
+    FORMAT_NDJSON: "application/x-ndjson",
+    FORMAT_SSE: "text/event-stream",
+}
+
+
+def choose_format(requested: Optional[str], accept: Optional[str]) -> str:
+    """
+    Choose the stream format from a query parameter or the ``Accept`` header.
+
+    Args:
+        requested: The requested format, which takes precedence.
+        accept: The value of the ``Accept`` header.
+
+    Returns:
+        The stream format, NDJSON unless server-sent events are asked for.
+
+    Raises:
+        ValueError: If the requested format is unknown.
+    """
+    if requested is not None:
+        if requested not in STREAM_FORMATS:
+            raise ValueError(
+                f"Unknown stream format '{requested}', "
+                f"expected one of {', '.join(STREAM_FORMATS)}"
+            )
+        return requested
+    if accept and MEDIA_TYPES[FORMAT_SSE] in accept:
+        return FORMAT_SSE
+    return FORMAT_NDJSON
+
+
+def encode_event(event: Dict[str, Any], stream_format: str) -> str:
+    """
+    Encode one event as an NDJSON line or a server-sent event.
+
+    Args:
+        event: The event, whose ``event`` key names its type.
+        stream_format: FORMAT_NDJSON or FORMAT_SSE.
+
+    Returns:
+        The encoded event.
+    """
+    data = json.dumps(event, separators=(",", ":"))
+    if stream_format == FORMAT_SSE:
+        return f"event: {event['event']}\ndata: {data}\n\n"
+    return data + "\n"
+
+
+class ProgressStream(CrawlListener):
+    """
+    Crawl listener that merges word counts as articles arrive and queues
+    progress events with a running top-K snapshot.
+
+    Only the merged counts are kept, so the crawl session can run with
+    ``keep_results=False``. Progress events are emitted every ``every``
+    articles and at the end of every level; when the client falls behind by
+    ``max_pending`` events, further progress snapshots are dropped rather than
+    buffered.
+    """
+
+    def __init__(
+        self,
+        session: CrawlSession,
+        top_k: int = 20,
+        every: int = 25,
+        max_pending: int = 64,
+    ):
+        """
+        Initialize the stream.
+
+        Args:
+            session: The crawl session reporting to this stream.
+            top_k: The number of most frequent words in each snapshot.
+            every: The number of articles between progress events.
+            max_pending: The number of events buffered for a slow client.
+        """
+        self.session = session
+        self.top_k = top_k
+        self.every = every
+        self.max_pending = max_pending
+        self.word_counts = Counter()
+        self.articles_fetched = 0
+        self.articles_missing = 0
+        self._queue: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue()
+
+    def top_words(self) -> List[Tuple[str, int]]:
+        """Return the ``top_k`` most frequent words so far, most frequent first."""
+        return self.word_counts.most_common(self.top_k)
+
+    def progress_event(self, event: str = "progress") -> Dict[str, Any]:
+        """Build an event describing the crawl so far."""
+        return {
+            "event": event,
+            "depth": self.session.current_depth,
+            "articles_fetched": self.articles_fetched,
+            "articles_missing": self.articles_missing,
+            "bytes_downloaded": self.session.stats.bytes_downloaded,
+            "top_words": self.top_words(),
+        }
+
+    def article_done(self, title: str, page: Optional[ProcessedArticle]) -> None:
+        """Merge the words of a fetched article and emit progress periodically."""
+        if page is None:
+            self.articles_missing += 1
+        else:
+            self.articles_fetched += 1
+            self.word_counts.update(page.word_counts)
+
+        if (self.articles_fetched + self.articles_missing) % self.every == 0:
+            self._emit(self.progress_event())
+
+    def level_done(self, session: CrawlSession, batch: LevelBatch) -> None:
+        """Emit a progress event at the end of a level."""
+        event = self.progress_event("level")
+        event["depth"] = batch.depth
+        event["next_level_articles"] = 0 if session.finished else len(session.frontier)
+        self._emit(event)
+
+    def _emit(self, event: Dict[str, Any]) -> None:
+        """Queue an event unless the client is too far behind."""
+        if self._queue.qsize() < self.max_pending:
+            self._queue.put_nowait(event)
+
+    async def run(self, crawl: Awaitable[CrawlSession]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run a crawl reporting to this stream, yielding events until it ends.
+
+        If the consumer stops iterating, the crawl is cancelled.
+
+        Args:
+            crawl: The crawl, e.g. ``crawler.crawl(session, listener=stream)``.
+
+        Yields:
+            The progress events, in order.
+
+        Raises:
+            Exception: Any error raised by the crawl, after the queued events.
+        """
+        task = asyncio.ensure_future(crawl)
+        task.add_done_callback(lambda _: self._queue.put_nowait(None))
+        try:
+            while True:
+                event = await self._queue.get()
+                if event is None:
+                    break
+                yield event
+            task.result()
+        finally:
+            task.cancel()
@@ -0,0 +1,199 @@
+"""
+A local stand-in for the MediaWiki API, served over HTTP for tests.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlparse
+
+
+def make_article(text: str, links: Sequence[str] = ()) -> str:
+    """Build the HTML of a fake article with the given text and links."""
+    anchors = " ".join(f'<a href="/wiki/{link}">{link}</a>' for link in links)
+    return f'<div class="mw-parser-output"><p>{text} {anchors}</p></div>'
+
+
+def make_extract(text: str, links: Sequence[str] = ()) -> str:
+    """Build the plain-text extract of a fake article, including its link texts."""
+    return " ".join([text, *links])
+
+
+def normalize(title: str) -> str:
+    """Normalize a title the way MediaWiki does."""
+    title = title.replace("_", " ").strip()
+    return title[:1].upper() + title[1:]
+
+
+class FakeWikipediaAPI:
+    """
+    MediaWiki API stand-in serving ``action=parse`` and ``action=query``.
+
+    Like the TextExtracts extension, a query returns the whole-article extract
+    of only one page per response, and at most ``links_per_response`` links,
+    so batches of several articles exercise ``continue`` handling.
+    """
+
+    def __init__(
+        self,
+        articles: Dict[str, Tuple[str, List[str]]],
+        redirects: Optional[Dict[str, str]] = None,
+        links_per_response: int = 2,
+    ):
+        """
+        Initialize the fake API.
+
+        Args:
+            articles: A dictionary mapping titles to their text and links.
+            redirects: A dictionary mapping redirect titles to their targets.
+            links_per_response: The number of links returned per response.
+        """
+        self.articles = articles
+        self.redirects = redirects or {}
+        self.links_per_response = links_per_response
+        # The parameters of every request, in order
+        self.requests: List[Dict[str, str]] = []
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        """The URL of the running API endpoint."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/w/api.php"
+
+    def start(self) -> "FakeWikipediaAPI":
+        """Start serving on a free local port in a background thread."""
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                params = {
+                    key: values[-1]
+                    for key, values in parse_qs(urlparse(self.path).query).items()
+                }
+                body = json.dumps(api.handle(params)).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the server."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def count(self, action: str) -> int:
+        """Count the requests made with an action."""
+        with self._lock:
+            return sum(1 for params in self.requests if params.get("action") == action)
+
+    def handle(self, params: Dict[str, str]) -> Dict:
+        """Answer one API request."""
+        with self._lock:
+            self.requests.append(params)
+
+        if params.get("action") == "parse":
+            return self.parse(params)
+        if params.get("action") == "query":
+            return self.query(params)
+        return {"error": {"code": "badvalue", "info": "Unrecognized action"}}
+
+    def parse(self, params: Dict[str, str]) -> Dict:
+        """Answer an ``action=parse`` request."""
+        title = self.redirects.get(normalize(params["page"]), normalize(params["page"]))
+        if title not in self.articles:
+            return {
+                "error": {
+                    "code": "missingtitle",
+                    "info": "The page you specified doesn't exist.",
+                }
+            }
+        text, links = self.articles[title]
+        parsed = {
+            "title": title,
+            "revid": 1,
+            "text": {"*": make_article(text, links)},
+        }
+        if "links" in params.get("prop", "").split("|"):
+            parsed["links"] = [
+                {"ns": 0, "exists": "", "*": link}
+                if self.exists(link)
+                else {"ns": 0, "*": link}
+                for link in links
+            ]
+        return {"parse": parsed}
+
+    def exists(self, title: str) -> bool:
+        """Whether a title leads to an article, possibly through a redirect."""
+        title = normalize(title)
+        return self.redirects.get(title, title) in self.articles
+
+    def query(self, params: Dict[str, str]) -> Dict:
+        """Answer an ``action=query`` request with extracts and links."""
+        query = {}
+        pages = []
+        for requested in params["titles"].split("|"):
+            title = normalize(requested)
+            if title != requested:
+                query.setdefault("normalized", []).append(
+                    {"from": requested, "to": title}
+                )
+            if title in self.redirects:
+                query.setdefault("redirects", []).append(
+                    {"from": title, "to": self.redirects[title]}
+                )
+                title = self.redirects[title]
+            if title not in pages:
+                pages.append(title)
+
+        props = params.get("prop", "").split("|")
+        extract_offset = int(params.get("excontinue", 0))
+        link_offset = int(params.get("plcontinue", 0))
+        all_links = [
+            (title, link)
+            for title in pages
+            if title in self.articles
+            for link in self.articles[title][1]
+        ]
+        links = all_links[link_offset : link_offset + self.links_per_response]
+
+        query["pages"] = []
+        existing = [title for title in pages if title in self.articles]
+        for title in pages:
+            if title not in self.articles:
+                query["pages"].append({"title": title, "missing": True})
+                continue
+            page = {"pageid": existing.index(title) + 1, "ns": 0, "title": title}
+            if (
+                "extracts" in props
+                and extract_offset < len(existing)
+                and existing[extract_offset] == title
+            ):
+                page["extract"] = make_extract(*self.articles[title])
+            if "links" in props:
+                page_links = [link for source, link in links if source == title]
+                if page_links:
+                    page["links"] = [{"ns": 0, "title": link} for link in page_links]
+            query["pages"].append(page)
+
+        response = {"batchcomplete": True, "query": query}
+        more_extracts = "extracts" in props and extract_offset + 1 < len(existing)
+        more_links = "links" in props and link_offset + len(links) < len(all_links)
+        if more_extracts or more_links:
+            response.pop("batchcomplete")
+            response["continue"] = {
+                "excontinue": extract_offset + 1 if more_extracts else len(existing),
+                "plcontinue": link_offset + len(links),
+                "continue": "||",
+            }
+        return response
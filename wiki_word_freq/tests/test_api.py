@@ -2,13 +2,49 @@
 Tests for the API endpoints.
 """
 
+import asyncio
+import json
+import threading
 import unittest
-from unittest.mock import patch
+from collections import Counter
+from dataclasses import replace
+from unittest.mock import AsyncMock, patch
+
+import httpx
 from fastapi.testclient import TestClient
 
-from wiki_word_freq.main import app
-from wiki_word_freq.wikipedia import WikipediaClient
-from wiki_word_freq.word_frequency import WordFrequencyAnalyzer
+from wiki_word_freq.crawler import AsyncWikipediaCrawler
+from wiki_word_freq.main import (
+    app,
+    count_cache,
+    crawl_snapshots,
+    job_manager,
+    result_cache,
+    settings,
+)
+from wiki_word_freq.processing import ProcessedArticle
+from wiki_word_freq.session import LevelBatch, TRUNCATED_MAX_ARTICLES
+from wiki_word_freq.word_frequency import (
+    VectorizedWordFrequencyAnalyzer,
+    WordFrequencyAnalyzer,
+)
+
+
+def fake_crawl(words_by_article, truncation_reason=None):
+    """Build a replacement for the crawl method that finds the given articles."""
+
+    async def crawl(session, listener=None):
+        for title, words in words_by_article.items():
+            session.record_article(title, words)
+            if listener is not None:
+                listener.article_done(title, ProcessedArticle(Counter(words)))
+        if truncation_reason is not None:
+            session.truncate(truncation_reason)
+        if listener is not None:
+            listener.level_done(session, LevelBatch(0, list(words_by_article), False))
+        return session
+
+    return crawl
 
 
 class TestAPI(unittest.TestCase):
@@ -17,12 +53,21 @@ class TestAPI(unittest.TestCase):
     def setUp(self):
         """Set up test fixtures."""
         self.client = TestClient(app)
+        result_cache.invalidate()
+        count_cache.invalidate()
+        crawl_snapshots.invalidate()
 
         # Sample data for mocking
         self.sample_words_by_article = {
             "Python": ["python", "programming", "language", "code", "python"],
             "Programming": ["code", "programming", "software", "development"],
         }
+        # Complete crawls reach the analyzer as one merged entry
+        self.merged_words_by_article = {
+            "Python": Counter(
+                word for words in self.sample_words_by_article.values() for word in words
+            )
+        }
 
         self.sample_word_frequencies = {
             "word_count": {
@@ -43,12 +88,12 @@ class TestAPI(unittest.TestCase):
             },
         }
 
-    @patch.object(WikipediaClient, "traverse_articles")
+    @patch.object(AsyncWikipediaCrawler, "crawl", new_callable=AsyncMock)
     @patch.object(WordFrequencyAnalyzer, "calculate_word_frequencies")
-    def test_get_word_frequency(self, mock_calculate, mock_traverse):
+    def test_get_word_frequency(self, mock_calculate, mock_crawl):
         """Test the GET /word-frequency endpoint."""
         # Mock the dependencies
-        mock_traverse.return_value = self.sample_words_by_article
+        mock_crawl.side_effect = fake_crawl(self.sample_words_by_article)
         mock_calculate.return_value = self.sample_word_frequencies
 
         # Make the request
@@ -63,14 +108,16 @@ class TestAPI(unittest.TestCase):
         )
 
         # Verify the dependencies were called with the correct arguments
-        mock_traverse.assert_called_once_with("Python", 1)
-        mock_calculate.assert_called_once_with(self.sample_words_by_article)
+        mock_crawl.assert_called_once()
+        session = mock_crawl.call_args.args[0]
+        self.assertEqual((session.start_article, session.depth), ("Python", 1))
+        mock_calculate.assert_called_once_with(self.merged_words_by_article, total=None)
 
-    @patch.object(WikipediaClient, "traverse_articles")
-    def test_get_word_frequency_article_not_found(self, mock_traverse):
+    @patch.object(AsyncWikipediaCrawler, "crawl", new_callable=AsyncMock)
+    def test_get_word_frequency_article_not_found(self, mock_crawl):
         """Test the GET /word-frequency endpoint with a non-existent article."""
-        # Mock the traverse_articles method to return an empty dictionary
-        mock_traverse.return_value = {}
+        # Mock the crawl method to find no articles
+        mock_crawl.side_effect = fake_crawl({})
 
         # Make the request
         response = self.client.get("/word-frequency?article=NonExistentArticle&depth=1")
@@ -80,13 +127,15 @@ class TestAPI(unittest.TestCase):
         self.assertIn("404", response.json()['detail'])
         self.assertIn("not found", response.json()["detail"])
 
-    @patch.object(WikipediaClient, "traverse_articles")
-    @patch.object(WordFrequencyAnalyzer, "calculate_word_frequencies")
-    def test_post_keywords(self, mock_calculate, mock_traverse):
+    @patch.object(AsyncWikipediaCrawler, "crawl", new_callable=AsyncMock)
+    @patch.object(WordFrequencyAnalyzer, "count_words")
+    @patch.object(WordFrequencyAnalyzer, "frequencies_from_counts")
+    def test_post_keywords(self, mock_frequencies, mock_count, mock_crawl):
         """Test the POST /keywords endpoint."""
         # Mock the dependencies
-        mock_traverse.return_value = self.sample_words_by_article
-        mock_calculate.return_value = self.sample_word_frequencies
+        mock_crawl.side_effect = fake_crawl(self.sample_words_by_article)
+        mock_count.return_value = self.sample_word_frequencies["word_count"]
+        mock_frequencies.return_value = self.sample_word_frequencies
 
         # Request data
         request_data = {
@@ -108,16 +157,106 @@ class TestAPI(unittest.TestCase):
         )
 
         # Verify the dependencies were called with the correct arguments
-        mock_traverse.assert_called_once_with("Python", 1)
-        mock_calculate.assert_called_once_with(
-            self.sample_words_by_article, ignore_list=["code"], percentile=50
+        mock_crawl.assert_called_once()
+        session = mock_crawl.call_args.args[0]
+        self.assertEqual((session.start_article, session.depth), ("Python", 1))
+        mock_count.assert_called_once_with(self.merged_words_by_article, {"code"})
+        word_count, percentile, index, total = mock_frequencies.call_args.args
+        self.assertEqual(word_count, self.sample_word_frequencies["word_count"])
+        self.assertEqual(percentile, 50)
+        self.assertEqual(index.size, 6)
+        self.assertIsNone(total)
+
+    @patch.object(AsyncWikipediaCrawler, "crawl", new_callable=AsyncMock)
+    @patch.object(WordFrequencyAnalyzer, "count_words", autospec=True)
+    def test_percentiles_share_counts(self, mock_count, mock_crawl):
+        """Test that requests differing only in their percentile count once."""
+        mock_crawl.side_effect = fake_crawl(self.sample_words_by_article)
+        mock_count.side_effect = lambda analyzer, words_by_article, ignore_list: (
+            WordFrequencyAnalyzer().merge_word_counts(words_by_article)
+        )
+
+        request = {"article": "Python", "depth": 1}
+        responses = [
+            self.client.post("/keywords", json={**request, "percentile": percentile})
+            for percentile in (0, 50, 90)
+        ]
+
+        self.assertEqual(
+            [response.headers["X-Cache"] for response in responses], ["MISS"] * 3
+        )
+        self.assertEqual(len(responses[0].json()["word_count"]), 6)
+        self.assertEqual(
+            set(responses[1].json()["word_count"]), {"python", "programming", "code"}
+        )
+        mock_crawl.assert_called_once()
+        mock_count.assert_called_once()
+
+    @patch.object(AsyncWikipediaCrawler, "crawl", new_callable=AsyncMock)
+    def test_keywords_with_numpy_engine(self, mock_crawl):
+        """Test that the numpy engine filters cached counts without dictionaries."""
+        mock_crawl.side_effect = fake_crawl(self.sample_words_by_article)
+        request = {"article": "Python", "depth": 1, "ignore_list": ["language"]}
+        percentiles = (0, 50, 90)
+
+        expected = [
+            self.client.post("/keywords", json={**request, "percentile": percentile}).json()
+            for percentile in percentiles
+        ]
+        count_cache.invalidate()
+        result_cache.invalidate()
+
+        # The dictionary code paths of the base class must not be reached
+        with patch(
+            "wiki_word_freq.main.word_frequency_analyzer",
+            VectorizedWordFrequencyAnalyzer(),
+        ), patch.object(
+            WordFrequencyAnalyzer, "frequencies_from_counts", side_effect=AssertionError
+        ), patch.object(
+            WordFrequencyAnalyzer, "filter_by_percentile", side_effect=AssertionError
+        ):
+            responses = [
+                self.client.post("/keywords", json={**request, "percentile": percentile})
+                for percentile in percentiles
+            ]
+
+        for percentile, response, fresh in zip(percentiles, responses, expected):
+            with self.subTest(percentile=percentile):
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json(), fresh)
+        mock_crawl.assert_called()
+
+    @patch.object(AsyncWikipediaCrawler, "crawl", new_callable=AsyncMock)
+    def test_named_ignore_list(self, mock_crawl):
+        """Test ignoring a list registered on the server, along with the request's."""
+        mock_crawl.side_effect = fake_crawl(
+            {"Python": ["the", "python", "and", "code", "python"]}
+        )
+
+        lists = self.client.get("/ignore-lists").json()["ignore_lists"]
+        response = self.client.post(
+            "/keywords",
+            json={
+                "article": "Python",
+                "depth": 0,
+                "ignore_list": ["Code"],
+                "ignore_list_id": "english-stopwords",
+            },
         )
+        unknown_list = {"article": "Python", "depth": 0, "ignore_list_id": "klingon"}
+        unknown = self.client.post("/keywords", json=unknown_list)
 
-    @patch.object(WikipediaClient, "traverse_articles")
-    def test_post_keywords_article_not_found(self, mock_traverse):
+        self.assertGreater(lists["english-stopwords"], 100)
+        self.assertEqual(response.json()["word_count"], {"python": 2})
+        self.assertEqual(unknown.status_code, 400)
+        self.assertIn("english-stopwords", unknown.json()["detail"])
+        self.assertEqual(self.client.post("/jobs", json=unknown_list).status_code, 400)
+
+    @patch.object(AsyncWikipediaCrawler, "crawl", new_callable=AsyncMock)
+    def test_post_keywords_article_not_found(self, mock_crawl):
         """Test the POST /keywords endpoint with a non-existent article."""
-        # Mock the traverse_articles method to return an empty dictionary
-        mock_traverse.return_value = {}
+        # Mock the crawl method to find no articles
+        mock_crawl.side_effect = fake_crawl({})
 
         # Request data
         request_data = {"article": "NonExistentArticle", "depth": 1}
@@ -130,6 +269,347 @@ class TestAPI(unittest.TestCase):
         self.assertIn("404", response.json()['detail'])
         self.assertIn("not found", response.json()["detail"])
 
+    @patch.object(AsyncWikipediaCrawler, "crawl", new_callable=AsyncMock)
+    @patch.object(WordFrequencyAnalyzer, "calculate_word_frequencies")
+    def test_repeated_requests_use_result_cache(self, mock_calculate, mock_crawl):
+        """Test that identical requests are served from the result cache."""
+        mock_crawl.side_effect = fake_crawl(self.sample_words_by_article)
+        mock_calculate.return_value = self.sample_word_frequencies
+
+        first = self.client.get("/word-frequency?article=Python&depth=1")
+        second = self.client.post("/keywords", json={"article": "Python", "depth": 1})
+
+        self.assertEqual(first.headers["X-Cache"], "MISS")
+        self.assertEqual(second.headers["X-Cache"], "HIT")
+        self.assertEqual(second.json(), first.json())
+        mock_crawl.assert_called_once()
+
+        # After invalidation the result is computed again
+        response = self.client.delete("/cache/results?article=Python")
+        self.assertEqual(response.json(), {"invalidated": 1})
+
+        third = self.client.get("/word-frequency?article=Python&depth=1")
+        self.assertEqual(third.headers["X-Cache"], "MISS")
+        self.assertEqual(mock_crawl.call_count, 2)
+
+    @patch.object(AsyncWikipediaCrawler, "crawl", new_callable=AsyncMock)
+    def test_deeper_request_continues_snapshot(self, mock_crawl):
+        """Test that a deeper request only crawls the levels it adds."""
+        calls = []
+
+        async def crawl(session, listener=None):
+            calls.append((session.current_depth, session.keep_frontier))
+            articles = (
+                self.sample_words_by_article
+                if session.current_depth == 0
+                else {"Guido van Rossum": Counter({"python": 3, "dutch": 1})}
+            )
+            return await fake_crawl(articles)(session, listener)
+
+        mock_crawl.side_effect = crawl
+
+        shallow = self.client.post("/keywords", json={"article": "Python", "depth": 1})
+        deep = self.client.post("/keywords", json={"article": "Python", "depth": 2})
+
+        self.assertEqual(calls, [(0, True), (2, True)])
+        expected = Counter()
+        for counts in self.sample_words_by_article.values():
+            expected.update(counts)
+        self.assertEqual(shallow.json()["word_count"], dict(expected))
+        expected.update({"python": 3, "dutch": 1})
+        self.assertEqual(deep.json()["word_count"], dict(expected))
+        self.assertEqual(self.client.get("/cache/stats").json()["snapshots"]["resumed"], 1)
+
+        # Invalidating the results of an article drops its snapshot too
+        self.client.delete("/cache/results?article=Python")
+        self.client.post("/keywords", json={"article": "Python", "depth": 2})
+        self.assertEqual(calls[-1], (0, True))
+
+    @patch.object(AsyncWikipediaCrawler, "crawl", new_callable=AsyncMock)
+    @patch.object(WordFrequencyAnalyzer, "calculate_word_frequencies")
+    def test_crawl_budget(self, mock_calculate, mock_crawl):
+        """Test that request budgets are capped and truncation is reported."""
+        mock_crawl.side_effect = fake_crawl(
+            self.sample_words_by_article, TRUNCATED_MAX_ARTICLES
+        )
+        mock_calculate.return_value = self.sample_word_frequencies
+
+        response = self.client.post(
+            "/keywords",
+            json={"article": "Python", "depth": 2, "max_articles": 5, "time_limit": 1e9},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["truncated"])
+        self.assertEqual(response.json()["truncation_reason"], "max_articles")
+
+        budget = mock_crawl.call_args.args[0].budget
+        self.assertEqual(budget.max_articles, 5)
+        self.assertEqual(budget.time_limit, 300.0)
+
+    @patch.object(AsyncWikipediaCrawler, "crawl", new_callable=AsyncMock)
+    @patch.object(WordFrequencyAnalyzer, "calculate_word_frequencies")
+    def test_word_frequency_counts_in_worker_pool(self, mock_calculate, mock_crawl):
+        """Test that word counting runs in the worker pool, not on the event loop."""
+        threads = []
+
+        def calculate(*args, **kwargs):
+            threads.append(threading.current_thread().name)
+            return self.sample_word_frequencies
+
+        mock_crawl.side_effect = fake_crawl(self.sample_words_by_article)
+        mock_calculate.side_effect = calculate
+
+        response = self.client.get("/word-frequency?article=Python&depth=0")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(threads), 1)
+        self.assertTrue(threads[0].startswith("wiki-word-freq"))
+
+    @patch.object(AsyncWikipediaCrawler, "crawl", new_callable=AsyncMock)
+    @patch.object(WordFrequencyAnalyzer, "calculate_word_frequencies")
+    def test_paging(self, mock_calculate, mock_crawl):
+        """Test that pages of words are selected from one cached result."""
+        mock_crawl.side_effect = fake_crawl(self.sample_words_by_article)
+        mock_calculate.return_value = self.sample_word_frequencies
+
+        first = self.client.get("/word-frequency?article=Python&depth=1&limit=2")
+        second = self.client.post(
+            "/keywords",
+            json={"article": "Python", "depth": 1, "limit": 2, "offset": 2},
+        )
+        alphabetical = self.client.get(
+            "/word-frequency?article=Python&depth=1&sort=word&limit=1"
+        )
+
+        self.assertEqual(list(first.json()["word_count"]), ["code", "programming"])
+        self.assertEqual(first.json()["word_frequency"], {"code": 22.22, "programming": 22.22})
+        self.assertEqual(first.json()["vocabulary_size"], 6)
+        self.assertEqual(list(second.json()["word_count"]), ["python", "development"])
+        self.assertEqual(second.headers["X-Cache"], "HIT")
+        self.assertEqual(alphabetical.json()["word_count"], {"code": 2})
+        mock_crawl.assert_called_once()
+
+        invalid = self.client.get("/word-frequency?article=Python&sort=length")
+        self.assertEqual(invalid.status_code, 422)
+
+    @patch.object(AsyncWikipediaCrawler, "crawl", new_callable=AsyncMock)
+    @patch.object(WordFrequencyAnalyzer, "calculate_word_frequencies")
+    def test_compact_format(self, mock_calculate, mock_crawl):
+        """Test choosing the compact format by query parameter or Accept header."""
+        mock_crawl.side_effect = fake_crawl(self.sample_words_by_article)
+        mock_calculate.return_value = self.sample_word_frequencies
+        compact_type = "application/vnd.wiki-word-freq.compact+json"
+
+        by_param = self.client.get(
+            "/word-frequency?article=Python&depth=1&format=compact&limit=2"
+        )
+        by_header = self.client.post(
+            "/keywords",
+            json={"article": "Python", "depth": 1},
+            headers={"Accept": compact_type},
+        )
+
+        self.assertEqual(by_param.headers["content-type"], compact_type)
+        self.assertEqual(
+            by_param.json(),
+            {
+                "words": ["code", "programming"],
+                "counts": [2, 2],
+                "total": 9,
+                "truncated": False,
+                "truncation_reason": None,
+                "vocabulary_size": 6,
+            },
+        )
+        self.assertEqual(by_header.headers["content-type"], compact_type)
+        self.assertEqual(by_header.headers["X-Cache"], "HIT")
+        self.assertEqual(len(by_header.json()["words"]), 6)
+
+        invalid = self.client.get("/word-frequency?article=Python&format=xml")
+        self.assertEqual(invalid.status_code, 422)
+
+    @patch.object(AsyncWikipediaCrawler, "crawl", new_callable=AsyncMock)
+    def test_approximate_counting(self, mock_crawl):
+        """Test that approximate counting merges articles as they arrive."""
+        mock_crawl.side_effect = fake_crawl(self.sample_words_by_article)
+
+        exact = self.client.post("/keywords", json={"article": "Python", "depth": 1})
+        approximate = self.client.post(
+            "/keywords",
+            json={
+                "article": "Python",
+                "depth": 1,
+                "ignore_list": ["code"],
+                "counting": "approximate",
+            },
+        )
+
+        self.assertNotIn("error_bound", exact.json())
+        self.assertEqual(approximate.headers["X-Cache"], "MISS")
+        data = approximate.json()
+        expected = dict(self.sample_word_frequencies["word_count"])
+        del expected["code"]
+        self.assertEqual(data["word_count"], expected)
+        self.assertEqual(data["error_bound"], 0)
+        self.assertFalse(mock_crawl.call_args.args[0].keep_results)
+
+        invalid = self.client.get("/word-frequency?article=Python&counting=fuzzy")
+        self.assertEqual(invalid.status_code, 422)
+
+    @patch.object(AsyncWikipediaCrawler, "crawl", new_callable=AsyncMock)
+    def test_approximate_frequencies_count_untracked_words(self, mock_crawl):
+        """Test that frequencies stay relative to every word once words are dropped."""
+        mock_crawl.side_effect = fake_crawl(
+            {
+                "Python": ["w0"] * 20 + ["w1"] * 10 + ["a", "b", "c"],
+                "Snake": ["w0"] * 10 + ["w1"] * 5 + ["d", "e", "f", "g"],
+            }
+        )
+
+        exact = self.client.get("/word-frequency?article=Python&depth=1").json()
+        with patch("wiki_word_freq.main.settings", replace(settings, approx_capacity=3)):
+            approximate = self.client.get(
+                "/word-frequency?article=Python&depth=1&counting=approximate"
+            ).json()
+            compact = self.client.post(
+                "/keywords?format=compact",
+                json={"article": "Python", "depth": 1, "counting": "approximate"},
+            ).json()
+
+        self.assertEqual(set(approximate["word_count"]), {"w0", "w1"})
+        self.assertGreater(approximate["error_bound"], 0)
+        self.assertEqual(approximate["word_count"]["w0"], exact["word_count"]["w0"])
+        self.assertAlmostEqual(
+            approximate["word_frequency"]["w0"], exact["word_frequency"]["w0"]
+        )
+        self.assertEqual(compact["total"], 52)
+        self.assertEqual(compact["counts"][compact["words"].index("w0")], 30)
+
+    @patch.object(AsyncWikipediaCrawler, "crawl", new_callable=AsyncMock)
+    def test_stream_word_frequency(self, mock_crawl):
+        """Test streaming progress events followed by the result."""
+        mock_crawl.side_effect = fake_crawl(self.sample_words_by_article)
+
+        response = self.client.get(
+            "/word-frequency/stream?article=Python&depth=1&top_k=2&progress_every=1"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("application/x-ndjson"))
+        events = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual(
+            [event["event"] for event in events], ["progress", "progress", "level", "result"]
+        )
+        self.assertEqual(events[0]["top_words"], [["python", 2], ["programming", 1]])
+        self.assertEqual(events[-1]["word_count"], self.sample_word_frequencies["word_count"])
+        self.assertFalse(events[-1]["truncated"])
+        self.assertFalse(mock_crawl.call_args.args[0].keep_results)
+
+    @patch.object(AsyncWikipediaCrawler, "crawl", new_callable=AsyncMock)
+    def test_stream_word_frequency_limit(self, mock_crawl):
+        """Test that only the most frequent words are sent in the result event."""
+        mock_crawl.side_effect = fake_crawl(self.sample_words_by_article)
+
+        response = self.client.get("/word-frequency/stream?article=Python&depth=1&limit=1")
+
+        result = json.loads(response.text.splitlines()[-1])
+        self.assertEqual(result["event"], "result")
+        # Ties are broken alphabetically
+        self.assertEqual(result["word_count"], {"code": 2})
+        self.assertAlmostEqual(result["word_frequency"]["code"], 200 / 9)
+        self.assertEqual(
+            result["vocabulary_size"], len(self.sample_word_frequencies["word_count"])
+        )
+
+    @patch.object(AsyncWikipediaCrawler, "crawl", new_callable=AsyncMock)
+    def test_stream_word_frequency_sse_not_found(self, mock_crawl):
+        """Test server-sent events and an error event for a missing article."""
+        mock_crawl.side_effect = fake_crawl({})
+
+        response = self.client.get(
+            "/word-frequency/stream?article=Missing",
+            headers={"Accept": "text/event-stream"},
+        )
+
+        self.assertTrue(response.headers["content-type"].startswith("text/event-stream"))
+        self.assertIn("event: error\n", response.text)
+        self.assertIn('"status_code":404', response.text)
+        self.assertEqual(
+            self.client.get("/word-frequency/stream?article=Python&format=xml").status_code,
+            400,
+        )
+
+    def test_stats(self):
+        """Test that the counters of cancelled work are reported."""
+        response = self.client.get("/stats")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            set(response.json()["crawler"]), {"crawls_cancelled", "fetches_cancelled"}
+        )
+        self.assertIn("disconnects", response.json()["requests"])
+
+
+class TestJobsAPI(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the crawl job endpoints."""
+
+    async def asyncSetUp(self):
+        """Set up test fixtures."""
+        # Jobs outlive their request, so they need a single event loop
+        self.client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://testserver"
+        )
+
+    async def asyncTearDown(self):
+        """Clean up test fixtures."""
+        await self.client.aclose()
+
+    @patch.object(AsyncWikipediaCrawler, "crawl", new_callable=AsyncMock)
+    async def test_job_lifecycle(self, mock_crawl):
+        """Test submitting a job, following its progress and reading its result."""
+        mock_crawl.side_effect = fake_crawl(
+            {"Python": ["python", "code", "python"], "Code": ["python", "software"]}
+        )
+
+        response = await self.client.post(
+            "/jobs", json={"article": "Python", "depth": 1, "ignore_list": ["software"]}
+        )
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()["job_id"]
+        await job_manager.join()
+
+        status = (await self.client.get(f"/jobs/{job_id}")).json()
+        self.assertEqual(status["status"], "completed")
+        self.assertEqual(status["progress"]["articles_fetched"], 2)
+        self.assertEqual(status["request"]["ignore_list"], ["software"])
+
+        result = await self.client.get(f"/jobs/{job_id}/result?limit=1&sort=count")
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(result.json()["word_count"], {"python": 3})
+        self.assertEqual(result.json()["vocabulary_size"], 2)
+
+        self.assertEqual((await self.client.get("/jobs/missing")).status_code, 404)
+
+    @patch.object(AsyncWikipediaCrawler, "crawl", new_callable=AsyncMock)
+    async def test_cancel_job(self, mock_crawl):
+        """Test that a cancelled job has no result."""
+
+        async def crawl(session, listener=None):
+            await asyncio.sleep(10)
+
+        mock_crawl.side_effect = crawl
+
+        job_id = (
+            await self.client.post("/jobs", json={"article": "Python", "depth": 3})
+        ).json()["job_id"]
+        cancelled = await self.client.delete(f"/jobs/{job_id}")
+
+        self.assertEqual(cancelled.json()["status"], "cancelled")
+        self.assertEqual(
+            (await self.client.get(f"/jobs/{job_id}/result")).status_code, 409
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,113 @@
+"""
+Tests for approximate word counting.
+"""
+
+import random
+import unittest
+from collections import Counter
+
+from wiki_word_freq.approximate import (
+    ApproximateWordCounter,
+    CountMinSketch,
+    HeavyHitters,
+)
+from wiki_word_freq.processing import ProcessedArticle
+
+
+def zipf_articles(articles=50, words_per_article=400, vocabulary=5000, seed=7):
+    """Build articles whose words follow a Zipf-like distribution."""
+    rng = random.Random(seed)
+    weights = [1 / rank for rank in range(1, vocabulary + 1)]
+    population = [f"word{rank}" for rank in range(vocabulary)]
+    return [
+        Counter(rng.choices(population, weights, k=words_per_article))
+        for _ in range(articles)
+    ]
+
+
+class TestCountMinSketch(unittest.TestCase):
+    """Test cases for the CountMinSketch class."""
+
+    def test_estimates_never_undercount(self):
+        """Test that estimates are above the true counts, by the bound on average."""
+        sketch = CountMinSketch(width=256, depth=4)
+        total = Counter()
+        for counts in zipf_articles(articles=10):
+            sketch.update(counts)
+            total.update(counts)
+
+        words = list(total)
+        estimates = sketch.estimate(words)
+        self.assertEqual(sketch.total, sum(total.values()))
+        for word, estimate in zip(words, estimates):
+            self.assertGreaterEqual(estimate, total[word])
+        overcounts = [estimate - total[word] for word, estimate in zip(words, estimates)]
+        self.assertLessEqual(sum(overcounts) / len(overcounts), sketch.error_bound)
+
+
+class TestHeavyHitters(unittest.TestCase):
+    """Test cases for the HeavyHitters class."""
+
+    def test_capacity_and_guarantees(self):
+        """Test that at most capacity words are kept, within the decrement."""
+        heavy_hitters = HeavyHitters(capacity=50)
+        total = Counter()
+        for counts in zipf_articles():
+            heavy_hitters.update(counts)
+            total.update(counts)
+            self.assertLessEqual(len(heavy_hitters.counts), 50)
+
+        self.assertLessEqual(heavy_hitters.decremented, sum(total.values()) / 51)
+        for word, count in total.items():
+            tracked = heavy_hitters.counts.get(word, 0)
+            self.assertLessEqual(tracked, count)
+            self.assertGreaterEqual(tracked, count - heavy_hitters.decremented)
+
+    def test_small_vocabulary_is_exact(self):
+        """Test that counts are exact while the vocabulary fits."""
+        heavy_hitters = HeavyHitters(capacity=10)
+        heavy_hitters.update({"a": 2, "b": 1})
+        heavy_hitters.update({"a": 1, "c": 4})
+        self.assertEqual(heavy_hitters.counts, {"a": 3, "b": 1, "c": 4})
+        self.assertEqual(heavy_hitters.decremented, 0)
+
+
+class TestApproximateWordCounter(unittest.TestCase):
+    """Test cases for the ApproximateWordCounter class."""
+
+    def test_top_words_within_error_bound(self):
+        """Test that reported counts bracket the true counts of the top words."""
+        counter = ApproximateWordCounter(
+            capacity=100, sketch_width=1024, ignore_list=["WORD1"]
+        )
+        total = Counter()
+        for index, counts in enumerate(zipf_articles()):
+            counter.article_done(f"Article {index}", ProcessedArticle(counts))
+            total.update(counts)
+        counter.article_done("Missing", None)
+        del total["word1"]
+
+        word_counts = counter.word_counts()
+        error_bound = counter.error_bound()
+        self.assertLessEqual(len(word_counts), 100)
+        self.assertNotIn("word1", word_counts)
+        for word, count in word_counts.items():
+            self.assertGreaterEqual(count, total[word])
+            self.assertLessEqual(count - error_bound, total[word])
+
+        top = [word for word, _ in total.most_common(5)]
+        self.assertTrue(set(top) <= set(word_counts))
+        # Frequencies are relative to every counted word, tracked or not
+        self.assertEqual(counter.total, sum(total.values()))
+        self.assertLess(sum(word_counts.values()), counter.total)
+
+    def test_exact_when_vocabulary_fits(self):
+        """Test that a small crawl is counted exactly."""
+        counter = ApproximateWordCounter(capacity=100)
+        counter.article_done("A", ProcessedArticle(Counter(["a", "b", "a"])))
+        self.assertEqual(counter.word_counts(), {"a": 2, "b": 1})
+        self.assertEqual(counter.error_bound(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+Tests for the LRU cache.
+"""
+
+import unittest
+from wiki_word_freq.cache import LRUCache
+
+
+class FakeClock:
+    """Manually advanced time source."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLRUCache(unittest.TestCase):
+    """Test cases for the LRUCache class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.clock = FakeClock()
+
+    def test_get_and_set(self):
+        """Test storing values and counting hits and misses."""
+        cache = LRUCache(max_entries=2)
+        cache.set("a", 1)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.stats.hits, 1)
+        self.assertEqual(cache.stats.misses, 1)
+
+    def test_evicts_least_recently_used(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = LRUCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(cache.stats.evictions, 1)
+
+    def test_evicts_by_size(self):
+        """Test that entries are evicted when the size limit is exceeded."""
+        cache = LRUCache(max_entries=None, max_bytes=10, sizeof=len)
+        cache.set("a", "xxxx")
+        cache.set("b", "yyyy")
+        cache.set("c", "zzzz")
+
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.total_bytes, 8)
+
+        # Values larger than the whole cache are not stored
+        cache.set("d", "x" * 11)
+        self.assertIsNone(cache.get("d"))
+        self.assertEqual(len(cache), 2)
+
+    def test_entries_expire(self):
+        """Test that entries expire after their time to live."""
+        cache = LRUCache(ttl=10, clock=self.clock)
+        cache.set("a", 1)
+
+        self.clock.now = 9.9
+        self.assertEqual(cache.get("a"), 1)
+
+        self.clock.now = 10
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats.expirations, 1)
+        self.assertEqual(len(cache), 0)
+
+    def test_invalidate(self):
+        """Test removing one entry or all entries."""
+        cache = LRUCache()
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        cache.invalidate("a")
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("b"), 2)
+
+        cache.invalidate()
+        self.assertEqual(cache.info()["entries"], 0)
+
+    def test_disabled_cache(self):
+        """Test that a cache without entries stores nothing."""
+        cache = LRUCache(max_entries=0)
+        cache.set("a", 1)
+
+        self.assertIsNone(cache.get("a"))
+
+
+if __name__ == "__main__":
+    unittest.main()
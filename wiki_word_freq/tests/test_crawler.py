@@ -0,0 +1,259 @@
+"""
+Tests for the asynchronous Wikipedia crawler.
+"""
+
+import asyncio
+import threading
+import time
+import unittest
+from collections import Counter
+
+import httpx
+
+from wiki_word_freq.crawler import AsyncWikipediaCrawler
+from wiki_word_freq.processing import StreamingProcessor
+from wiki_word_freq.session import CrawlBudget, CrawlSession
+from wiki_word_freq.wikipedia import WikipediaClient
+from wiki_word_freq.workers import create_executor
+
+
+def make_article(text, links=()):
+    """Build the HTML of a fake article with the given text and links."""
+    anchors = " ".join(f'<a href="/wiki/{link}">{link}</a>' for link in links)
+    return f'<div class="mw-parser-output"><p>{text} {anchors}</p></div>'
+
+
+class SlowProcessor(StreamingProcessor):
+    """Processor recording how many articles it parses at once."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+
+    def process(self, html_content, with_links=True):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.02)
+        with self.lock:
+            self.active -= 1
+        return super().process(html_content, with_links)
+
+
+class TestAsyncWikipediaCrawler(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the AsyncWikipediaCrawler class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.articles = {
+            "Python": make_article("python snake", ["Snake", "Monty"]),
+            "Snake": make_article("snake reptile", ["Python", "Reptile"]),
+            "Monty": make_article("monty comedy", ["Reptile"]),
+            "Reptile": make_article("reptile animal"),
+        }
+        self.requested = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.delays = {}
+        self.failing = set()
+
+    async def handler(self, request):
+        """Serve the fake articles like the MediaWiki parse API."""
+        title = request.url.params["page"]
+        self.requested.append(title)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delays.get(title, 0.01))
+        self.in_flight -= 1
+
+        if title in self.failing:
+            return httpx.Response(503)
+        if title not in self.articles:
+            return httpx.Response(
+                200, json={"error": {"info": "The page you specified doesn't exist."}}
+            )
+        return httpx.Response(
+            200, json={"parse": {"text": {"*": self.articles[title]}}}
+        )
+
+    def make_crawler(self, max_concurrency=10, **kwargs):
+        """Create a crawler backed by the fake API."""
+        http_client = httpx.AsyncClient(transport=httpx.MockTransport(self.handler))
+        return AsyncWikipediaCrawler(
+            max_concurrency=max_concurrency, http_client=http_client, **kwargs
+        )
+
+    async def test_traverse_articles_depth_zero(self):
+        """Test that depth 0 only fetches the start article."""
+        crawler = self.make_crawler()
+        result = await crawler.traverse_articles("Python", 0)
+        await crawler.aclose()
+
+        self.assertEqual(
+            result, {"Python": Counter({"python": 1, "snake": 2, "monty": 1})}
+        )
+        self.assertEqual(self.requested, ["Python"])
+
+    async def test_traverse_articles_depth_two(self):
+        """Test traversing several levels without fetching an article twice."""
+        crawler = self.make_crawler()
+        result = await crawler.traverse_articles("Python", 2)
+        await crawler.aclose()
+
+        self.assertEqual(set(result), {"Python", "Snake", "Monty", "Reptile"})
+        self.assertEqual(sorted(self.requested), sorted(set(self.requested)))
+
+    async def test_traverse_articles_respects_concurrency_limit(self):
+        """Test that a level is fetched in parallel up to the concurrency limit."""
+        for index in range(8):
+            self.articles[f"Leaf{index}"] = make_article("leaf")
+        self.articles["Python"] = make_article(
+            "python", [f"Leaf{index}" for index in range(8)]
+        )
+
+        crawler = self.make_crawler(max_concurrency=3)
+        result = await crawler.traverse_articles("Python", 1)
+        await crawler.aclose()
+
+        self.assertEqual(len(result), 9)
+        self.assertEqual(self.max_in_flight, 3)
+
+    async def test_concurrent_traversals_do_not_interfere(self):
+        """Test that overlapping traversals on one crawler keep their own state."""
+        crawler = self.make_crawler()
+        first, second = await asyncio.gather(
+            crawler.traverse_articles("Python", 1),
+            crawler.traverse_articles("Snake", 1),
+        )
+        await crawler.aclose()
+
+        self.assertEqual(set(first), {"Python", "Snake", "Monty"})
+        self.assertEqual(set(second), {"Snake", "Python", "Reptile"})
+
+    async def test_crawl_records_stats(self):
+        """Test that a crawl session collects stats about its work."""
+        crawler = self.make_crawler()
+        self.articles["Python"] = make_article("python", ["Snake", "Missing"])
+        session = await crawler.crawl(CrawlSession("Python", 1))
+        await crawler.aclose()
+
+        self.assertEqual(set(session.results), {"Python", "Snake"})
+        self.assertEqual(session.stats.articles_fetched, 2)
+        self.assertEqual(session.stats.articles_missing, 1)
+        self.assertEqual(session.stats.links_discovered, 2)
+
+    async def test_repeated_crawls_use_article_cache(self):
+        """Test that articles shared by crawls are only fetched once."""
+        crawler = self.make_crawler()
+        await crawler.traverse_articles("Snake", 0)
+        result = await crawler.traverse_articles("Python", 1)
+        await crawler.aclose()
+
+        self.assertEqual(set(result), {"Python", "Snake", "Monty"})
+        self.assertEqual(sorted(self.requested), ["Monty", "Python", "Snake"])
+
+    async def test_crawl_stops_at_article_budget(self):
+        """Test that the crawl returns partial results when the article budget runs out."""
+        crawler = self.make_crawler()
+        session = CrawlSession("Python", 2, budget=CrawlBudget(max_articles=2))
+        await crawler.crawl(session)
+        await crawler.aclose()
+
+        self.assertEqual(list(session.results), ["Python", "Snake"])
+        self.assertEqual(session.truncation_reason, "max_articles")
+        self.assertNotIn("Reptile", self.requested)
+
+    async def test_crawl_stops_at_byte_budget(self):
+        """Test that no article is downloaded once the byte budget is used up."""
+        crawler = self.make_crawler(max_concurrency=1)
+        session = CrawlSession("Python", 1, budget=CrawlBudget(max_bytes=1))
+        await crawler.crawl(session)
+        await crawler.aclose()
+
+        self.assertEqual(list(session.results), ["Python"])
+        self.assertEqual(session.truncation_reason, "max_bytes")
+        self.assertEqual(self.requested, ["Python"])
+
+    async def test_crawl_stops_at_deadline(self):
+        """Test that slow fetches are cancelled when the time limit passes."""
+        self.delays["Monty"] = 5
+        crawler = self.make_crawler()
+        session = CrawlSession("Python", 1, budget=CrawlBudget(time_limit=0.5))
+        await crawler.crawl(session)
+        await crawler.aclose()
+
+        self.assertEqual(list(session.results), ["Python", "Snake"])
+        self.assertEqual(session.truncation_reason, "time_limit")
+        self.assertEqual(session.stats.articles_missing, 0)
+
+    async def test_cancelled_crawl_cancels_pending_fetches(self):
+        """Test that cancelling a crawl stops its fetches and counts them."""
+        self.delays = {"Snake": 10, "Monty": 10}
+        crawler = self.make_crawler()
+        session = CrawlSession("Python", 1)
+
+        task = asyncio.ensure_future(crawler.crawl(session))
+        while self.in_flight < 2 or "Monty" not in self.requested:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        await crawler.aclose()
+
+        self.assertEqual(session.stats.fetches_cancelled, 2)
+        self.assertEqual(crawler.info(), {"crawls_cancelled": 1, "fetches_cancelled": 2})
+
+    async def test_process_pool_parsing(self):
+        """Test that articles parsed in a process pool give the same result."""
+        executor = create_executor("process", 2)
+        crawler = self.make_crawler(executor=executor)
+        result = await crawler.traverse_articles("Python", 2)
+        await crawler.aclose()
+        executor.shutdown()
+
+        self.assertEqual(result["Python"], Counter({"python": 1, "snake": 2, "monty": 1}))
+        self.assertEqual(set(result), {"Python", "Snake", "Monty", "Reptile"})
+
+    async def test_parse_queue_applies_backpressure(self):
+        """Test that fetches wait while the parse pool is busy."""
+        processor = SlowProcessor()
+        executor = create_executor("thread", 4)
+        crawler = self.make_crawler(
+            client=WikipediaClient(processor), executor=executor, parse_queue_size=1
+        )
+        result = await crawler.traverse_articles("Python", 1)
+        await crawler.aclose()
+        executor.shutdown()
+
+        self.assertEqual(set(result), {"Python", "Snake", "Monty"})
+        self.assertEqual(processor.max_active, 1)
+        self.assertGreater(crawler.parse_queue.stalls, 0)
+        self.assertEqual(crawler.parse_queue.pending, 0)
+
+    async def test_failing_article_is_skipped(self):
+        """Test that an article upstream keeps failing on doesn't fail the crawl."""
+        self.failing = {"Snake"}
+        crawler = self.make_crawler()
+        session = await crawler.crawl(CrawlSession("Python", 1))
+        await crawler.aclose()
+
+        self.assertEqual(set(session.results), {"Python", "Monty"})
+        self.assertEqual(session.stats.fetches_failed, 1)
+
+    async def test_traverse_articles_missing_article(self):
+        """Test that missing articles are skipped."""
+        crawler = self.make_crawler()
+        result = await crawler.traverse_articles("NonExistentArticle", 1)
+        await crawler.aclose()
+
+        self.assertEqual(result, {})
+
+    def test_invalid_concurrency(self):
+        """Test that the concurrency limit must be positive."""
+        with self.assertRaises(ValueError):
+            AsyncWikipediaCrawler(max_concurrency=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+"""
+Tests for cancelling work whose client has disconnected.
+"""
+
+import asyncio
+import unittest
+
+from wiki_word_freq.disconnect import ClientDisconnectedError, DisconnectWatcher
+
+
+class FakeRequest:
+    """Request whose client disconnects after a number of checks."""
+
+    def __init__(self, connected_checks):
+        self.connected_checks = connected_checks
+        self.checks = 0
+
+    async def is_disconnected(self):
+        self.checks += 1
+        return self.checks > self.connected_checks
+
+
+class TestDisconnectWatcher(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the DisconnectWatcher class."""
+
+    async def test_work_completes(self):
+        """Test that the result is returned while the client stays connected."""
+        watcher = DisconnectWatcher(poll_interval=0.01)
+
+        async def work():
+            await asyncio.sleep(0.03)
+            return 42
+
+        self.assertEqual(await watcher.run(FakeRequest(100), work()), 42)
+        self.assertEqual(watcher.disconnects, 0)
+
+    async def test_disconnect_cancels_work(self):
+        """Test that the work is cancelled soon after the client disconnects."""
+        watcher = DisconnectWatcher(poll_interval=0.01)
+        cancelled = asyncio.Event()
+
+        async def work():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        request = FakeRequest(2)
+        with self.assertRaises(ClientDisconnectedError):
+            await watcher.run(request, work())
+
+        self.assertTrue(cancelled.is_set())
+        self.assertEqual(request.checks, 3)
+        self.assertEqual(watcher.info(), {"disconnects": 1})
+
+    def test_invalid_poll_interval(self):
+        """Test that the poll interval must be positive."""
+        with self.assertRaises(ValueError):
+            DisconnectWatcher(poll_interval=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+"""
+Tests for named ignore lists.
+"""
+
+import os
+import tempfile
+import unittest
+
+from wiki_word_freq.ignore_lists import (
+    IgnoreListRegistry,
+    IgnoreSet,
+    compile_ignore_list,
+)
+
+
+class TestIgnoreLists(unittest.TestCase):
+    """Test cases for compiled and registered ignore lists."""
+
+    def test_compile_ignore_list(self):
+        """Test that words are lowercased once and compiled lists are reused."""
+        compiled = compile_ignore_list(["The", "and", "THE"])
+
+        self.assertIsInstance(compiled, IgnoreSet)
+        self.assertEqual(compiled, {"the", "and"})
+        self.assertIs(compile_ignore_list(compiled), compiled)
+        self.assertEqual(compile_ignore_list(None), set())
+
+    def test_resolve(self):
+        """Test combining a registered list with the words of a request."""
+        registry = IgnoreListRegistry({"short": ["a", "an"]})
+        named = registry.get("short")
+
+        self.assertIs(registry.resolve("short"), named)
+        self.assertEqual(registry.resolve("short", ["The"]), {"a", "an", "the"})
+        self.assertEqual(registry.resolve(None, ["The"]), {"the"})
+        self.assertIsNone(registry.resolve(None, []))
+        with self.assertRaises(ValueError):
+            registry.resolve("missing")
+
+    def test_builtin_and_directory_lists(self):
+        """Test that the built-in lists and the files of a directory are registered."""
+        registry = IgnoreListRegistry()
+        with tempfile.TemporaryDirectory() as path:
+            with open(os.path.join(path, "wiki-terms.txt"), "w", encoding="utf-8") as f:
+                f.write("# Words of page boilerplate\nRetrieved\n\nedit\n")
+            with open(os.path.join(path, "notes.md"), "w", encoding="utf-8") as f:
+                f.write("not a list\n")
+            registry.load_directory(path)
+
+        self.assertIn("the", registry.get("english-stopwords"))
+        self.assertEqual(registry.get("wiki-terms"), {"retrieved", "edit"})
+        self.assertEqual(sorted(registry.info()), ["english-stopwords", "wiki-terms"])
+
+
+if __name__ == "__main__":
+    unittest.main()
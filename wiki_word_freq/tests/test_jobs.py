@@ -0,0 +1,214 @@
+"""
+Tests for background crawl jobs.
+"""
+
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from wiki_word_freq.jobs import (
+    JOB_CANCELLED,
+    JOB_COMPLETED,
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    Job,
+    JobManager,
+    JobQueueFullError,
+    JobStore,
+)
+from wiki_word_freq.session import CrawlSession, LevelBatch
+
+
+class TestJobStore(unittest.TestCase):
+    """Test cases for the JobStore class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "jobs.sqlite3")
+        self.store = JobStore(self.path)
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.store.close()
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        """Test that a job is read back as it was written."""
+        job = Job("abc", {"article": "Python", "depth": 1}, status=JOB_COMPLETED)
+        job.progress["articles_fetched"] = 3
+        job.result = {"word_count": {"python": 2}, "truncated": False}
+        self.store.save(job.to_row())
+
+        self.assertEqual(self.store.get("abc"), job)
+        self.assertIsNone(self.store.get("abc", with_result=False).result)
+        self.assertIsNone(self.store.get("missing"))
+
+    def test_mark_interrupted(self):
+        """Test that unfinished jobs of a previous process are marked as failed."""
+        self.store.save(Job("queued", {}).to_row())
+        self.store.save(Job("running", {}, status=JOB_RUNNING).to_row())
+        self.store.save(Job("done", {}, status=JOB_COMPLETED).to_row())
+
+        reopened = JobStore(self.path)
+        self.assertEqual(reopened.mark_interrupted(), 2)
+        self.assertEqual(reopened.get("running").status, JOB_FAILED)
+        self.assertEqual(reopened.get("done").status, JOB_COMPLETED)
+        reopened.close()
+
+
+class TestJobManager(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the JobManager class."""
+
+    async def test_job_reports_progress_and_result(self):
+        """Test that a job runs, records its progress and keeps its result."""
+        session = CrawlSession("Python", 0)
+
+        async def runner(job, listener):
+            listener.article_done("Python", None)
+            listener.level_done(session, LevelBatch(0, ["Python"], False))
+            return {"word_count": {"python": 1}}
+
+        manager = JobManager(runner)
+        job = await manager.submit({"article": "Python", "depth": 0})
+        self.assertEqual(job.status, JOB_QUEUED)
+        await manager.join()
+
+        self.assertEqual(job.status, JOB_COMPLETED)
+        self.assertEqual(job.result, {"word_count": {"python": 1}})
+        self.assertEqual(job.progress["articles_missing"], 1)
+        self.assertEqual(job.progress["depth"], 0)
+        self.assertIs(await manager.get(job.id), job)
+
+    async def test_jobs_are_bounded(self):
+        """Test that at most max_running jobs run and max_queued wait."""
+        release = asyncio.Event()
+        running = []
+
+        async def runner(job, listener):
+            running.append(job.id)
+            await release.wait()
+            return {}
+
+        manager = JobManager(runner, max_running=1, max_queued=1)
+        first = await manager.submit({})
+        await asyncio.sleep(0)
+        second = await manager.submit({})
+        await asyncio.sleep(0)
+
+        self.assertEqual(running, [first.id])
+        self.assertEqual(second.status, JOB_QUEUED)
+        with self.assertRaises(JobQueueFullError):
+            await manager.submit({})
+
+        release.set()
+        await manager.join()
+        self.assertEqual(running, [first.id, second.id])
+
+    async def test_cancel_and_failure(self):
+        """Test that cancelled and failing jobs end in the matching state."""
+
+        async def runner(job, listener):
+            if job.request.get("fail"):
+                raise ValueError("Invalid title")
+            await asyncio.sleep(10)
+
+        manager = JobManager(runner)
+        slow = await manager.submit({})
+        failing = await manager.submit({"fail": True})
+        await asyncio.sleep(0)
+
+        self.assertEqual((await manager.cancel(slow.id)).status, JOB_CANCELLED)
+        await manager.join()
+        self.assertEqual(failing.status, JOB_FAILED)
+        self.assertEqual(failing.error, "Invalid title")
+        self.assertIsNone(await manager.cancel("missing"))
+
+    async def test_cancelling_finished_job(self):
+        """Test that a job finishing before it is cancelled is left as it is."""
+
+        async def runner(job, listener):
+            return {}
+
+        manager = JobManager(runner)
+        job = await manager.submit({})
+        await manager.join()
+
+        # Like aclose, which cancels the jobs it saw before they finished
+        await manager._cancel(job)
+        self.assertEqual(job.status, JOB_COMPLETED)
+        await manager.aclose()
+
+    async def test_finished_jobs_are_read_from_the_store(self):
+        """Test that jobs dropped from memory are still found on disk."""
+        with tempfile.TemporaryDirectory() as directory:
+            store = JobStore(os.path.join(directory, "jobs.sqlite3"))
+
+            async def runner(job, listener):
+                return {"word_count": {job.request["article"]: 1}}
+
+            manager = JobManager(runner, max_finished=1, store=store)
+            first = await manager.submit({"article": "python"})
+            await manager.submit({"article": "snake"})
+            await manager.join()
+
+            stored = await manager.get(first.id)
+            self.assertIsNot(stored, first)
+            self.assertEqual(stored.status, JOB_COMPLETED)
+            self.assertEqual(stored.result, {"word_count": {"python": 1}})
+            await manager.aclose()
+            store.close()
+
+    async def test_results_are_not_kept_with_a_store(self):
+        """Test that finished jobs only keep their state in memory when a store exists."""
+        with tempfile.TemporaryDirectory() as directory:
+            store = JobStore(os.path.join(directory, "jobs.sqlite3"))
+            threads = []
+            to_row = Job.to_row
+
+            def record_thread(job):
+                threads.append(threading.current_thread())
+                return to_row(job)
+
+            async def runner(job, listener):
+                return {"word_count": {"python": 1}}
+
+            manager = JobManager(runner, store=store)
+            with patch.object(Job, "to_row", record_thread):
+                job = await manager.submit({"article": "python"})
+                await manager.join()
+
+            # Jobs are serialized by the writer thread
+            self.assertTrue(threads)
+            self.assertNotIn(threading.main_thread(), threads)
+
+            state = await manager.get(job.id, with_result=False)
+            self.assertEqual(state.status, JOB_COMPLETED)
+            self.assertIsNone(state.result)
+            completed = await manager.get(job.id)
+            self.assertEqual(completed.result, {"word_count": {"python": 1}})
+            await manager.aclose()
+            store.close()
+
+    async def test_finished_jobs_are_bounded_by_size(self):
+        """Test that without a store, old results are forgotten beyond the byte limit."""
+
+        async def runner(job, listener):
+            return {"word_count": {f"word{index}": 1 for index in range(job.request["words"])}}
+
+        manager = JobManager(runner, max_finished_bytes=20000)
+        small = await manager.submit({"words": 10})
+        await manager.join()
+        large = await manager.submit({"words": 100})
+        await manager.join()
+
+        self.assertIsNone(await manager.get(small.id))
+        self.assertIs(await manager.get(large.id), large)
+
+
+if __name__ == "__main__":
+    unittest.main()
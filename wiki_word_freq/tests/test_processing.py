@@ -0,0 +1,111 @@
+"""
+Tests for the single-pass article processors.
+"""
+
+import unittest
+from collections import Counter
+from wiki_word_freq.processing import (
+    ArticleProcessor,
+    StreamingProcessor,
+    available_backends,
+    create_processor,
+    parse_wiki_href,
+)
+from wiki_word_freq.wikipedia import WikipediaClient
+
+
+class TestArticleProcessors(unittest.TestCase):
+    """Test cases for the article processor backends."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.client = WikipediaClient()
+
+        # Sample HTML content for testing
+        self.sample_html = """
+        <div class="mw-parser-output">
+            <p>This is a sample Wikipedia article about <a href="/wiki/Python">Python</a>.</p>
+            <p>It contains links to <a href="/wiki/Programming">programming</a> and 
+            <a href="/wiki/Computer_science">computer science</a>.</p>
+            <p>Some links are not articles: <a href="/wiki/File:Python_logo.png">Python logo</a> or 
+            <a href="/wiki/Category:Programming_languages">Category</a>.</p>
+            <p>External links like <a href="https://python.org">Python.org</a> should be ignored.</p>
+        </div>
+        """
+
+        # HTML exercising the elements removed from the prose
+        self.complex_html = """
+        <html><body>
+        <div id="header"><p>Navigation text</p><a href="/wiki/Outside">Outside</a></div>
+        <div class="mw-parser-output">
+            <h2><span class="mw-headline">History</span><span class="mw-editsection">[edit]</span></h2>
+            <p>Guido&nbsp;van Rossum began<sup class="reference"><a href="/wiki/Cite">[1]</a></sup>
+            working on <b>Python</b> in 1989[2].<br>It was<br/>released in 1991.</p>
+            <table><tr><td>Table text <a href="/wiki/In_table">in table</a></td></tr></table>
+            <div class="thumb"><div>Nested <img src="x.png" alt="img"> caption</div></div>
+            <script>var hidden = "script words";</script>
+            <style>.hidden { color: red; }</style>
+            <p>Percent <a href="/wiki/C%2B%2B">C++</a> and &amp; entities &eacute;t&eacute;.</p>
+            </span>
+            <p>After a stray end tag.</p>
+        </div>
+        <div class="mw-parser-output"><p>Second content div</p></div>
+        <p>Footer text</p>
+        </body></html>
+        """
+
+    def assert_matches_extractors(self, processor, html_content):
+        """Assert that a processor produces the same output as the extractors."""
+        processed = processor.process(html_content)
+
+        self.assertEqual(
+            processed.word_counts, Counter(self.client.extract_words(html_content))
+        )
+        self.assertEqual(processed.links, self.client.extract_wiki_links(html_content))
+
+    def test_backends_match_extractors(self):
+        """Test that every available backend matches the reference extractors."""
+        for backend in available_backends():
+            with self.subTest(backend=backend):
+                processor = create_processor(backend)
+                self.assert_matches_extractors(processor, self.sample_html)
+                self.assert_matches_extractors(processor, self.complex_html)
+
+    def test_process_without_links(self):
+        """Test that links are skipped when they are not needed."""
+        processed = StreamingProcessor().process(self.sample_html, with_links=False)
+
+        self.assertEqual(processed.links, [])
+        self.assertEqual(
+            processed.word_counts, Counter(self.client.extract_words(self.sample_html))
+        )
+
+    def test_process_without_content(self):
+        """Test processing HTML without a content div."""
+        for backend in available_backends():
+            with self.subTest(backend=backend):
+                processed = create_processor(backend).process("<p>No content</p>")
+                self.assertEqual(processed.word_counts, Counter())
+                self.assertEqual(processed.links, [])
+
+    def test_parse_wiki_href(self):
+        """Test filtering and decoding of article links."""
+        self.assertEqual(parse_wiki_href("/wiki/Computer_science"), "Computer_science")
+        self.assertEqual(parse_wiki_href("/wiki/C%2B%2B"), "C++")
+        self.assertIsNone(parse_wiki_href("/wiki/File:Python_logo.png"))
+        self.assertIsNone(parse_wiki_href("/wiki/Category:Programming"))
+        self.assertIsNone(parse_wiki_href("https://python.org"))
+
+    def test_unknown_backend(self):
+        """Test that unknown backends are rejected."""
+        with self.assertRaises(ValueError):
+            create_processor("regex")
+
+    def test_base_class_is_abstract(self):
+        """Test that the base processor can't be used without a backend."""
+        with self.assertRaises(TypeError):
+            ArticleProcessor()
+
+
+if __name__ == "__main__":
+    unittest.main()
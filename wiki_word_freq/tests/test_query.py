@@ -0,0 +1,217 @@
+"""
+Tests for batched fetching with multi-title queries.
+"""
+
+import unittest
+from collections import Counter
+
+import httpx
+
+from wiki_word_freq.crawler import AsyncWikipediaCrawler, LINK_SOURCE_API
+from wiki_word_freq.query import MAX_TITLES_PER_QUERY, BatchQueryFetcher, build_article
+from wiki_word_freq.session import CrawlBudget, CrawlSession
+from wiki_word_freq.tests.fake_api import FakeWikipediaAPI
+from wiki_word_freq.wikipedia import WikipediaClient
+
+ARTICLES = {
+    "Python": ("python snake", ["Snake", "Monty", "Guido"]),
+    "Snake": ("snake reptile", ["Python", "Reptile"]),
+    "Monty": ("monty comedy", ["Reptile", "Comedy"]),
+    "Reptile": ("reptile animal", []),
+    "Comedy": ("comedy humour", []),
+}
+
+
+class TestBatchQueryFetcher(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the BatchQueryFetcher class."""
+
+    def setUp(self):
+        """Start the fake API."""
+        self.api = FakeWikipediaAPI(ARTICLES, redirects={"Serpent": "Snake"}).start()
+        self.fetcher = BatchQueryFetcher(self.api.url)
+
+    def tearDown(self):
+        """Stop the fake API."""
+        self.api.stop()
+
+    def test_batch_size_is_bounded(self):
+        """Test that batches can't exceed the API's limit on titles per query."""
+        with self.assertRaises(ValueError):
+            BatchQueryFetcher(self.api.url, batch_size=MAX_TITLES_PER_QUERY + 1)
+
+        titles = [f"Article {index}" for index in range(120)]
+        self.assertEqual(
+            [len(chunk) for chunk in self.fetcher.chunk(titles)], [50, 50, 20]
+        )
+
+    def test_build_query_params(self):
+        """Test the parameters of multi-title link queries and extract queries."""
+        params = self.fetcher.build_query_params(["Python", "Snake"], True)
+
+        self.assertEqual(params["action"], "query")
+        self.assertEqual(params["titles"], "Python|Snake")
+        self.assertEqual(params["prop"], "links")
+        self.assertEqual(params["plnamespace"], 0)
+        self.assertNotIn("prop", self.fetcher.build_query_params(["Python"], False))
+
+        params = self.fetcher.build_extract_params("Python")
+        self.assertEqual(params["titles"], "Python")
+        self.assertEqual(params["prop"], "extracts")
+
+    async def test_fetch_links_follows_continue(self):
+        """Test that continuation collects every link of a batch."""
+        async with httpx.AsyncClient() as http_client:
+            pages = await self.fetcher.fetch_links(
+                http_client, ["Python", "snake", "Serpent", "Missing"], True
+            )
+            extract = await self.fetcher.fetch_extract(http_client, pages["Python"][0])
+            missing = await self.fetcher.fetch_extract(http_client, "Missing")
+
+        self.assertEqual(pages["Python"], ("Python", ["Snake", "Monty", "Guido"]))
+        self.assertEqual(pages["snake"], ("Snake", ["Python", "Reptile"]))
+        self.assertEqual(pages["Serpent"], pages["snake"])
+        self.assertIsNone(pages["Missing"])
+        self.assertGreater(self.api.count("query"), 1)
+        self.assertEqual(
+            build_article(pages["Python"], extract).word_counts,
+            Counter({"python": 1, "snake": 2, "monty": 1, "guido": 1}),
+        )
+        self.assertIsNone(missing)
+
+    async def test_resolve_redirects(self):
+        """Test that titles are resolved through normalization and redirects."""
+        async with httpx.AsyncClient() as http_client:
+            titles = await self.fetcher.resolve_redirects(
+                http_client, ["Python", "snake", "Serpent"]
+            )
+
+        self.assertEqual(titles, {"Python": "Python", "snake": "Snake", "Serpent": "Snake"})
+
+
+class TestQueryBackend(unittest.IsolatedAsyncioTestCase):
+    """Test cases for crawling with the "query" backend."""
+
+    def setUp(self):
+        """Start the fake API."""
+        self.api = FakeWikipediaAPI(ARTICLES, links_per_response=50).start()
+
+    def tearDown(self):
+        """Stop the fake API."""
+        self.api.stop()
+
+    def make_crawler(self, backend, **kwargs):
+        """Create a crawler backed by the fake API."""
+        client = WikipediaClient(api_url=self.api.url)
+        return AsyncWikipediaCrawler(client, backend=backend, **kwargs)
+
+    async def test_unknown_backend(self):
+        """Test that an unknown backend is rejected."""
+        with self.assertRaises(ValueError):
+            self.make_crawler("scrape")
+
+    async def test_query_backend_matches_parse_backend(self):
+        """Test that both backends crawl the same articles and words."""
+        parse_crawler = self.make_crawler("parse")
+        parse_result = await parse_crawler.traverse_articles("Python", 2)
+        await parse_crawler.aclose()
+        parse_requests = self.api.count("parse")
+
+        query_crawler = self.make_crawler("query")
+        query_result = await query_crawler.traverse_articles("Python", 2)
+        await query_crawler.aclose()
+
+        self.assertEqual(query_result, parse_result)
+        # One parse request per article, including the missing "Guido"
+        self.assertEqual(parse_requests, 6)
+        # One link query per level, one extract query per existing article,
+        # and one resolving the redirects of the start article and of each
+        # expanded level's links
+        self.assertEqual(self.api.count("query"), 11)
+        self.assertEqual(self.api.count("parse"), parse_requests)
+
+    async def test_query_backend_batches_titles(self):
+        """Test that a level is fetched in batches of the fetcher's size."""
+        crawler = self.make_crawler(
+            "query", query_fetcher=BatchQueryFetcher(self.api.url, batch_size=2)
+        )
+        await crawler.traverse_articles("Python", 1)
+        await crawler.aclose()
+
+        batches = [
+            params["titles"]
+            for params in self.api.requests
+            if params.get("prop") == "links"
+        ]
+        extracts = [
+            params["titles"]
+            for params in self.api.requests
+            if params.get("prop") == "extracts"
+        ]
+        self.assertEqual(batches[0], "Python")
+        self.assertEqual(sorted(set(batches[1:])), ["Guido", "Snake|Monty"])
+        # Extracts are fetched one article at a time, and not for missing ones
+        self.assertEqual(sorted(extracts), ["Monty", "Python", "Snake"])
+
+    async def test_query_backend_uses_cache_and_budget(self):
+        """Test that cached extracts are reused and downloads count against the budget."""
+        crawler = self.make_crawler("query")
+        session = await crawler.crawl(
+            CrawlSession("Python", 1, budget=CrawlBudget(max_bytes=1))
+        )
+        self.assertEqual(set(session.results), {"Python"})
+        self.assertEqual(session.truncation_reason, "max_bytes")
+        self.assertGreater(session.stats.bytes_downloaded, 0)
+
+        requests_made = len(self.api.requests)
+        await crawler.traverse_articles("Python", 0)
+        await crawler.aclose()
+        self.assertEqual(len(self.api.requests), requests_made)
+
+
+class TestApiLinkSource(unittest.IsolatedAsyncioTestCase):
+    """Test cases for following links from the API's link lists."""
+
+    def setUp(self):
+        """Start the fake API with a redirect alias of "Snake"."""
+        articles = {
+            **ARTICLES,
+            "Python": ("python snake", ["Snake", "Serpent", "Monty", "Guido"]),
+        }
+        self.api = FakeWikipediaAPI(articles, redirects={"Serpent": "Snake"}).start()
+
+    def tearDown(self):
+        """Stop the fake API."""
+        self.api.stop()
+
+    async def traverse(self, **kwargs):
+        """Traverse from "Python" and return the result and the parsed pages."""
+        crawler = AsyncWikipediaCrawler(
+            WikipediaClient(api_url=self.api.url), **kwargs
+        )
+        result = await crawler.traverse_articles("Python", 1)
+        await crawler.aclose()
+        pages = [
+            params["page"] for params in self.api.requests if params["action"] == "parse"
+        ]
+        self.api.requests.clear()
+        return result, pages
+
+    async def test_api_links_resolve_redirects(self):
+        """Test that redirect aliases and red links are not fetched."""
+        html_result, html_pages = await self.traverse()
+        api_result, api_pages = await self.traverse(link_source=LINK_SOURCE_API)
+
+        self.assertIn("Serpent", html_pages)
+        self.assertIn("Guido", html_pages)
+        self.assertEqual(sorted(api_pages), ["Monty", "Python", "Snake"])
+        self.assertEqual(set(api_result), {"Python", "Snake", "Monty"})
+        self.assertEqual(api_result["Python"], html_result["Python"])
+
+    async def test_unknown_link_source(self):
+        """Test that an unknown link source is rejected."""
+        with self.assertRaises(ValueError):
+            AsyncWikipediaCrawler(link_source="scrape")
+
+
+if __name__ == "__main__":
+    unittest.main()
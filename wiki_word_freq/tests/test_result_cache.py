@@ -0,0 +1,155 @@
+"""
+Tests for the result cache.
+"""
+
+import asyncio
+import unittest
+
+from wiki_word_freq.result_cache import (
+    CACHE_HIT,
+    CACHE_MISS,
+    CACHE_SHARED,
+    ResultCache,
+    result_size,
+)
+
+
+class TestResultCache(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the ResultCache class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.cache = ResultCache(max_entries=8, ttl=60)
+        self.calls = 0
+
+    async def compute(self):
+        """Compute a result slowly, counting the calls."""
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return {"word_count": {"python": self.calls}}
+
+    @staticmethod
+    def result(words):
+        """Build a result with a given number of words."""
+        return {"word_count": {f"w{index}": 1 for index in range(words)}}
+
+    async def compute_result(self, words):
+        """Compute a result with a given number of words."""
+        return self.result(words)
+
+    def test_make_key_normalizes_request(self):
+        """Test that equivalent requests share a key."""
+        self.assertEqual(
+            ResultCache.make_key("python_language", 1, ["The", "and"], 50),
+            ResultCache.make_key("Python language", 1, ["and", "the", "the"], 50),
+        )
+        self.assertEqual(
+            ResultCache.make_key("Python", 0),
+            ResultCache.make_key("Python", 0, [], 0),
+        )
+        self.assertNotEqual(
+            ResultCache.make_key("Python", 0), ResultCache.make_key("Python", 1)
+        )
+        self.assertNotEqual(
+            ResultCache.make_key("Python", 0),
+            ResultCache.make_key("Python", 0, counting="approximate"),
+        )
+
+    async def test_result_is_cached(self):
+        """Test that a computed result is served from the cache."""
+        key = ResultCache.make_key("Python", 0)
+
+        first = await self.cache.get_or_compute(key, self.compute)
+        second = await self.cache.get_or_compute(key, self.compute)
+
+        self.assertEqual(first[1], CACHE_MISS)
+        self.assertEqual(second, (first[0], CACHE_HIT))
+        self.assertEqual(self.calls, 1)
+
+    async def test_results_are_bounded_by_size(self):
+        """Test that large results evict older ones and oversized ones are not cached."""
+        cache = ResultCache(max_entries=8, ttl=60, max_bytes=result_size(self.result(3)) * 2)
+
+        for article in ("A", "B", "C"):
+            await cache.get_or_compute(article, lambda: self.compute_result(3))
+        await cache.get_or_compute("D", lambda: self.compute_result(100))
+
+        self.assertEqual(
+            [(await cache.get_or_compute(article, self.compute))[1] for article in "BCD"],
+            [CACHE_HIT, CACHE_HIT, CACHE_MISS],
+        )
+        self.assertEqual((await cache.get_or_compute("A", self.compute))[1], CACHE_MISS)
+
+    async def test_concurrent_requests_are_coalesced(self):
+        """Test that identical in-flight requests share one computation."""
+        key = ResultCache.make_key("Python", 1)
+
+        results = await asyncio.gather(
+            *(self.cache.get_or_compute(key, self.compute) for _ in range(5))
+        )
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(
+            sorted(status for _, status in results),
+            [CACHE_MISS] + [CACHE_SHARED] * 4,
+        )
+        self.assertEqual(self.cache.info()["coalesced"], 4)
+        self.assertEqual(self.cache.info()["in_flight"], 0)
+
+    async def test_failures_are_not_cached(self):
+        """Test that a failed computation is retried by the next request."""
+        key = ResultCache.make_key("Python", 0)
+
+        async def fail():
+            raise ValueError("Article not found")
+
+        with self.assertRaises(ValueError):
+            await self.cache.get_or_compute(key, fail)
+
+        _, status = await self.cache.get_or_compute(key, self.compute)
+        self.assertEqual(status, CACHE_MISS)
+
+    async def test_invalidate_during_computation(self):
+        """Test that a result computed before an invalidation is not cached."""
+        key = ResultCache.make_key("Python", 0)
+
+        task = asyncio.ensure_future(self.cache.get_or_compute(key, self.compute))
+        await asyncio.sleep(0)
+        self.cache.invalidate("Python")
+        await task
+
+        _, status = await self.cache.get_or_compute(key, self.compute)
+        self.assertEqual(status, CACHE_MISS)
+        self.assertEqual(self.calls, 2)
+
+    async def test_computation_cancelled_when_all_waiters_leave(self):
+        """Test that a shared computation only stops when nobody waits for it."""
+        key = ResultCache.make_key("Python", 0)
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def compute():
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        first = asyncio.ensure_future(self.cache.get_or_compute(key, compute))
+        second = asyncio.ensure_future(self.cache.get_or_compute(key, compute))
+        await started.wait()
+
+        first.cancel()
+        await asyncio.sleep(0.01)
+        self.assertFalse(cancelled.is_set())
+
+        second.cancel()
+        await asyncio.sleep(0.01)
+        self.assertTrue(cancelled.is_set())
+        self.assertEqual(self.cache.info()["abandoned"], 1)
+        self.assertEqual(self.cache.info()["in_flight"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+Tests for encoding results in the supported response formats.
+"""
+
+import gzip
+import json
+import unittest
+
+from wiki_word_freq import serialization
+from wiki_word_freq.serialization import (
+    FORMAT_COMPACT,
+    FORMAT_JSON,
+    FORMAT_MSGPACK,
+    available_formats,
+    build_payload,
+    choose_response_format,
+    compress,
+    encode_payload,
+)
+
+
+class TestSerialization(unittest.TestCase):
+    """Test cases for the serialization functions."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.result = {
+            "word_count": {"python": 3, "snake": 1},
+            "word_frequency": {"python": 75.0, "snake": 25.0},
+            "truncated": False,
+            "truncation_reason": None,
+        }
+
+    def test_choose_response_format(self):
+        """Test that the query parameter takes precedence over the Accept header."""
+        compact_type = "application/vnd.wiki-word-freq.compact+json"
+
+        self.assertEqual(choose_response_format(None, None), FORMAT_JSON)
+        self.assertEqual(choose_response_format(None, "application/json"), FORMAT_JSON)
+        self.assertEqual(choose_response_format(None, compact_type), FORMAT_COMPACT)
+        self.assertEqual(choose_response_format("json", compact_type), FORMAT_JSON)
+        with self.assertRaises(ValueError):
+            choose_response_format("xml", None)
+
+    def test_msgpack_requires_package(self):
+        """Test that msgpack is only offered when the package is installed."""
+        if serialization.msgpack is None:
+            self.assertNotIn(FORMAT_MSGPACK, available_formats())
+            with self.assertRaises(ValueError):
+                choose_response_format("msgpack", None)
+        else:
+            payload = build_payload(self.result, None, FORMAT_MSGPACK)
+            encoded = encode_payload(payload, FORMAT_MSGPACK)
+            self.assertEqual(serialization.msgpack.unpackb(encoded), payload)
+
+    def test_full_payload(self):
+        """Test the full format, optionally restricted to some words."""
+        payload = build_payload(self.result, ["snake"], FORMAT_JSON)
+
+        self.assertEqual(payload["word_count"], {"snake": 1})
+        self.assertEqual(payload["word_frequency"], {"snake": 25.0})
+        self.assertEqual(payload["vocabulary_size"], 2)
+
+    def test_compact_payload(self):
+        """Test that the compact format lists every word once with the total."""
+        payload = build_payload(self.result, None, FORMAT_COMPACT)
+
+        self.assertEqual(payload["words"], ["python", "snake"])
+        self.assertEqual(payload["counts"], [3, 1])
+        self.assertEqual(payload["total"], 4)
+        self.assertNotIn("word_frequency", payload)
+        self.assertEqual(json.loads(encode_payload(payload, FORMAT_COMPACT)), payload)
+
+    def test_compress(self):
+        """Test that only large bodies are compressed, and only if accepted."""
+        small = b"{}"
+        large = json.dumps({f"word{index}": index for index in range(500)}).encode()
+
+        self.assertEqual(compress(small, "gzip"), (small, None))
+        self.assertEqual(compress(large, None), (large, None))
+        body, encoding = compress(large, "gzip, deflate")
+        self.assertEqual(encoding, "gzip")
+        self.assertEqual(gzip.decompress(body), large)
+
+
+if __name__ == "__main__":
+    unittest.main()
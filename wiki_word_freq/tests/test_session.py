@@ -0,0 +1,170 @@
+"""
+Tests for the crawl session.
+"""
+
+import unittest
+from collections import Counter
+from wiki_word_freq.processing import ProcessedArticle
+from wiki_word_freq.session import CrawlBudget, CrawlSession
+
+
+class TestCrawlSession(unittest.TestCase):
+    """Test cases for the CrawlSession class."""
+
+    def test_new_session_starts_with_start_article(self):
+        """Test that a new session is seeded with its start article."""
+        session = CrawlSession("Python", 1)
+
+        self.assertEqual(session.frontier, ["Python"])
+        self.assertEqual(session.visited, {"Python"})
+        self.assertTrue(session.should_expand())
+        self.assertFalse(session.finished)
+
+    def test_discover_links_skips_visited_articles(self):
+        """Test that links are only queued once."""
+        session = CrawlSession("Python", 1)
+        next_frontier = []
+
+        session.discover_links(["Python", "Snake", "Snake", "Monty"], next_frontier)
+
+        self.assertEqual(next_frontier, ["Snake", "Monty"])
+        self.assertEqual(session.stats.links_discovered, 4)
+
+    def test_discover_links_canonicalizes_titles(self):
+        """Test that spellings of the same title are queued once."""
+        session = CrawlSession("python_(programming_language)", 1)
+        next_frontier = []
+
+        session.discover_links(
+            [
+                "Python_(programming_language)#History",
+                "Monty_Python",
+                "monty%20Python",
+                "#References",
+            ],
+            next_frontier,
+        )
+
+        self.assertEqual(next_frontier, ["Monty Python"])
+
+    def test_advance_until_finished(self):
+        """Test that a session finishes after its last depth level."""
+        session = CrawlSession("Python", 1)
+
+        session.advance(["Snake"])
+        self.assertFalse(session.should_expand())
+        self.assertFalse(session.finished)
+
+        session.advance([])
+        self.assertTrue(session.finished)
+
+    def test_keep_frontier_keeps_last_level(self):
+        """Test that a session keeping its frontier only follows the last level's links later."""
+        session = CrawlSession("Python", 0, keep_frontier=True)
+        batch = next(session.levels())
+
+        self.assertFalse(batch.with_links)
+        session.complete_level(
+            batch,
+            {"Python": ProcessedArticle(Counter({"python": 1}), ["Snake", "Monty"])},
+        )
+        self.assertTrue(session.finished)
+        self.assertEqual(session.unexpanded, ["Python"])
+        self.assertEqual(session.stats.links_discovered, 0)
+
+        session.depth = 1
+        session.expand_last_level(
+            {"Python": ProcessedArticle(Counter(), ["Snake", "Python", "Monty"])}
+        )
+        self.assertEqual(session.frontier, ["Snake", "Monty"])
+        self.assertEqual(session.unexpanded, [])
+        self.assertFalse(session.finished)
+
+    def test_levels_are_yielded_as_batches(self):
+        """Test that levels are deduplicated and yielded in depth order."""
+        graph = {
+            "Python": ["Snake", "Monty", "Snake"],
+            "Snake": ["Python", "Reptile"],
+            "Monty": ["Reptile", "Comedy"],
+        }
+        session = CrawlSession("Python", 2)
+        batches = []
+
+        for batch in session.levels():
+            batches.append((batch.depth, batch.titles, batch.with_links))
+            session.complete_level(
+                batch,
+                {
+                    title: ProcessedArticle(Counter([title]), graph.get(title, []))
+                    if title != "Comedy"
+                    else None
+                    for title in batch.titles
+                },
+            )
+
+        self.assertEqual(
+            batches,
+            [
+                (0, ["Python"], True),
+                (1, ["Snake", "Monty"], True),
+                (2, ["Reptile", "Comedy"], False),
+            ],
+        )
+        self.assertEqual(list(session.results), ["Python", "Snake", "Monty", "Reptile"])
+        self.assertEqual(session.stats.articles_missing, 1)
+
+    def test_levels_must_be_completed(self):
+        """Test that a level cannot be skipped."""
+        session = CrawlSession("Python", 1)
+        levels = session.levels()
+        next(levels)
+
+        with self.assertRaises(RuntimeError):
+            next(levels)
+
+    def test_admit_trims_to_article_budget(self):
+        """Test that only the articles fitting in the budget are admitted."""
+        session = CrawlSession("Python", 1, budget=CrawlBudget(max_articles=3))
+
+        self.assertEqual(session.admit(["Python"]), ["Python"])
+        self.assertFalse(session.truncated)
+        self.assertEqual(session.admit(["Snake", "Monty", "Reptile"]), ["Snake", "Monty"])
+        self.assertEqual(session.truncation_reason, "max_articles")
+
+    def test_can_download_checks_bytes_and_deadline(self):
+        """Test that downloads stop when the byte budget or deadline is reached."""
+        session = CrawlSession("Python", 1, budget=CrawlBudget(max_bytes=100))
+        self.assertTrue(session.can_download())
+        session.record_download(100)
+        self.assertFalse(session.can_download())
+        self.assertEqual(session.truncation_reason, "max_bytes")
+
+        session = CrawlSession("Python", 1, budget=CrawlBudget(time_limit=10))
+        self.assertTrue(session.can_download())
+        session.started_at -= 10
+        self.assertFalse(session.can_download())
+        self.assertEqual(session.truncation_reason, "time_limit")
+
+    def test_budget_capped_by_server_limits(self):
+        """Test that the stricter of request and server limits is used."""
+        budget = CrawlBudget(max_articles=50, time_limit=600).capped(
+            CrawlBudget(max_articles=100, max_bytes=1000, time_limit=300)
+        )
+
+        self.assertEqual(budget, CrawlBudget(max_articles=50, max_bytes=1000, time_limit=300))
+
+    def test_sessions_are_independent(self):
+        """Test that two sessions don't share state."""
+        first = CrawlSession("Python", 1)
+        second = CrawlSession("Python", 1)
+
+        first.mark_visited("Snake")
+        first.record_article("Python", ["python"])
+
+        self.assertNotIn("Snake", second.visited)
+        self.assertEqual(second.results, {})
+        self.assertEqual(second.stats.articles_fetched, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
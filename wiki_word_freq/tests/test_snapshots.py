@@ -0,0 +1,300 @@
+"""
+Tests for the snapshots of finished crawls.
+"""
+
+import asyncio
+import unittest
+from collections import Counter
+
+import httpx
+
+from wiki_word_freq.crawler import AsyncWikipediaCrawler
+from wiki_word_freq.query import BatchQueryFetcher
+from wiki_word_freq.session import CrawlBudget, CrawlSession, TRUNCATED_MAX_ARTICLES
+from wiki_word_freq.snapshots import CrawlSnapshot, SnapshotStore
+from wiki_word_freq.tests.fake_api import FakeWikipediaAPI, make_article
+from wiki_word_freq.titles import TitleResolver
+from wiki_word_freq.wikipedia import WikipediaClient
+
+
+def merge(words_by_article):
+    """Merge the counts of several articles, as the server does before storing."""
+    word_counts = Counter()
+    for counts in words_by_article.values():
+        word_counts.update(counts)
+    return word_counts
+
+
+def finished_session(article="Python", depth=1):
+    """Build a session as left by a complete crawl with ``keep_frontier``."""
+    session = CrawlSession(article, depth, keep_frontier=True)
+    session.record_article(article, Counter({"python": 2}))
+    session.record_article("Snake", Counter({"python": 1, "snake": 1}))
+    session.visited.add("Snake")
+    session.unexpanded = ["Snake"]
+    session.frontier = []
+    session.current_depth = depth + 1
+    return session
+
+
+class TestCrawlSnapshot(unittest.TestCase):
+    """Test cases for the CrawlSnapshot class."""
+
+    def test_snapshot_keeps_merged_counts_only(self):
+        """Test that a snapshot holds no counters of single articles."""
+        session = finished_session()
+        word_counts = merge(session.results)
+        snapshot = CrawlSnapshot.from_session(session, word_counts)
+
+        self.assertIs(snapshot.word_counts, word_counts)
+        self.assertEqual(snapshot.word_counts, Counter({"python": 3, "snake": 1}))
+        self.assertFalse(hasattr(snapshot, "results"))
+
+    def test_size_covers_visited_and_frontier(self):
+        """Test that the size estimate grows with the visited set and frontier."""
+        session = finished_session()
+        small = CrawlSnapshot.from_session(session, Counter()).approximate_size()
+
+        titles = [f"Article {index}" for index in range(100)]
+        session.visited.update(titles)
+        session.unexpanded.extend(titles)
+        large = CrawlSnapshot.from_session(session, Counter()).approximate_size()
+
+        self.assertGreater(large - small, 100 * 60)
+
+    def test_resume_continues_after_snapshot_depth(self):
+        """Test that a resumed session starts at the frontier of the snapshot."""
+        snapshot = CrawlSnapshot.from_session(finished_session(), Counter())
+        session = snapshot.resume(3, CrawlBudget(max_articles=10))
+
+        self.assertEqual(session.unexpanded, ["Snake"])
+        self.assertEqual(session.frontier, [])
+        self.assertEqual(session.current_depth, 2)
+        self.assertEqual(session.articles_admitted, 0)
+        self.assertEqual(session.stats.articles_fetched, 2)
+        self.assertEqual(session.results, {})
+        self.assertTrue(session.keep_frontier)
+
+        # The session owns copies of the snapshot state
+        session.visited.add("Monty")
+        self.assertNotIn("Monty", snapshot.visited)
+
+    def test_resume_at_same_depth_is_finished(self):
+        """Test that resuming at the snapshot's depth fetches nothing."""
+        snapshot = CrawlSnapshot.from_session(finished_session(), Counter())
+
+        self.assertTrue(snapshot.resume(1, CrawlBudget()).finished)
+        with self.assertRaises(ValueError):
+            snapshot.resume(0, CrawlBudget())
+
+
+class TestSnapshotStore(unittest.TestCase):
+    """Test cases for the SnapshotStore class."""
+
+    def test_get_returns_snapshots_up_to_depth(self):
+        """Test that only snapshots at most as deep as the request are used."""
+        store = SnapshotStore()
+        store.put(finished_session(depth=1), Counter())
+
+        self.assertIsNone(store.get("Python", 0))
+        self.assertEqual(store.get("python", 2).depth, 1)
+        self.assertIsNone(store.get("Snake", 2))
+        self.assertEqual(store.info()["resumed"], 1)
+
+    def test_get_skips_snapshots_beyond_budget(self):
+        """Test that a crawl isn't continued past what its budget would fetch."""
+        store = SnapshotStore()
+        session = finished_session()
+        session.articles_admitted = 2
+        session.stats.bytes_downloaded = 100
+        store.put(session, Counter())
+
+        self.assertIsNotNone(store.get("Python", 2, CrawlBudget(max_articles=2)))
+        self.assertIsNone(store.get("Python", 2, CrawlBudget(max_articles=1)))
+        self.assertIsNone(store.get("Python", 2, CrawlBudget(max_bytes=99)))
+
+    def test_put_keeps_the_deepest_complete_snapshot(self):
+        """Test that truncated and shallower crawls don't replace a snapshot."""
+        store = SnapshotStore()
+        store.put(finished_session(depth=2), Counter())
+        store.put(finished_session(depth=1), Counter())
+
+        truncated = finished_session(depth=3)
+        truncated.truncate(TRUNCATED_MAX_ARTICLES)
+        store.put(truncated, Counter())
+
+        self.assertEqual(store.get("Python", 5).depth, 2)
+
+    def test_put_skips_sessions_without_frontier(self):
+        """Test that sessions whose last level wasn't expanded are not stored."""
+        store = SnapshotStore()
+        store.put(CrawlSession("Python", 1), Counter())
+
+        self.assertIsNone(store.get("Python", 1))
+
+    def test_store_is_bounded_by_size(self):
+        """Test that snapshots larger than the store are not kept."""
+        session = finished_session()
+        session.visited.update(f"Article {index}" for index in range(100))
+        store = SnapshotStore(max_bytes=1000)
+        store.put(session, Counter())
+
+        self.assertTrue(store.accepts(session))
+        self.assertIsNone(store.get("Python", 1))
+
+    def test_disabled_store(self):
+        """Test that a store without entries keeps nothing."""
+        store = SnapshotStore(max_entries=0)
+        store.put(finished_session(), Counter())
+
+        self.assertFalse(store.enabled)
+        self.assertIsNone(store.get("Python", 1))
+
+    def test_invalidate(self):
+        """Test removing the snapshot of one article or all of them."""
+        store = SnapshotStore()
+        store.put(finished_session("Python"), Counter())
+        store.put(finished_session("Snake"), Counter())
+
+        self.assertEqual(store.invalidate("python"), 1)
+        self.assertIsNone(store.get("Python", 1))
+        self.assertEqual(store.invalidate(), 1)
+        self.assertIsNone(store.get("Snake", 1))
+
+
+class TestResumedCrawl(unittest.IsolatedAsyncioTestCase):
+    """Test cases for crawls continued from a snapshot."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.articles = {
+            "Python": make_article("python snake", ["Snake", "Monty"]),
+            "Snake": make_article("snake reptile", ["Python", "Reptile"]),
+            "Monty": make_article("monty comedy", ["Reptile"]),
+            "Reptile": make_article("reptile animal", ["Lizard"]),
+            "Lizard": make_article("lizard"),
+        }
+        self.requested = []
+
+    async def handler(self, request):
+        """Serve the fake articles like the MediaWiki parse API."""
+        title = request.url.params["page"]
+        self.requested.append(title)
+        return httpx.Response(
+            200, json={"parse": {"text": {"*": self.articles[title]}}}
+        )
+
+    async def test_deeper_crawl_only_fetches_new_levels(self):
+        """Test that a resumed crawl counts the same words as a fresh one."""
+        http_client = httpx.AsyncClient(transport=httpx.MockTransport(self.handler))
+        crawler = AsyncWikipediaCrawler(http_client=http_client)
+
+        shallow = await crawler.crawl(CrawlSession("Python", 1, keep_frontier=True))
+        snapshot = CrawlSnapshot.from_session(shallow, merge(shallow.results))
+        self.assertEqual(snapshot.unexpanded, ("Snake", "Monty"))
+        self.assertEqual(shallow.stats.links_discovered, 2)
+
+        # The links of the last level come from the article cache
+        self.requested.clear()
+        deeper = await crawler.crawl(snapshot.resume(2, CrawlBudget()))
+        self.assertEqual(self.requested, ["Reptile"])
+        fresh = await crawler.crawl(CrawlSession("Python", 2))
+        await crawler.aclose()
+
+        self.assertEqual(set(deeper.results), {"Reptile"})
+        self.assertEqual(deeper.stats.articles_fetched, fresh.stats.articles_fetched)
+        self.assertEqual(deeper.stats.links_discovered, fresh.stats.links_discovered)
+
+        merged = CrawlSnapshot.from_session(
+            deeper, merge({"Python": snapshot.word_counts, **deeper.results})
+        )
+        self.assertEqual(merged.word_counts, merge(fresh.results))
+        self.assertEqual(merged.unexpanded, ("Reptile",))
+
+    async def test_evicted_last_level_is_fetched_again(self):
+        """Test that links of articles no longer cached are fetched, not counted again."""
+        http_client = httpx.AsyncClient(transport=httpx.MockTransport(self.handler))
+        client = WikipediaClient(article_cache=WikipediaClient.create_article_cache(0))
+        crawler = AsyncWikipediaCrawler(client, http_client=http_client)
+
+        shallow = await crawler.crawl(CrawlSession("Python", 1, keep_frontier=True))
+        snapshot = CrawlSnapshot.from_session(shallow, merge(shallow.results))
+
+        self.requested.clear()
+        deeper = await crawler.crawl(snapshot.resume(2, CrawlBudget()))
+        await crawler.aclose()
+
+        self.assertEqual(self.requested, ["Snake", "Monty", "Reptile"])
+        self.assertEqual(set(deeper.results), {"Reptile"})
+        self.assertEqual(deeper.stats.articles_fetched, 4)
+
+
+class TestResumedCrawlWithRedirects(unittest.IsolatedAsyncioTestCase):
+    """Test cases for resolving the links of the last level through redirects."""
+
+    def setUp(self):
+        """Start the fake API with a redirect alias of "Reptile"."""
+        articles = {
+            "Python": ("python snake", ["Snake"]),
+            "Snake": ("snake reptile", ["Serpentes", "Reptile", "Python"]),
+            "Reptile": ("reptile animal", []),
+        }
+        self.api = FakeWikipediaAPI(articles, redirects={"Serpentes": "Reptile"}).start()
+
+    def tearDown(self):
+        """Stop the fake API."""
+        self.api.stop()
+
+    def make_crawler(self):
+        """Create a crawler resolving links through the fake API."""
+        return AsyncWikipediaCrawler(
+            WikipediaClient(api_url=self.api.url),
+            title_resolver=TitleResolver(BatchQueryFetcher(self.api.url)),
+        )
+
+    async def test_last_level_links_are_resolved_when_deepened(self):
+        """Test that keeping the frontier costs no link queries until it is used."""
+        crawler = self.make_crawler()
+        await crawler.crawl(CrawlSession("Python", 1))
+        plain_queries = self.api.count("query")
+        await crawler.aclose()
+
+        self.api.requests.clear()
+        crawler = self.make_crawler()
+        shallow = await crawler.crawl(CrawlSession("Python", 1, keep_frontier=True))
+        self.assertEqual(self.api.count("query"), plain_queries)
+        self.assertFalse(shallow.truncated)
+        self.assertEqual(shallow.unexpanded, ["Snake"])
+
+        snapshot = CrawlSnapshot.from_session(shallow, merge(shallow.results))
+        deeper = await crawler.crawl(snapshot.resume(2, CrawlBudget()))
+        await crawler.aclose()
+
+        # The alias and its target are fetched once
+        self.assertEqual(set(deeper.results), {"Reptile"})
+        self.assertEqual(deeper.stats.articles_fetched, 3)
+
+    async def test_frontier_resolution_timeout_does_not_truncate(self):
+        """Test that a slow resolution of the last level's links falls back to them."""
+        crawler = self.make_crawler()
+        shallow = await crawler.crawl(CrawlSession("Python", 1, keep_frontier=True))
+        snapshot = CrawlSnapshot.from_session(shallow, merge(shallow.results))
+
+        resolve = crawler.title_resolver.resolve
+
+        async def slow_resolve(http_client, titles, semaphore):
+            if "Serpentes" in titles:
+                await asyncio.sleep(10)
+            return await resolve(http_client, titles, semaphore)
+
+        crawler.title_resolver.resolve = slow_resolve
+        deeper = await crawler.crawl(snapshot.resume(2, CrawlBudget(time_limit=2.0)))
+        await crawler.aclose()
+
+        self.assertFalse(deeper.truncated)
+        self.assertIsNone(deeper.truncation_reason)
+        self.assertIn("Reptile", deeper.results)
+
+
+if __name__ == "__main__":
+    unittest.main()
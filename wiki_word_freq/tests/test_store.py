@@ -0,0 +1,119 @@
+"""
+Tests for the on-disk article store.
+"""
+
+import os
+import tempfile
+import threading
+import unittest
+from collections import Counter
+from unittest.mock import patch
+
+from wiki_word_freq.processing import ProcessedArticle
+from wiki_word_freq.store import ArticleStore
+from wiki_word_freq.wikipedia import WikipediaClient
+
+
+class FakeClock:
+    """Manually advanced time source."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestArticleStore(unittest.TestCase):
+    """Test cases for the ArticleStore class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "articles.sqlite3")
+        self.clock = FakeClock()
+        self.store = ArticleStore(self.path, max_age=60, clock=self.clock)
+        self.processed = ProcessedArticle(Counter({"python": 2}), ["Snake"])
+
+        self.sample_html = """
+        <div class="mw-parser-output">
+            <p>Python is a snake <a href="/wiki/Snake">snake</a>.</p>
+        </div>
+        """
+
+    def tearDown(self):
+        """Remove the database."""
+        self.store.close()
+        self.directory.cleanup()
+
+    def test_put_and_get(self):
+        """Test storing the HTML and processed result of an article."""
+        self.store.put_html("Python", 42, "<p>html</p>")
+        self.store.put_processed("Python", self.processed)
+
+        stored = self.store.get("Python")
+
+        self.assertEqual(stored.revision_id, 42)
+        self.assertEqual(stored.html, "<p>html</p>")
+        self.assertEqual(stored.processed, self.processed)
+        self.assertIsNone(self.store.get("Snake"))
+
+    def test_new_revision_replaces_old_one(self):
+        """Test that only the latest revision of an article is kept."""
+        self.store.put_html("Python", 1, "old")
+        self.store.put_processed("Python", self.processed)
+        self.store.put_html("Python", 2, "new")
+
+        stored = self.store.get("Python")
+
+        self.assertEqual(stored.revision_id, 2)
+        self.assertEqual(stored.html, "new")
+        self.assertIsNone(stored.processed)
+
+    def test_stale_entries_are_ignored(self):
+        """Test that entries older than the maximum age are not returned."""
+        self.store.put_html("Python", 1, "html")
+
+        self.clock.now += 59
+        self.assertIsNotNone(self.store.get("Python"))
+
+        self.clock.now += 1
+        self.assertIsNone(self.store.get("Python"))
+
+    def test_shared_between_stores_and_threads(self):
+        """Test that several stores on one file see each other's writes."""
+        other = ArticleStore(self.path, max_age=60, clock=self.clock)
+
+        def write(index):
+            other.put_html(f"Article{index}", index, f"html {index}")
+
+        threads = [threading.Thread(target=write, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for index in range(8):
+            self.assertEqual(self.store.get(f"Article{index}").html, f"html {index}")
+        other.close()
+
+    @patch("requests.Session.get")
+    def test_client_reads_articles_from_store(self, mock_get):
+        """Test that a client with a cold memory cache uses the store."""
+        mock_get.return_value.json.return_value = {
+            "parse": {"text": {"*": self.sample_html}, "revid": 7}
+        }
+
+        first = WikipediaClient(article_store=self.store)
+        processed = first.get_processed_article("Python")
+
+        second = WikipediaClient(article_store=self.store)
+        self.assertEqual(second.get_processed_article("Python"), processed)
+        self.assertEqual(second.get_article_content("Python"), self.sample_html)
+
+        mock_get.assert_called_once()
+        self.assertEqual(self.store.get("Python").revision_id, 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+"""
+Tests for streaming crawl progress.
+"""
+
+import asyncio
+import json
+import unittest
+from collections import Counter
+
+from wiki_word_freq.crawler import AsyncWikipediaCrawler
+from wiki_word_freq.processing import ProcessedArticle
+from wiki_word_freq.session import CrawlSession, LevelBatch
+from wiki_word_freq.streaming import (
+    FORMAT_NDJSON,
+    FORMAT_SSE,
+    ProgressStream,
+    choose_format,
+    encode_event,
+)
+from wiki_word_freq.tests.fake_api import FakeWikipediaAPI
+from wiki_word_freq.wikipedia import WikipediaClient
+
+ARTICLES = {
+    "Python": ("python snake", ["Snake", "Monty"]),
+    "Snake": ("snake reptile", ["Reptile"]),
+    "Monty": ("monty comedy", []),
+    "Reptile": ("animal scales", []),
+}
+
+
+class TestStreamEncoding(unittest.TestCase):
+    """Test cases for choosing and encoding stream formats."""
+
+    def test_choose_format(self):
+        """Test that the query parameter takes precedence over the Accept header."""
+        self.assertEqual(choose_format(None, None), FORMAT_NDJSON)
+        self.assertEqual(choose_format(None, "text/event-stream"), FORMAT_SSE)
+        self.assertEqual(choose_format("ndjson", "text/event-stream"), FORMAT_NDJSON)
+        with self.assertRaises(ValueError):
+            choose_format("xml", None)
+
+    def test_encode_event(self):
+        """Test NDJSON lines and server-sent events."""
+        event = {"event": "progress", "articles_fetched": 1}
+
+        self.assertEqual(
+            encode_event(event, FORMAT_NDJSON),
+            '{"event":"progress","articles_fetched":1}\n',
+        )
+        self.assertEqual(
+            encode_event(event, FORMAT_SSE),
+            'event: progress\ndata: {"event":"progress","articles_fetched":1}\n\n',
+        )
+
+
+class TestProgressStream(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the ProgressStream class."""
+
+    async def test_stream_merges_counts_and_emits_progress(self):
+        """Test that a crawl reports every level with running top words."""
+        api = FakeWikipediaAPI(ARTICLES).start()
+        crawler = AsyncWikipediaCrawler(WikipediaClient(api_url=api.url))
+        session = CrawlSession("Python", 2, keep_results=False)
+        stream = ProgressStream(session, top_k=1, every=2)
+
+        events = [
+            event async for event in stream.run(crawler.crawl(session, listener=stream))
+        ]
+        await crawler.aclose()
+        api.stop()
+
+        self.assertEqual(session.results, {})
+        self.assertEqual(stream.articles_fetched, 4)
+        self.assertEqual(stream.word_counts["snake"], 3)
+
+        levels = [event for event in events if event["event"] == "level"]
+        self.assertEqual([event["depth"] for event in levels], [0, 1, 2])
+        self.assertEqual([event["next_level_articles"] for event in levels], [2, 1, 0])
+        self.assertEqual(levels[-1]["top_words"], [("snake", 3)])
+        self.assertEqual(
+            [event["articles_fetched"] for event in events if event["event"] == "progress"],
+            [2, 4],
+        )
+        # Events must be serializable as they are
+        json.dumps(events)
+
+    async def test_slow_client_drops_snapshots(self):
+        """Test that events beyond max_pending are dropped instead of buffered."""
+        session = CrawlSession("Python", 0)
+        stream = ProgressStream(session, every=1, max_pending=2)
+
+        async def crawl():
+            for index in range(5):
+                stream.article_done(f"Article {index}", ProcessedArticle(Counter(a=1)))
+            stream.level_done(session, LevelBatch(0, ["Python"], False))
+            return session
+
+        events = [event async for event in stream.run(crawl())]
+
+        self.assertEqual(len(events), 2)
+        self.assertEqual(stream.word_counts["a"], 5)
+
+    async def test_stopping_the_stream_cancels_the_crawl(self):
+        """Test that the crawl is cancelled when the client goes away."""
+        session = CrawlSession("Python", 0)
+        stream = ProgressStream(session, every=1)
+        cancelled = asyncio.Event()
+
+        async def crawl():
+            stream.article_done("Python", None)
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        events = stream.run(crawl())
+        self.assertEqual((await events.__anext__())["articles_missing"], 1)
+        await events.aclose()
+        await asyncio.wait_for(cancelled.wait(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+Tests for title canonicalization and redirect resolution.
+"""
+
+import unittest
+
+import httpx
+
+from wiki_word_freq.crawler import AsyncWikipediaCrawler
+from wiki_word_freq.query import BatchQueryFetcher
+from wiki_word_freq.tests.fake_api import FakeWikipediaAPI
+from wiki_word_freq.titles import TitleResolver, canonical_title
+from wiki_word_freq.wikipedia import WikipediaClient
+
+ARTICLES = {
+    "Python": (
+        "python snake",
+        ["Snake", "snake", "Snake#Biology", "Serpent", "Python_(genus)"],
+    ),
+    "Snake": ("snake reptile", []),
+    "Python (genus)": ("python genus", ["Python"]),
+}
+
+
+class TestCanonicalTitle(unittest.TestCase):
+    """Test cases for the canonical_title function."""
+
+    def test_canonical_title(self):
+        """Test the spellings that lead to the same article."""
+        cases = {
+            "Python_(programming_language)": "Python (programming language)",
+            "python (programming language)": "Python (programming language)",
+            "Python_%28programming_language%29": "Python (programming language)",
+            "Python (programming language)#History": "Python (programming language)",
+            "  Python   language ": "Python language",
+            "#History": "",
+        }
+        for title, expected in cases.items():
+            with self.subTest(title=title):
+                self.assertEqual(canonical_title(title), expected)
+
+
+class TestTitleResolver(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the TitleResolver class."""
+
+    def setUp(self):
+        """Start the fake API with a redirect alias of "Snake"."""
+        self.api = FakeWikipediaAPI(ARTICLES, redirects={"Serpent": "Snake"}).start()
+
+    def tearDown(self):
+        """Stop the fake API."""
+        self.api.stop()
+
+    async def test_resolve_caches_aliases(self):
+        """Test that titles are resolved in batches and only queried once."""
+        resolver = TitleResolver(BatchQueryFetcher(self.api.url, batch_size=2))
+
+        async with httpx.AsyncClient() as http_client:
+            resolved = await resolver.resolve(
+                http_client, ["serpent", "Snake_#Biology", "Python", "Python_(genus)"]
+            )
+            self.assertEqual(self.api.count("query"), 2)
+
+            again = await resolver.resolve(http_client, ["Serpent", "Python"])
+
+        self.assertEqual(
+            resolved,
+            {
+                "serpent": "Snake",
+                "Snake_#Biology": "Snake",
+                "Python": "Python",
+                "Python_(genus)": "Python (genus)",
+            },
+        )
+        self.assertEqual(again, {"Serpent": "Snake", "Python": "Python"})
+        self.assertEqual(self.api.count("query"), 2)
+
+    async def test_crawler_fetches_each_article_once(self):
+        """Test that aliases found in HTML links lead to a single fetch."""
+        client = WikipediaClient(api_url=self.api.url)
+        crawler = AsyncWikipediaCrawler(
+            client, title_resolver=TitleResolver(BatchQueryFetcher(self.api.url))
+        )
+        result = await crawler.traverse_articles("Python", 2)
+        await crawler.aclose()
+
+        pages = [
+            params["page"] for params in self.api.requests if params["action"] == "parse"
+        ]
+        self.assertEqual(sorted(pages), ["Python", "Python_(genus)", "Snake"])
+        self.assertEqual(set(result), {"Python", "Python (genus)", "Snake"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,196 @@
+"""
+Tests for retries and adaptive rate limiting of API requests.
+"""
+
+import asyncio
+import email.utils
+import unittest
+
+import httpx
+
+from wiki_word_freq.transport import (
+    AdaptiveLimiter,
+    RetryPolicy,
+    RetryTransport,
+    parse_retry_after,
+)
+
+
+class FakeClock:
+    """Manually advanced time source."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRetryPolicy(unittest.TestCase):
+    """Test cases for the backoff and Retry-After parsing."""
+
+    def test_parse_retry_after(self):
+        """Test seconds, HTTP dates and invalid values."""
+        date = email.utils.formatdate(1030.0, usegmt=True)
+
+        self.assertEqual(parse_retry_after("3"), 3.0)
+        self.assertEqual(parse_retry_after(date, clock=lambda: 1000.0), 30.0)
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertIsNone(parse_retry_after(None))
+
+    def test_backoff(self):
+        """Test that the backoff doubles up to its maximum, and honors Retry-After."""
+        policy = RetryPolicy(backoff_base=1.0, backoff_max=5.0)
+
+        self.assertEqual(policy.backoff(0, rng=lambda: 0.5), 0.5)
+        self.assertEqual(policy.backoff(2, rng=lambda: 0.5), 2.0)
+        self.assertEqual(policy.backoff(10, rng=lambda: 0.5), 2.5)
+        self.assertEqual(policy.backoff(0, retry_after=7.0, rng=lambda: 0.5), 7.0)
+
+
+class TestAdaptiveLimiter(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the AdaptiveLimiter class."""
+
+    async def test_additive_increase_multiplicative_decrease(self):
+        """Test that the limit grows slowly and is halved once per burst."""
+        clock = FakeClock()
+        limiter = AdaptiveLimiter(max_limit=8, initial_limit=4, clock=clock)
+
+        first = await limiter.acquire()
+        second = await limiter.acquire()
+        limiter.on_overload(first)
+        clock.now += 1
+        limiter.on_overload(second)
+        limiter.release()
+        limiter.release()
+        self.assertEqual(limiter.limit, 2.0)
+        self.assertEqual(limiter.decreases, 1)
+
+        limiter.on_overload(await limiter.acquire())
+        limiter.release()
+        self.assertEqual(limiter.limit, 1.0)
+
+        limiter.on_success()
+        limiter.on_success()
+        self.assertEqual(limiter.limit, 2.5)
+
+    async def test_limit_bounds_concurrency(self):
+        """Test that waiters get a slot as soon as one is released."""
+        limiter = AdaptiveLimiter(max_limit=1)
+        await limiter.acquire()
+
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0.01)
+        self.assertFalse(waiter.done())
+
+        limiter.release()
+        await asyncio.wait_for(waiter, 1)
+        self.assertEqual(limiter.in_use, 1)
+
+    async def test_retry_after_pauses_requests(self):
+        """Test that no slot is handed out before Retry-After has passed."""
+        limiter = AdaptiveLimiter(max_limit=4)
+        started = await limiter.acquire()
+        limiter.on_overload(started, retry_after=0.05)
+        limiter.release()
+
+        loop = asyncio.get_running_loop()
+        before = loop.time()
+        await limiter.acquire()
+        self.assertGreaterEqual(loop.time() - before, 0.04)
+
+
+class TestRetryTransport(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the RetryTransport class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.responses = []
+        self.requests = 0
+        self.delays = []
+
+    async def handler(self, request):
+        """Serve the queued responses, then successes."""
+        self.requests += 1
+        if not self.responses:
+            return httpx.Response(200, json={"ok": True})
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    async def sleep(self, delay):
+        """Record the delays instead of waiting."""
+        self.delays.append(delay)
+
+    def make_client(self, limiter=None, max_retries=3):
+        """Create a client retrying through the fake handler."""
+        transport = RetryTransport(
+            httpx.MockTransport(self.handler),
+            RetryPolicy(max_retries=max_retries, backoff_base=1.0),
+            limiter,
+            sleep=self.sleep,
+            rng=lambda: 0.5,
+        )
+        return httpx.AsyncClient(transport=transport), transport
+
+    async def test_retries_server_errors_and_rate_limiting(self):
+        """Test that 5xx and 429 responses are retried, honoring Retry-After."""
+        self.responses = [
+            httpx.Response(502),
+            httpx.Response(429, headers={"Retry-After": "4"}),
+        ]
+        client, transport = self.make_client()
+
+        response = await client.get("https://example.org/w/api.php")
+        await client.aclose()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.delays, [0.5, 4.0])
+        self.assertEqual(transport.retries, 2)
+
+    async def test_overload_cuts_the_shared_limit(self):
+        """Test that overloaded responses cut the limit and slots are released."""
+        self.responses = [httpx.Response(503), httpx.Response(500)]
+        limiter = AdaptiveLimiter(max_limit=8)
+        client, _ = self.make_client(limiter)
+
+        response = await client.get("https://example.org/w/api.php")
+        await client.aclose()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(limiter.limit, 4)
+        self.assertLess(limiter.limit, 5)
+        self.assertEqual(limiter.decreases, 1)
+        self.assertEqual(limiter.in_use, 0)
+
+    async def test_gives_up_after_max_retries(self):
+        """Test that the last response or error is returned once retries run out."""
+        self.responses = [httpx.Response(500)] * 3
+        client, _ = self.make_client(max_retries=2)
+        response = await client.get("https://example.org/w/api.php")
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(self.requests, 3)
+
+        self.responses = [httpx.ReadTimeout("Timed out")] * 3
+        with self.assertRaises(httpx.ReadTimeout):
+            await client.get("https://example.org/w/api.php")
+        await client.aclose()
+
+    async def test_client_errors_and_long_waits_are_not_retried(self):
+        """Test that 404s and Retry-After beyond the policy are returned at once."""
+        self.responses = [
+            httpx.Response(404),
+            httpx.Response(429, headers={"Retry-After": "3600"}),
+        ]
+        client, _ = self.make_client()
+
+        self.assertEqual((await client.get("https://example.org/a")).status_code, 404)
+        self.assertEqual((await client.get("https://example.org/b")).status_code, 429)
+        await client.aclose()
+        self.assertEqual(self.requests, 2)
+        self.assertEqual(self.delays, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
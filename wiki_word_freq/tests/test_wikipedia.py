@@ -3,7 +3,10 @@ Tests for the Wikipedia client.
 """
 
 import unittest
+import requests
+from collections import Counter
 from unittest.mock import patch, MagicMock
+from wiki_word_freq.processing import ProcessedArticle
 from wiki_word_freq.wikipedia import WikipediaClient
 
 
@@ -41,6 +44,7 @@ class TestWikipediaClient(unittest.TestCase):
         mock_get.assert_called_once()
         args, kwargs = mock_get.call_args
         self.assertEqual(kwargs["params"]["page"], "Python")
+        self.assertEqual(kwargs["timeout"], WikipediaClient.DEFAULT_TIMEOUT)
 
         # Verify the result
         self.assertEqual(result, self.sample_html)
@@ -59,6 +63,14 @@ class TestWikipediaClient(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.client.get_article_content("NonExistentArticle")
 
+    @patch("requests.Session.get")
+    def test_timed_out_article_is_skipped(self, mock_get):
+        """Test that a timed-out request skips the article instead of ending the traversal."""
+        mock_get.side_effect = requests.Timeout()
+
+        self.assertEqual(self.client.traverse_articles("Python", 1), {})
+        self.assertEqual(mock_get.call_count, 1)
+
     def test_extract_wiki_links(self):
         """Test extracting Wikipedia links from HTML content."""
         links = self.client.extract_wiki_links(self.sample_html)
@@ -67,6 +79,23 @@ class TestWikipediaClient(unittest.TestCase):
         expected_links = ["Python", "Programming", "Computer_science"]
         self.assertEqual(set(links), set(expected_links))
 
+    def test_parse_article_links(self):
+        """Test extracting existing main-namespace links from a parse response."""
+        params = self.client.build_parse_params("Python", with_links=True)
+        self.assertEqual(params["prop"], "text|revid|links")
+
+        data = {
+            "parse": {
+                "links": [
+                    {"ns": 0, "exists": "", "*": "Programming"},
+                    {"ns": 0, "*": "Missing article"},
+                    {"ns": 14, "exists": "", "*": "Category:Programming languages"},
+                ]
+            }
+        }
+        self.assertEqual(self.client.parse_article_links(data), ["Programming"])
+        self.assertIsNone(self.client.parse_article_links({"parse": {}}))
+
     def test_extract_words(self):
         """Test extracting words from HTML content."""
         words = self.client.extract_words(self.sample_html)
@@ -86,28 +115,70 @@ class TestWikipediaClient(unittest.TestCase):
             self.assertIn(word, words)
 
     @patch.object(WikipediaClient, "get_article_content")
-    @patch.object(WikipediaClient, "extract_wiki_links")
-    @patch.object(WikipediaClient, "extract_words")
-    def test_traverse_articles(
-        self, mock_extract_words, mock_extract_links, mock_get_content
-    ):
+    @patch.object(WikipediaClient, "process_article")
+    def test_traverse_articles(self, mock_process_article, mock_get_content):
         """Test traversing articles."""
         # Mock the dependencies
         mock_get_content.return_value = self.sample_html
-        mock_extract_links.return_value = ["Python", "Programming"]
-        mock_extract_words.return_value = ["python", "programming", "language"]
+        mock_process_article.return_value = ProcessedArticle(
+            Counter(["python", "programming", "language"]), ["Python", "Programming"]
+        )
 
         # Call the method with depth 1
         result = self.client.traverse_articles("Python", 1)
 
         # Verify the result
         self.assertIn("Python", result)
-        self.assertEqual(result["Python"], ["python", "programming", "language"])
+        self.assertEqual(
+            result["Python"], Counter(["python", "programming", "language"])
+        )
 
-        # Verify the dependencies were called
+        # Verify the dependencies were called, parsing each article only once
         mock_get_content.assert_called()
-        mock_extract_links.assert_called()
-        mock_extract_words.assert_called()
+        self.assertEqual(
+            mock_process_article.call_count, mock_get_content.call_count
+        )
+
+    def test_process_article_matches_extractors(self):
+        """Test that the single-pass processing matches the separate extractors."""
+        processed = self.client.process_article(self.sample_html)
+
+        self.assertEqual(
+            processed.word_counts, Counter(self.client.extract_words(self.sample_html))
+        )
+        self.assertEqual(
+            processed.links, self.client.extract_wiki_links(self.sample_html)
+        )
+
+    @patch.object(WikipediaClient, "get_processed_article")
+    def test_traverse_articles_expands_from_shortest_depth(self, mock_get_processed):
+        """Test that an article reached deep first is still expanded at its shortest depth."""
+        graph = {"A": ["B", "C"], "B": ["C"], "C": ["D"], "D": ["E"]}
+        mock_get_processed.side_effect = lambda title, **kwargs: ProcessedArticle(
+            Counter([title.lower()]), graph.get(title, [])
+        )
+
+        result = self.client.traverse_articles("A", 2)
+
+        # D is only reachable through C, which is at depth 1 via A
+        self.assertEqual(list(result), ["A", "B", "C", "D"])
+        self.assertEqual(
+            [call.args[0] for call in mock_get_processed.call_args_list],
+            ["A", "B", "C", "D"],
+        )
+
+    @patch.object(WikipediaClient, "get_article_content")
+    def test_get_processed_article_uses_cache(self, mock_get_content):
+        """Test that processed articles are cached under their normalized title."""
+        mock_get_content.return_value = self.sample_html
+
+        first = self.client.get_processed_article("computer_science", with_links=False)
+        second = self.client.get_processed_article("Computer science")
+
+        mock_get_content.assert_called_once()
+        self.assertIs(first, second)
+        self.assertEqual(set(second.links), {"Python", "Programming", "Computer_science"})
+        self.assertEqual(self.client.article_cache.stats.hits, 1)
 
     @patch.object(WikipediaClient, "get_article_content")
     def test_traverse_articles_error(self, mock_get_content):
@@ -2,8 +2,21 @@
 Tests for the word frequency analyzer.
 """
 
+import random
 import unittest
-from wiki_word_freq.word_frequency import WordFrequencyAnalyzer
+from collections import Counter
+
+import numpy as np
+
+from wiki_word_freq.word_frequency import (
+    ENGINE_NUMPY,
+    PercentileIndex,
+    VectorizedWordFrequencyAnalyzer,
+    Vocabulary,
+    WordCountArrays,
+    WordFrequencyAnalyzer,
+    create_analyzer,
+)
 
 
 class TestWordFrequencyAnalyzer(unittest.TestCase):
@@ -105,6 +118,81 @@ class TestWordFrequencyAnalyzer(unittest.TestCase):
         for word, freq in result["word_frequency"].items():
             self.assertAlmostEqual(freq, expected_frequencies[word], places=5)
 
+    def test_calculate_word_frequencies_from_word_counts(self):
+        """Test that per-article word counts give the same result as word lists."""
+        sample_counts = {
+            title: Counter(words) for title, words in self.sample_words.items()
+        }
+
+        for ignore_list, percentile in [(None, 0), (["apple", "Banana"], 0), (None, 50)]:
+            with self.subTest(ignore_list=ignore_list, percentile=percentile):
+                self.assertEqual(
+                    self.analyzer.calculate_word_frequencies(
+                        sample_counts, ignore_list=ignore_list, percentile=percentile
+                    ),
+                    self.analyzer.calculate_word_frequencies(
+                        self.sample_words, ignore_list=ignore_list, percentile=percentile
+                    ),
+                )
+
+    def test_filter_by_percentile_reuses_index(self):
+        """Test filtering the same counts at several percentiles with one index."""
+        word_count = {"a": 5, "b": 1, "c": 3, "d": 1}
+        index = PercentileIndex(word_count.values())
+
+        self.assertIs(self.analyzer.filter_by_percentile(word_count, 10, index), word_count)
+        self.assertEqual(
+            self.analyzer.filter_by_percentile(word_count, 50, index), {"a": 5, "c": 3}
+        )
+        self.assertEqual(self.analyzer.filter_by_percentile(word_count, 100, index), {"a": 5})
+        self.assertEqual(index.threshold(50), 2.0)
+
+    def test_frequencies_from_indexed_counts(self):
+        """Test that indexed counts are filtered without being modified."""
+        word_count, index = self.analyzer.index_word_counts(
+            self.sample_words, ignore_list=["the"]
+        )
+        snapshot = dict(word_count)
+
+        for percentile in (0, 50, 90):
+            with self.subTest(percentile=percentile):
+                self.assertEqual(
+                    self.analyzer.frequencies_from_counts(word_count, percentile, index),
+                    self.analyzer.calculate_word_frequencies(
+                        self.sample_words, ignore_list=["the"], percentile=percentile
+                    ),
+                )
+        self.assertEqual(word_count, snapshot)
+
+    def test_frequencies_relative_to_total(self):
+        """Test that a total covering untracked words is the denominator."""
+        word_count = {"a": 6, "b": 2, "c": 2}
+
+        for analyzer in (self.analyzer, VectorizedWordFrequencyAnalyzer()):
+            with self.subTest(analyzer=type(analyzer).__name__):
+                result = analyzer.calculate_word_frequencies({"A": word_count}, total=20)
+                self.assertEqual(result["word_frequency"], {"a": 30.0, "b": 10.0, "c": 10.0})
+                self.assertEqual(result["total"], 20)
+
+                # Words the percentile drops no longer count, as without a total
+                filtered = analyzer.calculate_word_frequencies(
+                    {"A": word_count}, percentile=90, total=20
+                )
+                self.assertEqual(filtered["word_frequency"], {"a": 100.0})
+                self.assertNotIn("total", filtered)
+
+        self.assertEqual(
+            self.analyzer.frequencies_from_counts(word_count, total=20)["total"], 20
+        )
+
+    def test_merge_word_counts(self):
+        """Test merging word counts and word lists of several articles."""
+        merged = self.analyzer.merge_word_counts(
+            {"article1": Counter({"apple": 2, "banana": 1}), "article2": ["apple", "fig"]}
+        )
+
+        self.assertEqual(merged, Counter({"apple": 3, "banana": 1, "fig": 1}))
+
     def test_calculate_word_frequencies_empty_input(self):
         """Test word frequency calculation with empty input."""
         result = self.analyzer.calculate_word_frequencies({})
@@ -112,6 +200,150 @@ class TestWordFrequencyAnalyzer(unittest.TestCase):
         self.assertEqual(result["word_count"], {})
         self.assertEqual(result["word_frequency"], {})
 
+    def test_select_words(self):
+        """Test selecting pages of words by count and alphabetically."""
+        word_count = {"date": 2, "apple": 3, "fig": 1, "banana": 3, "cherry": 2}
+
+        self.assertEqual(self.analyzer.select_words(word_count), list(word_count))
+        self.assertEqual(
+            self.analyzer.select_words(word_count, limit=3),
+            ["apple", "banana", "cherry"],
+        )
+        self.assertEqual(
+            self.analyzer.select_words(word_count, limit=2, offset=2),
+            ["cherry", "date"],
+        )
+        self.assertEqual(
+            self.analyzer.select_words(word_count, offset=3, sort="count"),
+            ["date", "fig"],
+        )
+        self.assertEqual(
+            self.analyzer.select_words(word_count, limit=2, sort="word"),
+            ["apple", "banana"],
+        )
+        self.assertEqual(self.analyzer.select_words(word_count, limit=2, offset=10), [])
+        with self.assertRaises(ValueError):
+            self.analyzer.select_words(word_count, sort="length")
+
+
+class TestVectorizedWordFrequencyAnalyzer(unittest.TestCase):
+    """Test cases for the VectorizedWordFrequencyAnalyzer class."""
+
+    def test_same_result_as_python_engine(self):
+        """Test that both engines compute the same counts and frequencies."""
+        rng = random.Random(5)
+        population = [f"word{rank}" for rank in range(300)]
+        weights = [1 / rank for rank in range(1, 301)]
+        words_by_article = {
+            f"Article {index}": rng.choices(population, weights, k=200)
+            for index in range(20)
+        }
+        words_by_article["Counted"] = Counter({"word1": 7, "extra": 2})
+
+        analyzer = create_analyzer(ENGINE_NUMPY)
+        self.assertIsInstance(analyzer, VectorizedWordFrequencyAnalyzer)
+        for ignore_list, percentile in [
+            (None, 0),
+            (["word0", "WORD2", "missing"], 0),
+            (["word1"], 75),
+        ]:
+            with self.subTest(ignore_list=ignore_list, percentile=percentile):
+                self.assertEqual(
+                    analyzer.calculate_word_frequencies(
+                        words_by_article, ignore_list=ignore_list, percentile=percentile
+                    ),
+                    WordFrequencyAnalyzer().calculate_word_frequencies(
+                        words_by_article, ignore_list=ignore_list, percentile=percentile
+                    ),
+                )
+                # Indexed counts give the same result for any percentile
+                word_count, index = analyzer.index_word_counts(
+                    words_by_article, ignore_list
+                )
+                self.assertEqual(
+                    analyzer.frequencies_from_counts(word_count, percentile, index),
+                    analyzer.calculate_word_frequencies(
+                        words_by_article, ignore_list=ignore_list, percentile=percentile
+                    ),
+                )
+
+    def test_indexed_counts_stay_arrays(self):
+        """Test that indexed counts are kept as arrays and filtered without dictionaries."""
+        analyzer = VectorizedWordFrequencyAnalyzer()
+        word_count, index = analyzer.index_word_counts(
+            {"A": ["b", "a", "b", "c"], "B": Counter({"a": 3, "d": 1})}, ["d"]
+        )
+
+        self.assertIsInstance(word_count, WordCountArrays)
+        self.assertEqual(len(word_count), 3)
+        self.assertEqual(word_count.words.tolist(), ["b", "a", "c"])
+        self.assertEqual(word_count.counts.tolist(), [2, 4, 1])
+        self.assertEqual(index.values, [1, 2, 4])
+        self.assertEqual(
+            analyzer.frequencies_from_counts(word_count, 50, index),
+            {
+                "word_count": {"b": 2, "a": 4},
+                "word_frequency": {"b": 2 / 6 * 100, "a": 4 / 6 * 100},
+            },
+        )
+
+    def test_empty_input(self):
+        """Test that no words give empty dictionaries."""
+        result = VectorizedWordFrequencyAnalyzer().calculate_word_frequencies(
+            {"Empty": []}, percentile=50
+        )
+        self.assertEqual(result, {"word_count": {}, "word_frequency": {}})
+
+    def test_vocabulary_interns_words(self):
+        """Test that words get consecutive IDs on first sight."""
+        vocabulary = Vocabulary()
+        self.assertEqual(vocabulary.ids(["b", "a", "b"]).tolist(), [0, 1, 0])
+        self.assertEqual(vocabulary.ids(["c", "a"]).tolist(), [2, 1])
+        self.assertEqual(vocabulary.words().tolist(), ["b", "a", "c"])
+
+    def test_unknown_engine(self):
+        """Test that an unknown engine is rejected."""
+        with self.assertRaises(ValueError):
+            create_analyzer("fortran")
+
+
+class TestPercentileIndex(unittest.TestCase):
+    """Test cases for the PercentileIndex class."""
+
+    def test_matches_numpy(self):
+        """Test that thresholds equal np.percentile for every integer percentile."""
+        rng = random.Random(3)
+        samples = [
+            [7],
+            [1, 1, 1, 2],
+            [rng.randint(1, 5) for _ in range(101)],
+            [int(rng.paretovariate(1.2)) for _ in range(2000)],
+        ]
+        for counts in samples:
+            index = PercentileIndex(counts)
+            for percentile in range(101):
+                with self.subTest(size=len(counts), percentile=percentile):
+                    self.assertEqual(
+                        index.threshold(percentile), np.percentile(counts, percentile)
+                    )
+
+    def test_from_array(self):
+        """Test that an index built from an array has the same thresholds."""
+        counts = [int(value) for value in np.random.default_rng(4).zipf(1.5, 1000)]
+        from_list = PercentileIndex(counts)
+        from_array = PercentileIndex.from_array(np.array(counts))
+
+        self.assertEqual(from_array.size, from_list.size)
+        for percentile in (0, 25, 50, 90, 99, 100):
+            self.assertEqual(from_array.threshold(percentile), from_list.threshold(percentile))
+        self.assertEqual(PercentileIndex.from_array(np.zeros(0, dtype=np.int64)).size, 0)
+
+    def test_empty_counts(self):
+        """Test that an empty index has no words and a zero threshold."""
+        index = PercentileIndex([])
+        self.assertEqual(index.size, 0)
+        self.assertEqual(index.threshold(50), 0.0)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,120 @@
+"""
+Module for canonicalizing article titles and resolving redirect aliases.
+"""
+
+import asyncio
+from typing import Dict, Iterable, Optional
+from urllib.parse import unquote
+
+import httpx
+
+from wiki_word_freq.cache import LRUCache
+from wiki_word_freq.query import BatchQueryFetcher
+
+
+def canonical_title(title: str) -> str:
+    """
+    Normalize an article title the way MediaWiki does, without network access.
+
+    Percent-encoding is decoded, ``#fragment`` anchors are dropped, underscores
+    become spaces, runs of whitespace are collapsed and the first letter is
+    capitalized, so "python_(programming%20language)#History" becomes
+    "Python (programming language)".
+
+    Args:
+        title: The article title, e.g. as found in a link.
+
+    Returns:
+        The canonical title, or an empty string if the title was only an anchor.
+    """
+    title = unquote(title).split("#", 1)[0]
+    title = " ".join(title.replace("_", " ").split())
+    return title[:1].upper() + title[1:]
+
+
+class TitleResolver:
+    """
+    Resolver of article titles to the canonical titles of their target pages.
+
+    Titles are canonicalized locally, then resolved through redirects in
+    batched API queries. The alias→canonical mapping is cached, including
+    titles that turned out not to be redirects, so each title is only queried
+    once per ``ttl``.
+    """
+
+    DEFAULT_CACHE_ENTRIES = 100000
+    DEFAULT_CACHE_TTL = 24 * 3600.0
+
+    def __init__(
+        self,
+        fetcher: BatchQueryFetcher,
+        cache: Optional[LRUCache[str]] = None,
+    ):
+        """
+        Initialize the resolver.
+
+        Args:
+            fetcher: The fetcher used for batched redirect queries.
+            cache: The cache mapping canonical titles to the canonical titles of
+                   their target pages. A cache with the default limits is
+                   created if omitted.
+        """
+        self.fetcher = fetcher
+        if cache is None:
+            cache = LRUCache(
+                max_entries=self.DEFAULT_CACHE_ENTRIES, ttl=self.DEFAULT_CACHE_TTL
+            )
+        self.cache = cache
+
+    async def resolve(
+        self,
+        http_client: httpx.AsyncClient,
+        titles: Iterable[str],
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ) -> Dict[str, str]:
+        """
+        Resolve titles to the canonical titles of the pages they lead to.
+
+        Titles missing from the cache are resolved in concurrent batches of the
+        fetcher's size. Titles of a batch the API rejects, or that keeps failing,
+        are only canonicalized locally, and are not cached.
+
+        Args:
+            http_client: The HTTP client.
+            titles: The article titles.
+            semaphore: An optional semaphore bounding concurrent requests.
+
+        Returns:
+            A dictionary mapping every given title to its canonical target.
+        """
+        canonical = {title: canonical_title(title) for title in titles}
+
+        resolved = {}
+        unknown = []
+        for name in dict.fromkeys(canonical.values()):
+            if not name:
+                continue
+            target = self.cache.get(name)
+            if target is None:
+                unknown.append(name)
+            else:
+                resolved[name] = target
+
+        async def resolve_batch(batch):
+            try:
+                if semaphore is None:
+                    return await self.fetcher.resolve_redirects(http_client, batch)
+                async with semaphore:
+                    return await self.fetcher.resolve_redirects(http_client, batch)
+            except (ValueError, httpx.HTTPError):
+                return {}
+
+        mappings = await asyncio.gather(
+            *(resolve_batch(batch) for batch in self.fetcher.chunk(unknown))
+        )
+        for mapping in mappings:
+            for name, target in mapping.items():
+                self.cache.set(name, target)
+                resolved[name] = target
+
+        return {title: resolved.get(name, name) for title, name in canonical.items()}
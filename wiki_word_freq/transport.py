@@ -0,0 +1,293 @@
+"""
+Module for fetching from the MediaWiki API with retries and adaptive rate limiting.
+"""
+
+import asyncio
+import email.utils
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+import httpx
+
+# Statuses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Statuses meaning that upstream is overloaded, so requests must slow down
+OVERLOAD_STATUSES = (429, 503)
+
+
+def parse_retry_after(
+    value: Optional[str], clock: Callable[[], float] = time.time
+) -> Optional[float]:
+    """
+    Parse the value of a ``Retry-After`` header.
+
+    Args:
+        value: The header value, either a number of seconds or an HTTP date.
+        clock: The source of the current Unix time, for dates.
+
+    Returns:
+        The number of seconds to wait, or None if the value is missing or invalid.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date is None:
+        return None
+    return max(0.0, date.timestamp() - clock())
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How failed requests are retried."""
+
+    # Maximum number of retries after the first attempt
+    max_retries: int = 3
+    # Backoff before retry n is drawn uniformly from [0, base * 2**n], up to max
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+    # Responses asking to wait longer than this are not retried
+    max_retry_after: float = 120.0
+
+    def backoff(
+        self,
+        attempt: int,
+        retry_after: Optional[float] = None,
+        rng: Callable[[], float] = random.random,
+    ) -> float:
+        """
+        Compute the delay before a retry, with full jitter.
+
+        Args:
+            attempt: The number of the failed attempt, from 0.
+            retry_after: The delay asked for by the server, which is a minimum.
+            rng: The source of random numbers in [0, 1).
+
+        Returns:
+            The number of seconds to wait.
+        """
+        delay = rng() * min(self.backoff_max, self.backoff_base * 2**attempt)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit adapting to what upstream tolerates (AIMD).
+
+    Every successful request raises the limit by ``1 / limit``, so about one
+    more concurrent request per round of ``limit`` requests. A rate-limited or
+    overloaded response, or a timeout, cuts the limit by ``decrease_factor``;
+    requests started before the last cut don't cut it again, so one burst of
+    failures counts once. A ``Retry-After`` pauses every request until it has
+    passed. One limiter is shared by all crawls of a process.
+
+    A slot is held from sending a request until its response headers arrive.
+    """
+
+    def __init__(
+        self,
+        max_limit: int = 10,
+        min_limit: int = 1,
+        initial_limit: Optional[float] = None,
+        decrease_factor: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            max_limit: The highest concurrency allowed.
+            min_limit: The lowest concurrency the limit may be cut to.
+            initial_limit: The starting limit, ``max_limit`` if omitted.
+            decrease_factor: The factor applied to the limit on overload.
+            clock: The monotonic time source.
+        """
+        if min_limit < 1 or max_limit < min_limit:
+            raise ValueError("Limits must satisfy 1 <= min_limit <= max_limit")
+        if not 0 < decrease_factor < 1:
+            raise ValueError("decrease_factor must be between 0 and 1")
+
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.limit = float(initial_limit if initial_limit is not None else max_limit)
+        self.decrease_factor = decrease_factor
+        self.clock = clock
+        self.in_use = 0
+        self.decreases = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._last_decrease = float("-inf")
+        self._resume_at = float("-inf")
+
+    async def acquire(self) -> float:
+        """
+        Wait for a slot.
+
+        Returns:
+            The time the slot was acquired, to pass to ``on_overload``.
+        """
+        while True:
+            pause = self._resume_at - self.clock()
+            if pause > 0:
+                await asyncio.sleep(pause)
+                continue
+            if self.in_use < int(self.limit):
+                self.in_use += 1
+                return self.clock()
+
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                else:
+                    # Pass the wake-up on to another waiter
+                    self._wake()
+                raise
+
+    def release(self) -> None:
+        """Give a slot back."""
+        self.in_use -= 1
+        self._wake()
+
+    def on_success(self) -> None:
+        """Raise the limit after a successful request."""
+        self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+        self._wake()
+
+    def on_overload(self, started_at: float, retry_after: Optional[float] = None) -> None:
+        """
+        Cut the limit after a rate-limited or overloaded response, or a timeout.
+
+        Args:
+            started_at: When the failed request acquired its slot.
+            retry_after: The delay asked for by upstream, during which no
+                         request is sent.
+        """
+        if started_at > self._last_decrease:
+            self.limit = max(float(self.min_limit), self.limit * self.decrease_factor)
+            self._last_decrease = self.clock()
+            self.decreases += 1
+        if retry_after is not None:
+            self._resume_at = max(self._resume_at, self.clock() + retry_after)
+
+    def _wake(self) -> None:
+        """Wake as many waiters as there are free slots."""
+        free = int(self.limit) - self.in_use
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    def info(self) -> Dict[str, Any]:
+        """Return the current limit, the slots in use and the number of cuts."""
+        return {
+            "concurrency_limit": round(self.limit, 2),
+            "in_use": self.in_use,
+            "decreases": self.decreases,
+        }
+
+
+class RetryTransport(httpx.AsyncBaseTransport):
+    """
+    HTTP transport retrying failed requests under an adaptive concurrency limit.
+
+    Timeouts, network errors and responses with a status in RETRY_STATUSES are
+    retried with jittered exponential backoff, waiting at least as long as the
+    ``Retry-After`` header asks. Once the retries are exhausted, the last
+    response is returned, or the last error raised.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        policy: Optional[RetryPolicy] = None,
+        limiter: Optional[AdaptiveLimiter] = None,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+        rng: Callable[[], float] = random.random,
+    ):
+        """
+        Initialize the transport.
+
+        Args:
+            transport: The transport sending the requests.
+            policy: The retry policy; the default one if omitted.
+            limiter: An optional limiter, shared by every client of a process.
+            sleep: The coroutine function used to wait between attempts.
+            rng: The source of random numbers for the backoff jitter.
+        """
+        self.transport = transport
+        self.policy = policy or RetryPolicy()
+        self.limiter = limiter
+        self.sleep = sleep
+        self.rng = rng
+        self.retries = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Send a request, retrying it as the policy allows."""
+        attempt = 0
+        while True:
+            response, retry_after, error = await self._attempt(request)
+            if response is not None and response.status_code not in RETRY_STATUSES:
+                return response
+
+            if attempt >= self.policy.max_retries or (
+                retry_after is not None and retry_after > self.policy.max_retry_after
+            ):
+                if error is not None:
+                    raise error
+                return response
+
+            if response is not None:
+                await response.aclose()
+            await self.sleep(self.policy.backoff(attempt, retry_after, self.rng))
+            self.retries += 1
+            attempt += 1
+
+    async def _attempt(
+        self, request: httpx.Request
+    ) -> Tuple[Optional[httpx.Response], Optional[float], Optional[Exception]]:
+        """
+        Send a request once, holding a slot of the limiter.
+
+        Returns:
+            The response, or None on error; the delay asked for by
+            ``Retry-After``; and the error, if any.
+        """
+        started_at = await self.limiter.acquire() if self.limiter is not None else 0.0
+        try:
+            try:
+                response = await self.transport.handle_async_request(request)
+            except (httpx.TimeoutException, httpx.NetworkError) as e:
+                if self.limiter is not None and isinstance(e, httpx.TimeoutException):
+                    self.limiter.on_overload(started_at)
+                return None, None, e
+
+            retry_after = None
+            if response.status_code in RETRY_STATUSES:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if self.limiter is not None:
+                if response.status_code in OVERLOAD_STATUSES:
+                    self.limiter.on_overload(started_at, retry_after)
+                elif response.status_code < 500:
+                    self.limiter.on_success()
+            return response, retry_after, None
+        finally:
+            if self.limiter is not None:
+                self.limiter.release()
+
+    async def aclose(self) -> None:
+        """Close the underlying transport."""
+        await self.transport.aclose()
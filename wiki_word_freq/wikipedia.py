@@ -2,11 +2,23 @@
 Module for interacting with Wikipedia and traversing articles.
 """
 
-import re
 import requests
-from typing import Dict, List
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
 from bs4 import BeautifulSoup
-from urllib.parse import unquote
+
+from wiki_word_freq.cache import LRUCache
+from wiki_word_freq.processing import (
+    EXCLUDED_SELECTOR,
+    ArticleProcessor,
+    ProcessedArticle,
+    create_processor,
+    parse_wiki_href,
+    tokenize_text,
+)
+from wiki_word_freq.session import CrawlBudget, CrawlSession
+from wiki_word_freq.store import ArticleStore, StoredArticle
+from wiki_word_freq.titles import canonical_title
 
 
 class WikipediaClient:
@@ -15,10 +27,154 @@ class WikipediaClient:
     BASE_URL = "https://en.wikipedia.org/wiki/"
     API_URL = "https://en.wikipedia.org/w/api.php"
 
-    def __init__(self):
-        """Initialize the Wikipedia client."""
+    DEFAULT_CACHE_ENTRIES = 2048
+    DEFAULT_CACHE_BYTES = 256 * 1024 * 1024
+    DEFAULT_CACHE_TTL = 3600.0
+    # Connect and read timeouts of API requests, in seconds
+    DEFAULT_TIMEOUT = (5.0, 30.0)
+
+    def __init__(
+        self,
+        processor: Optional[ArticleProcessor] = None,
+        article_cache: Optional[LRUCache[ProcessedArticle]] = None,
+        article_store: Optional[ArticleStore] = None,
+        api_url: Optional[str] = None,
+        timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+    ):
+        """
+        Initialize the Wikipedia client.
+
+        Args:
+            processor: The processor extracting words and links from articles
+                       during traversal. The fastest available backend is used
+                       if omitted.
+            article_cache: The cache of processed articles shared by all
+                           traversals. A cache with the default limits is
+                           created if omitted.
+            article_store: An optional on-disk store of fetched and processed
+                           articles, consulted before going to the network.
+            api_url: The URL of the MediaWiki API; ``API_URL`` if omitted.
+            timeout: The connect and read timeouts of API requests, in seconds,
+                     so that a stalled connection can't hang a traversal.
+        """
         self.session = requests.Session()
-        self.visited_articles = set()
+        self.processor = processor or create_processor()
+        if article_cache is None:
+            article_cache = self.create_article_cache()
+        self.article_cache = article_cache
+        self.article_store = article_store
+        self.api_url = api_url or self.API_URL
+        self.timeout = timeout
+
+    @classmethod
+    def create_article_cache(
+        cls,
+        max_entries: Optional[int] = DEFAULT_CACHE_ENTRIES,
+        max_bytes: Optional[int] = DEFAULT_CACHE_BYTES,
+        ttl: Optional[float] = DEFAULT_CACHE_TTL,
+    ) -> LRUCache[ProcessedArticle]:
+        """
+        Create a cache of processed articles.
+
+        Args:
+            max_entries: The maximum number of cached articles, 0 to disable caching.
+            max_bytes: The maximum estimated memory used by cached articles.
+            ttl: The number of seconds a cached article stays valid.
+
+        Returns:
+            The article cache.
+        """
+        return LRUCache(
+            max_entries=max_entries,
+            max_bytes=max_bytes,
+            ttl=ttl,
+            sizeof=ProcessedArticle.approximate_size,
+        )
+
+    @staticmethod
+    def cache_key(article_title: str) -> str:
+        """
+        Normalize an article title for use as a cache key.
+
+        Args:
+            article_title: The title of the Wikipedia article.
+
+        Returns:
+            The canonical title, with spaces instead of underscores and a
+            capital first letter.
+        """
+        return canonical_title(article_title)
+
+    def get_cached_article(self, article_title: str) -> Optional[ProcessedArticle]:
+        """
+        Look up a processed article in the article cache.
+
+        Cached articles are shared between traversals and must not be modified.
+
+        Args:
+            article_title: The title of the Wikipedia article.
+
+        Returns:
+            The processed article, or None if it isn't cached.
+        """
+        return self.article_cache.get(self.cache_key(article_title))
+
+    def cache_article(self, article_title: str, processed: ProcessedArticle) -> None:
+        """
+        Store a processed article in the article cache.
+
+        Args:
+            article_title: The title of the Wikipedia article.
+            processed: The processed article, including its links.
+        """
+        self.article_cache.set(self.cache_key(article_title), processed)
+
+    @property
+    def caching_enabled(self) -> bool:
+        """Whether processed articles are kept in the article cache or store."""
+        return self.article_cache.max_entries != 0 or self.article_store is not None
+
+    def get_processed_article(
+        self,
+        article_title: str,
+        with_links: bool = True,
+        crawl_session: Optional[CrawlSession] = None,
+    ) -> ProcessedArticle:
+        """
+        Get the word counts and links of an article, using the article cache.
+
+        Args:
+            article_title: The title of the Wikipedia article.
+            with_links: Whether the outgoing links are needed. Links are always
+                        extracted when caching is enabled, so that the cached
+                        entry serves traversals of any depth.
+            crawl_session: The crawl session to charge downloaded bytes to.
+
+        Returns:
+            The processed article.
+
+        Raises:
+            ValueError: If the article cannot be found.
+        """
+        processed = self.get_cached_article(article_title)
+        if processed is not None:
+            return processed
+
+        stored = self.get_stored_article(article_title)
+        if stored is not None and stored.processed is not None:
+            self.cache_article(article_title, stored.processed)
+            return stored.processed
+
+        html_content = self.get_article_content(article_title)
+        if crawl_session is not None:
+            crawl_session.record_download(len(html_content.encode("utf-8")))
+
+        processed = self.process_article(
+            html_content, with_links=with_links or self.caching_enabled
+        )
+        self.cache_article(article_title, processed)
+        self.store_processed_article(article_title, processed)
+        return processed
 
     def get_article_content(self, article_title: str) -> str:
         """
@@ -32,31 +188,139 @@ class WikipediaClient:
 
         Raises:
             ValueError: If the article cannot be found.
+            requests.RequestException: If the request fails or times out.
+        """
+        stored = self.get_stored_article(article_title)
+        if stored is not None and stored.html is not None:
+            return stored.html
+
+        response = self.session.get(
+            self.api_url,
+            params=self.build_parse_params(article_title),
+            timeout=self.timeout,
+        )
+        data = response.json()
+        html_content = self.parse_article_response(article_title, data)
+        self.store_article_html(article_title, data, html_content)
+        return html_content
+
+    def build_parse_params(
+            self, article_title: str, with_links: bool = False
+    ) -> Dict[str, object]:
+        """
+        Build the MediaWiki API query parameters for fetching an article.
+
+        Args:
+            article_title: The title of the Wikipedia article.
+            with_links: Whether to also request the structured list of
+                        outgoing links.
+
+        Returns:
+            The query parameters for an ``action=parse`` request.
         """
         # Replace spaces with underscores for URL
         article_title = article_title.replace(" ", "_")
 
         # Use the API to get the page content
-        params = {
+        return {
             "action": "parse",
             "page": article_title,
             "format": "json",
-            "prop": "text",
+            "prop": "text|revid|links" if with_links else "text|revid",
             "redirects": True,
         }
 
-        response = self.session.get(self.API_URL, params=params)
-        data = response.json()
+    def parse_article_response(self, article_title: str, data: Dict) -> str:
+        """
+        Extract the HTML content from a decoded ``action=parse`` response.
 
+        Args:
+            article_title: The title of the Wikipedia article.
+            data: The decoded JSON response of the API.
+
+        Returns:
+            The HTML content of the article.
+
+        Raises:
+            ValueError: If the API reported an error for the article.
+        """
         if "error" in data:
             raise ValueError(
-                f"Article '{article_title}' not found: {data['error']['info']}"
+                f"Article '{article_title.replace(' ', '_')}' not found: "
+                f"{data['error']['info']}"
             )
 
         # Extract the HTML content
         html_content = data["parse"]["text"]["*"]
         return html_content
 
+    @staticmethod
+    def parse_article_links(data: Dict) -> Optional[List[str]]:
+        """
+        Extract the outgoing article links from a decoded ``action=parse`` response.
+
+        Only links to existing articles in the main namespace are kept, like the
+        links found in the HTML content.
+
+        Args:
+            data: The decoded JSON response of a request built with
+                  ``build_parse_params(..., with_links=True)``.
+
+        Returns:
+            The linked article titles, or None if the response has no link list.
+        """
+        links = data.get("parse", {}).get("links")
+        if links is None:
+            return None
+        return [
+            link["*"] for link in links if link.get("ns") == 0 and "exists" in link
+        ]
+
+    def get_stored_article(self, article_title: str) -> Optional[StoredArticle]:
+        """
+        Read an article from the on-disk article store.
+
+        Args:
+            article_title: The title of the Wikipedia article.
+
+        Returns:
+            The stored article, or None if there is no store or no fresh entry.
+        """
+        if self.article_store is None:
+            return None
+        return self.article_store.get(self.cache_key(article_title))
+
+    def store_article_html(
+        self, article_title: str, data: Dict, html_content: str
+    ) -> None:
+        """
+        Write the HTML content of a fetched article to the article store.
+
+        Args:
+            article_title: The title of the Wikipedia article.
+            data: The decoded JSON response of the ``action=parse`` request.
+            html_content: The HTML content of the article.
+        """
+        if self.article_store is not None:
+            self.article_store.put_html(
+                self.cache_key(article_title),
+                data["parse"].get("revid", 0),
+                html_content,
+            )
+
+    def store_processed_article(
+        self, article_title: str, processed: ProcessedArticle
+    ) -> None:
+        """
+        Write the word counts and links of an article to the article store.
+
+        Args:
+            article_title: The title of the Wikipedia article.
+            processed: The processed article.
+        """
+        if self.article_store is not None:
+            self.article_store.put_processed(self.cache_key(article_title), processed)
+
     def extract_wiki_links(self, html_content: str) -> List[str]:
         """
         Extract Wikipedia article links from HTML content.
@@ -80,13 +344,8 @@ class WikipediaClient:
             href = link.get("href", "")
 
             # Only consider internal Wikipedia article links
-            if (
-                    href.startswith("/wiki/")
-                    and ":" not in href
-                    and not href.startswith("/wiki/File:")
-            ):
-                # Extract the article title from the URL
-                article_title = unquote(href.replace("/wiki/", ""))
+            article_title = parse_wiki_href(href)
+            if article_title is not None:
                 links.append(article_title)
 
         return links
@@ -108,89 +367,89 @@ class WikipediaClient:
             return []
 
         # Remove unwanted elements
-        for element in content_div.select(
-                "table, .reference, .mw-editsection, .mw-headline, script, style"
-        ):
+        for element in content_div.select(EXCLUDED_SELECTOR):
             element.extract()
 
-        # Get the text content
-        text = content_div.get_text()
+        # Get the text content and split it into words
+        return tokenize_text(content_div.get_text())
 
-        # Clean and normalize the text
-        text = re.sub(r"\[\d+\]", "", text)  # Remove citation numbers
-        text = re.sub(r"\s+", " ", text)  # Normalize whitespace
+    def process_article(
+        self, html_content: str, with_links: bool = True
+    ) -> ProcessedArticle:
+        """
+        Extract word counts and links from the HTML content of an article in one
+        parse.
 
-        # Split into words and filter out non-words
-        words = re.findall(r"\b[a-zA-Z]+\b", text.lower())
+        Args:
+            html_content: The HTML content of a Wikipedia article.
+            with_links: Whether the outgoing links are needed.
 
-        return words
+        Returns:
+            The word counts and linked article titles of the article.
+        """
+        return self.processor.process(html_content, with_links)
 
-    def traverse_articles(self, start_article: str, depth: int) -> Dict[str, List[str]]:
+    def traverse_articles(
+            self, start_article: str, depth: int, budget: Optional[CrawlBudget] = None
+    ) -> Dict[str, Counter]:
         """
         Traverse Wikipedia articles starting from a given article up to a specified depth.
 
+        The traversal is breadth-first: each depth level is completed before the
+        next one, so every article is expanded from the shortest depth at which
+        it can be reached. When the budget runs out, the words of the articles
+        fetched so far are returned.
+
         Args:
             start_article: The title of the Wikipedia article to start from.
             depth: The depth of traversal.
+            budget: Optional limits on the cost of the crawl.
 
         Returns:
-            A dictionary mapping article titles to lists of words from those articles.
+            A dictionary mapping article titles to the word counts of those articles.
         """
-        self.visited_articles = set()
-        return self._traverse_recursive(start_article, depth)
-
-    def _traverse_recursive(
-            self, article: str, depth: int, current_depth: int = 0
-    ) -> Dict[str, List[str]]:
+        # The traversal state lives in a per-call session, so a client can be
+        # shared by concurrent requests
+        crawl_session = CrawlSession(
+            start_article, depth, budget=budget or CrawlBudget()
+        )
+
+        for batch in crawl_session.levels():
+            pages = {}
+            for title in crawl_session.admit(batch.titles):
+                if not crawl_session.can_download():
+                    break
+                pages[title] = self._get_processed_or_none(
+                    title, batch.with_links, crawl_session
+                )
+            crawl_session.complete_level(batch, pages)
+
+        return crawl_session.results
+
+    def _get_processed_or_none(
+            self, article: str, with_links: bool, crawl_session: CrawlSession
+    ) -> Optional[ProcessedArticle]:
         """
-        Recursive helper method for traversing Wikipedia articles.
+        Get the word counts and links of an article during traversal.
 
         Args:
-            article: The current article title.
-            depth: The maximum depth to traverse.
-            current_depth: The current traversal depth.
+            article: The article title.
+            with_links: Whether the outgoing links are needed.
+            crawl_session: The crawl session to charge downloaded bytes to.
 
         Returns:
-            A dictionary mapping article titles to lists of words from those articles.
+            The processed article, or None if the article doesn't exist or
+            couldn't be fetched.
         """
-        # Check if we've reached the maximum depth or already visited this article
-        if current_depth > depth or article in self.visited_articles:
-            return {}
-
-        # Mark this article as visited
-        self.visited_articles.add(article)
-
         try:
-            # Get the article content
-            html_content = self.get_article_content(article)
-
-            # Extract words from the article
-            words = self.extract_words(html_content)
-
-            # Initialize the result with the current article
-            result = {article: words}
-
-            # If we haven't reached the maximum depth, traverse linked articles
-            if current_depth < depth:
-                # Extract links from the article
-                links = self.extract_wiki_links(html_content)
-
-                # Traverse each linked article
-                for link in links:
-                    # Skip already visited articles
-                    if link in self.visited_articles:
-                        continue
-
-                    # Recursively traverse the linked article
-                    linked_articles = self._traverse_recursive(
-                        link, depth, current_depth + 1
-                    )
-
-                    # Add the results to our result dictionary
-                    result.update(linked_articles)
-
-            return result
-
+            return self.get_processed_article(
+                article, with_links=with_links, crawl_session=crawl_session
+            )
         except ValueError:
-            # If the article doesn't exist, return an empty result
-            return {}
+            # If the article doesn't exist, skip it
+            return None
+        except requests.RequestException:
+            # A failed or timed-out request skips the article rather than
+            # ending the traversal
+            crawl_session.stats.fetches_failed += 1
+            return None
@@ -2,10 +2,123 @@
 Module for calculating word frequencies from a text.
 """
 
+import bisect
+import heapq
+import itertools
+import math
 from collections import Counter
-from typing import Dict, List, Optional
+from dataclasses import dataclass
+from typing import Any, Collection, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
 import numpy as np
 
+from wiki_word_freq.ignore_lists import compile_ignore_list
+
+# Words of one article, either as a mapping of word counts or as a list of words
+ArticleWords = Union[Mapping[str, int], Iterable[str]]
+
+# Orders of selected words: most frequent first, or alphabetical
+SORT_COUNT = "count"
+SORT_WORD = "word"
+SORT_ORDERS = (SORT_COUNT, SORT_WORD)
+
+# Counting engines: Python dictionaries, or NumPy arrays indexed by word IDs
+ENGINE_PYTHON = "python"
+ENGINE_NUMPY = "numpy"
+COUNTING_ENGINES = (ENGINE_PYTHON, ENGINE_NUMPY)
+
+
+class PercentileIndex:
+    """
+    Frequency-of-frequencies index of word counts, for percentile thresholds.
+
+    The index keeps each distinct count with the number of words having a
+    count up to it, so the count at any rank, and therefore any percentile,
+    is found by bisection over the distinct counts rather than by sorting or
+    partitioning every count. Thresholds are cached, so asking for several
+    percentiles of the same counts costs one pass over them.
+
+    Percentiles match ``np.percentile`` with its default linear interpolation.
+    """
+
+    def __init__(self, counts: Iterable[int]):
+        """
+        Build the index.
+
+        Args:
+            counts: The count of every word.
+        """
+        histogram = Counter(counts)
+        # Distinct counts in increasing order, and the number of words with
+        # a count up to each of them
+        self.values = sorted(histogram)
+        self.cumulative = list(itertools.accumulate(histogram[v] for v in self.values))
+        self.size = self.cumulative[-1] if self.cumulative else 0
+        self._thresholds: Dict[float, float] = {}
+
+    @classmethod
+    def from_array(cls, counts: np.ndarray) -> "PercentileIndex":
+        """
+        Build the index of an array of counts, finding its distinct counts with NumPy.
+
+        Args:
+            counts: The count of every word.
+
+        Returns:
+            The index, with the same thresholds as one built from a list.
+        """
+        index = cls(())
+        values, occurrences = np.unique(counts, return_counts=True)
+        index.values = values.tolist()
+        index.cumulative = np.cumsum(occurrences).tolist()
+        index.size = index.cumulative[-1] if index.cumulative else 0
+        return index
+
+    def value_at(self, rank: int) -> int:
+        """
+        Get the count at a rank of the sorted counts.
+
+        Args:
+            rank: The rank, from 0 for the smallest count.
+
+        Returns:
+            The count.
+        """
+        return self.values[bisect.bisect_right(self.cumulative, rank)]
+
+    def threshold(self, percentile: float) -> float:
+        """
+        Compute a percentile of the counts.
+
+        Args:
+            percentile: The percentile, from 0 to 100.
+
+        Returns:
+            The same value as ``np.percentile(counts, percentile)``, or 0 if
+            there are no counts.
+        """
+        threshold = self._thresholds.get(percentile)
+        if threshold is None:
+            threshold = self._thresholds[percentile] = self._compute(percentile)
+        return threshold
+
+    def _compute(self, percentile: float) -> float:
+        """Interpolate between the two counts around a percentile, as NumPy does."""
+        if not self.size:
+            return 0.0
+
+        position = (self.size - 1) * (percentile / 100)
+        if position >= self.size - 1:
+            return float(self.values[-1])
+        lower_rank = math.floor(position)
+        lower = self.value_at(lower_rank)
+        upper = self.value_at(lower_rank + 1)
+        gamma = position - lower_rank
+        difference = upper - lower
+        if gamma >= 0.5:
+            return upper - difference * (1 - gamma)
+        return lower + difference * gamma
+
 
 class WordFrequencyAnalyzer:
     """Class for analyzing word frequencies in text."""
@@ -14,56 +127,509 @@ class WordFrequencyAnalyzer:
         """Initialize the word frequency analyzer."""
         pass
 
-    def calculate_word_frequencies(
-        self,
-        words_by_article: Dict[str, List[str]],
-        ignore_list: Optional[List[str]] = None,
-        percentile: int = 0,
-    ) -> Dict[str, Dict[str, float]]:
+    def merge_word_counts(
+        self, words_by_article: Mapping[str, ArticleWords]
+    ) -> Counter:
         """
-        Calculate word frequencies from a collection of words.
+        Merge the words of several articles into a single counter.
+
+        Articles are added one at a time, so memory scales with the size of the
+        vocabulary rather than with the total number of words.
 
         Args:
-            words_by_article: A dictionary mapping article titles to lists of words.
-            ignore_list: A list of words to ignore in the frequency calculation.
-            percentile: The percentile threshold for word frequency (0-100).
-                        Words below this percentile will be excluded.
+            words_by_article: A dictionary mapping article titles to word counts
+                              or to lists of words.
 
         Returns:
-            A dictionary containing word counts and frequency percentages.
+            A counter mapping each word to its total number of occurrences.
         """
-        # Flatten the list of words from all articles
-        all_words = []
+        word_counter = Counter()
         for words in words_by_article.values():
-            all_words.extend(words)
+            # Counter.update adds counts for mappings and counts items otherwise
+            word_counter.update(words)
+        return word_counter
+
+    def count_words(
+        self,
+        words_by_article: Mapping[str, ArticleWords],
+        ignore_list: Optional[Iterable[str]] = None,
+    ) -> Mapping[str, int]:
+        """
+        Count the words of several articles, leaving out ignored words.
+
+        Args:
+            words_by_article: A dictionary mapping article titles to word counts
+                              or to lists of words.
+            ignore_list: A list of words to ignore, or a compiled
+                         ``IgnoreSet``. Words are expected to be lowercase, as
+                         ``extract_words`` produces them.
 
-        # Filter out words in the ignore list
+        Returns:
+            A mapping of each word to its total number of occurrences.
+        """
+        # Count word occurrences across all articles
+        word_counter = self.merge_word_counts(words_by_article)
+
+        # Remove the ignored words, looking each one up rather than scanning
+        # the whole vocabulary
         if ignore_list:
-            ignore_set = set(word.lower() for word in ignore_list)
-            all_words = [word for word in all_words if word.lower() not in ignore_set]
+            for word in compile_ignore_list(ignore_list):
+                word_counter.pop(word, None)
+        return word_counter
 
-        # Count word occurrences
-        word_counter = Counter(all_words)
+    def index_word_counts(
+        self,
+        words_by_article: Mapping[str, ArticleWords],
+        ignore_list: Optional[Iterable[str]] = None,
+    ) -> Tuple[Mapping[str, int], PercentileIndex]:
+        """
+        Count the words of several articles and index their counts.
+
+        The counts and their index can be kept and filtered by any number of
+        percentiles with ``frequencies_from_counts``, without counting or
+        scanning the counts again.
 
+        Args:
+            words_by_article: A dictionary mapping article titles to word counts
+                              or to lists of words.
+            ignore_list: A list of lowercase words to ignore, or a compiled
+                         ``IgnoreSet``.
+
+        Returns:
+            The word counts, as ``count_words`` returns them, and their
+            percentile index.
+        """
+        word_count = self.count_words(words_by_article, ignore_list)
+        return word_count, PercentileIndex(word_count.values())
+
+    def frequencies_from_counts(
+        self,
+        word_count: Mapping[str, int],
+        percentile: float = 0,
+        index: Optional[PercentileIndex] = None,
+        total: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Filter word counts by a percentile and calculate their frequencies.
+
+        Args:
+            word_count: A dictionary mapping words to their counts; it is not
+                        modified.
+            percentile: The percentile threshold for word frequency (0-100).
+                        Words below this percentile will be excluded.
+            index: The percentile index of these counts, if already built.
+            total: The number of words counted, when ``word_count`` only holds
+                   the most frequent of them, as approximate counting does.
+                   Frequencies are relative to it unless the percentile
+                   filters words out, like they are to the sum of the counts
+                   otherwise.
+
+        Returns:
+            A dictionary containing word counts and frequency percentages, and
+            with a ``total``, the number of words the frequencies are relative to.
+        """
         # Apply percentile filtering if specified
         if percentile > 0:
-            counts = np.array(list(word_counter.values()))
-            threshold = np.percentile(counts, percentile)
-            word_counter = {
-                word: count
-                for word, count in word_counter.items()
-                if count >= threshold
-            }
+            filtered = self.filter_by_percentile(word_count, percentile, index)
+            if filtered is not word_count:
+                total = None
+            word_count = filtered
 
         # Calculate total word count for frequency calculation
-        total_words = sum(word_counter.values())
+        total_words = sum(word_count.values()) if total is None else total
 
         # Calculate frequency percentages
         word_frequency = {}
         if total_words > 0:
             word_frequency = {
                 word: (count / total_words) * 100
-                for word, count in word_counter.items()
+                for word, count in word_count.items()
             }
 
-        return {"word_count": dict(word_counter), "word_frequency": word_frequency}
+        result = {"word_count": dict(word_count), "word_frequency": word_frequency}
+        if total is not None:
+            result["total"] = total_words
+        return result
+
+    def calculate_word_frequencies(
+        self,
+        words_by_article: Mapping[str, ArticleWords],
+        ignore_list: Optional[Iterable[str]] = None,
+        percentile: int = 0,
+        total: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Calculate word frequencies from a collection of words.
+
+        Args:
+            words_by_article: A dictionary mapping article titles to word counts
+                              or to lists of words.
+            ignore_list: A list of words to ignore in the frequency calculation,
+                         or a compiled ``IgnoreSet``. Words are expected to be
+                         lowercase, as ``extract_words`` produces them.
+            percentile: The percentile threshold for word frequency (0-100).
+                        Words below this percentile will be excluded.
+            total: The number of words counted, when the articles only hold
+                   the most frequent of them, as for ``frequencies_from_counts``.
+
+        Returns:
+            A dictionary containing word counts and frequency percentages.
+        """
+        return self.frequencies_from_counts(
+            self.count_words(words_by_article, ignore_list), percentile, total=total
+        )
+
+    def filter_by_percentile(
+        self,
+        word_count: Mapping[str, int],
+        percentile: float,
+        index: Optional[PercentileIndex] = None,
+    ) -> Mapping[str, int]:
+        """
+        Keep the words whose count is at least a percentile of all counts.
+
+        Args:
+            word_count: A dictionary mapping words to their counts.
+            percentile: The percentile threshold (0-100).
+            index: The percentile index of these counts, to reuse its cached
+                   thresholds when filtering them several times.
+
+        Returns:
+            The words at or above the threshold with their counts; the given
+            mapping itself if no word falls below it.
+        """
+        if index is None:
+            index = PercentileIndex(word_count.values())
+        threshold = index.threshold(percentile)
+        if not index.size or threshold <= index.values[0]:
+            return word_count
+        return {word: count for word, count in word_count.items() if count >= threshold}
+
+    def select_words(
+        self,
+        word_count: Mapping[str, int],
+        limit: Optional[int] = None,
+        offset: int = 0,
+        sort: Optional[str] = None,
+    ) -> List[str]:
+        """
+        Select a page of words in a given order.
+
+        With a limit, only the first ``offset + limit`` words are selected with
+        a heap instead of sorting the whole vocabulary, so the top K words of a
+        large vocabulary cost O(V log K).
+
+        Args:
+            word_count: A dictionary mapping words to their counts.
+            limit: The maximum number of words to select, or None for all.
+            offset: The number of words to skip.
+            sort: SORT_COUNT for the most frequent words first, ties broken
+                  alphabetically, or SORT_WORD for alphabetical order. Defaults
+                  to SORT_COUNT; without a limit, offset or sort, the words are
+                  returned in their original order.
+
+        Returns:
+            The selected words, in order.
+
+        Raises:
+            ValueError: If the sort order is unknown.
+        """
+        if sort is None and limit is None and offset == 0:
+            return list(word_count)
+
+        sort = sort or SORT_COUNT
+        if sort == SORT_COUNT:
+            key = lambda word: (-word_count[word], word)
+        elif sort == SORT_WORD:
+            key = None
+        else:
+            raise ValueError(
+                f"Unknown sort order '{sort}', expected one of {', '.join(SORT_ORDERS)}"
+            )
+
+        if limit is None:
+            return sorted(word_count, key=key)[offset:]
+        return heapq.nsmallest(offset + limit, word_count, key=key)[offset:]
+
+
+class Vocabulary(dict):
+    """
+    Mapping of words to consecutive integer IDs, assigned on first lookup.
+
+    Looking a word up with ``vocabulary[word]`` interns it, so whole lists of
+    words are converted to IDs with ``map`` without a Python-level loop.
+    """
+
+    def __missing__(self, word: str) -> int:
+        """Assign the next ID to a new word."""
+        word_id = self[word] = len(self)
+        return word_id
+
+    def ids(self, words: Collection[str]) -> np.ndarray:
+        """
+        Intern words and return their IDs.
+
+        Args:
+            words: The words.
+
+        Returns:
+            The ID of each word, in order.
+        """
+        return np.fromiter(map(self.__getitem__, words), dtype=np.intp, count=len(words))
+
+    def words(self) -> np.ndarray:
+        """
+        Get the words by ID.
+
+        Returns:
+            An object array whose element ``i`` is the word of ID ``i``.
+        """
+        words = np.empty(len(self), dtype=object)
+        words[:] = list(self)
+        return words
+
+
+@dataclass
+class WordCountArrays:
+    """Word counts as parallel arrays, as the vectorized analyzer keeps them."""
+
+    # Object array of the words, in order of first occurrence
+    words: np.ndarray
+    # Total count of each word, all of them positive
+    counts: np.ndarray
+
+    def __len__(self) -> int:
+        """Return the number of words."""
+        return len(self.counts)
+
+
+class VectorizedWordFrequencyAnalyzer(WordFrequencyAnalyzer):
+    """
+    Word frequency analyzer counting with NumPy over integer word IDs.
+
+    The words of every article are interned into a vocabulary shared by the
+    articles of one calculation. All their counts are then summed with a
+    single ``np.bincount``. Ignored words, the percentile threshold and
+    frequencies are applied to the whole count array at once, and
+    dictionaries are only built for the words in the result. Indexed counts
+    are kept as ``WordCountArrays``, so filtering them by a percentile is
+    vectorized too.
+    """
+
+    def count_ids(self, words_by_article: Mapping[str, ArticleWords]):
+        """
+        Count the words of several articles by word ID.
+
+        Args:
+            words_by_article: A dictionary mapping article titles to word counts
+                              or to lists of words.
+
+        Returns:
+            A tuple of the vocabulary and an array of the total count of each
+            word ID.
+        """
+        vocabulary = Vocabulary()
+        ids = []
+        weights = []
+        for words in words_by_article.values():
+            if isinstance(words, Mapping):
+                ids.append(vocabulary.ids(words.keys()))
+                weights.append(
+                    np.fromiter(words.values(), dtype=np.int64, count=len(words))
+                )
+            else:
+                if not isinstance(words, Collection):
+                    words = list(words)
+                article_ids = vocabulary.ids(words)
+                ids.append(article_ids)
+                weights.append(np.ones(len(article_ids), dtype=np.int64))
+
+        if not ids:
+            return vocabulary, np.zeros(0, dtype=np.int64)
+        counts = np.bincount(
+            np.concatenate(ids),
+            weights=np.concatenate(weights),
+            minlength=len(vocabulary),
+        )
+        return vocabulary, counts.astype(np.int64)
+
+    def count_arrays(
+        self,
+        words_by_article: Mapping[str, ArticleWords],
+        ignore_list: Optional[Iterable[str]] = None,
+    ) -> WordCountArrays:
+        """
+        Count the words of several articles into arrays, leaving out ignored words.
+
+        Args:
+            words_by_article: A dictionary mapping article titles to word counts
+                              or to lists of words.
+            ignore_list: A list of lowercase words to ignore, or a compiled
+                         ``IgnoreSet``.
+
+        Returns:
+            The words that occur, with their total number of occurrences.
+        """
+        vocabulary, counts = self.count_ids(words_by_article)
+        self._mask_ignored(vocabulary, counts, ignore_list)
+        selected = np.flatnonzero(counts)
+        return WordCountArrays(vocabulary.words()[selected], counts[selected])
+
+    def count_words(
+        self,
+        words_by_article: Mapping[str, ArticleWords],
+        ignore_list: Optional[Iterable[str]] = None,
+    ) -> Mapping[str, int]:
+        """
+        Count the words of several articles, leaving out ignored words.
+
+        Args:
+            words_by_article: A dictionary mapping article titles to word counts
+                              or to lists of words.
+            ignore_list: A list of lowercase words to ignore, or a compiled
+                         ``IgnoreSet``.
+
+        Returns:
+            A mapping of each word that occurs to its total number of occurrences.
+        """
+        word_count = self.count_arrays(words_by_article, ignore_list)
+        return dict(zip(word_count.words.tolist(), word_count.counts.tolist()))
+
+    @staticmethod
+    def _mask_ignored(
+        vocabulary: Vocabulary, counts: np.ndarray, ignore_list: Optional[Iterable[str]]
+    ) -> None:
+        """Zero the counts of the ignored words that occur at all."""
+        if ignore_list:
+            ignored = [vocabulary.get(word) for word in compile_ignore_list(ignore_list)]
+            counts[[word_id for word_id in ignored if word_id is not None]] = 0
+
+    def index_word_counts(
+        self,
+        words_by_article: Mapping[str, ArticleWords],
+        ignore_list: Optional[Iterable[str]] = None,
+    ) -> Tuple[WordCountArrays, PercentileIndex]:
+        """
+        Count the words of several articles into arrays and index their counts.
+
+        Args:
+            words_by_article: A dictionary mapping article titles to word counts
+                              or to lists of words.
+            ignore_list: A list of lowercase words to ignore, or a compiled
+                         ``IgnoreSet``.
+
+        Returns:
+            The word counts, as ``count_arrays`` returns them, and their
+            percentile index.
+        """
+        word_count = self.count_arrays(words_by_article, ignore_list)
+        return word_count, PercentileIndex.from_array(word_count.counts)
+
+    def frequencies_from_counts(
+        self,
+        word_count: Union[WordCountArrays, Mapping[str, int]],
+        percentile: float = 0,
+        index: Optional[PercentileIndex] = None,
+        total: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Filter word counts by a percentile and calculate their frequencies.
+
+        Counts given as a mapping are filtered like ``WordFrequencyAnalyzer``
+        does.
+
+        Args:
+            word_count: The word counts, as ``count_arrays`` returns them or
+                        as a mapping; they are not modified.
+            percentile: The percentile threshold for word frequency (0-100).
+                        Words below this percentile will be excluded.
+            index: The percentile index of these counts, if already built.
+            total: The number of words counted, when the counts only hold the
+                   most frequent of them, as for ``WordFrequencyAnalyzer``.
+
+        Returns:
+            A dictionary containing word counts and frequency percentages, with
+            the same content as ``WordFrequencyAnalyzer`` returns.
+        """
+        if not isinstance(word_count, WordCountArrays):
+            return super().frequencies_from_counts(word_count, percentile, index, total)
+
+        words = word_count.words
+        counts = word_count.counts
+        if percentile > 0 and len(counts):
+            if index is not None:
+                threshold = index.threshold(percentile)
+            else:
+                threshold = np.percentile(counts, percentile)
+            kept = counts >= threshold
+            if not kept.all():
+                total = None
+                words = words[kept]
+                counts = counts[kept]
+
+        words = words.tolist()
+        total_words = int(counts.sum()) if total is None else total
+        word_frequency = {}
+        if total_words > 0:
+            frequencies = counts / total_words * 100
+            word_frequency = dict(zip(words, frequencies.tolist()))
+
+        result = {
+            "word_count": dict(zip(words, counts.tolist())),
+            "word_frequency": word_frequency,
+        }
+        if total is not None:
+            result["total"] = total_words
+        return result
+
+    def calculate_word_frequencies(
+        self,
+        words_by_article: Mapping[str, ArticleWords],
+        ignore_list: Optional[Iterable[str]] = None,
+        percentile: int = 0,
+        total: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Calculate word frequencies from a collection of words.
+
+        Args:
+            words_by_article: A dictionary mapping article titles to word counts
+                              or to lists of words.
+            ignore_list: A list of lowercase words to ignore, or a compiled
+                         ``IgnoreSet``.
+            percentile: The percentile threshold for word frequency (0-100).
+                        Words below this percentile will be excluded.
+            total: The number of words counted, when the articles only hold
+                   the most frequent of them, as for ``frequencies_from_counts``.
+
+        Returns:
+            A dictionary containing word counts and frequency percentages, with
+            the same content as ``WordFrequencyAnalyzer`` returns.
+        """
+        return self.frequencies_from_counts(
+            self.count_arrays(words_by_article, ignore_list), percentile, total=total
+        )
+
+
+def create_analyzer(engine: str = ENGINE_PYTHON) -> WordFrequencyAnalyzer:
+    """
+    Create a word frequency analyzer.
+
+    Args:
+        engine: ENGINE_PYTHON to count with dictionaries, or ENGINE_NUMPY to
+                count with arrays of word IDs.
+
+    Returns:
+        The analyzer.
+
+    Raises:
+        ValueError: If the engine is unknown.
+    """
+    if engine == ENGINE_PYTHON:
+        return WordFrequencyAnalyzer()
+    if engine == ENGINE_NUMPY:
+        return VectorizedWordFrequencyAnalyzer()
+
+    raise ValueError(
+        f"Unknown counting engine '{engine}', expected one of {', '.join(COUNTING_ENGINES)}"
+    )
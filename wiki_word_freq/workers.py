@@ -0,0 +1,122 @@
+"""
+Module for running CPU-bound work outside of the event loop.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+WORKER_POOL_KINDS = ("thread", "process")
+
+
+def create_executor(kind: str = "thread", max_workers: Optional[int] = None) -> Executor:
+    """
+    Create the pool used for parsing articles and counting words.
+
+    Args:
+        kind: Either "thread" or "process".
+        max_workers: The number of workers, or None for the executor default.
+
+    Returns:
+        The executor.
+
+    Raises:
+        ValueError: If the pool kind or size is invalid.
+    """
+    if max_workers is not None and max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+
+    if kind == "thread":
+        return ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="wiki-word-freq"
+        )
+    if kind == "process":
+        return ProcessPoolExecutor(max_workers=max_workers)
+
+    raise ValueError(
+        f"Unknown worker pool '{kind}', expected one of {', '.join(WORKER_POOL_KINDS)}"
+    )
+
+
+async def run_in_executor(
+    executor: Optional[Executor], func: Callable[..., Any], *args, **kwargs
+) -> Any:
+    """
+    Run a function in an executor and await its result.
+
+    Args:
+        executor: The executor, or None for the event loop's default executor.
+        func: The function to run.
+        *args: Positional arguments for the function.
+        **kwargs: Keyword arguments for the function.
+
+    Returns:
+        The return value of the function.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor, functools.partial(func, *args, **kwargs)
+    )
+
+
+class ParseQueue:
+    """
+    Bounded hand-off from the fetch stage to the parse pool.
+
+    A fetched article must reserve a slot before it is handed to the pool, and
+    keeps it until it has been parsed. Fetches reserve the slot while still
+    holding their concurrency slot, so when the pool falls behind, downloads
+    stop instead of piling raw HTML up in the executor's unbounded queue.
+    """
+
+    def __init__(self, executor: Optional[Executor], max_pending: int):
+        """
+        Initialize the queue.
+
+        Args:
+            executor: The parse pool, or None for the event loop's default executor.
+            max_pending: The maximum number of articles queued or being parsed.
+        """
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least 1")
+
+        self.executor = executor
+        self.max_pending = max_pending
+        self.pending = 0
+        # Number of fetches that had to wait for the parse pool
+        self.stalls = 0
+        self._slots = asyncio.Semaphore(max_pending)
+
+    async def reserve(self) -> None:
+        """Wait until the pool can take another article."""
+        if self._slots.locked():
+            self.stalls += 1
+        await self._slots.acquire()
+        self.pending += 1
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run a function in the pool with a reserved slot, then free the slot.
+
+        Args:
+            func: The function to run.
+            *args: Positional arguments for the function.
+            **kwargs: Keyword arguments for the function.
+
+        Returns:
+            The return value of the function.
+        """
+        try:
+            return await run_in_executor(self.executor, func, *args, **kwargs)
+        finally:
+            self.pending -= 1
+            self._slots.release()
+
+    def info(self) -> Dict[str, int]:
+        """Return the number of pending articles and of stalled fetches."""
+        return {
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "stalls": self.stalls,
+        }